@@ -9,9 +9,23 @@ SEMANTIC_URL = "https://yugipedia.com/index.php"
 BASE_TEKKX_PRODUCT_URL = "https://tekkx.com/product/{slug}/"
 
 DEFAULT_CARD_QUANTITY_INTERVAL = 250
+DEFAULT_DB_CHUNKSIZE = 10000
 BUCKET_NAME = 'yugioh-storage'
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL") or None
+S3_MULTIPART_PART_SIZE = 8 * 1024 * 1024
 
 
+# Adaptive per-host request concurrency, see utilities/concurrency_utilities.py
+DEFAULT_INITIAL_CONCURRENCY = 4
+DEFAULT_MAX_CONCURRENCY = 8
+HOST_MAX_CONCURRENCY: dict[str, int] = {
+    "yuyu-tei.jp": 8,
+    "api.bigweb.co.jp": 12,
+    "yugipedia.com": 10,
+    "filter-v9.globosoftware.net": 8,
+}
+CONCURRENCY_LATENCY_TARGET = 2.0  # p95 seconds
+
 JAPANESE_CHARS_REGEX = r'[\u3000-\u303f\u3040-\u309f\u30a0-\u30ff\uff00-\uff9f\u4e00-\u9faf\u3400-\u4dbf]+ (?=[A-Za-z ]+–)'
 WINDOWS_EXPORT_PATH: str = r'\\192.168.50.227\personal'
 LINUX_EXPORT_PATH: str = r'/home/silentx'
@@ -42,6 +56,16 @@ TEKKX_SCALABLE_DB_NAME = os.getenv('DB_NAME', "tekkx_scalable")
 YUGIOH_DB = os.getenv("YUGIOH_DB", "yugioh_data")
 DB_PORT = os.getenv("DB_PORT", "3307")
 
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mysql")
+LOCAL_DB_DIR = os.getenv("LOCAL_DB_DIR", "./.cache/db")
+SNAPSHOT_CACHE_DIR = os.getenv("SNAPSHOT_CACHE_DIR", "./.cache/snapshots")
+PAGE_CACHE_DIR = os.getenv("PAGE_CACHE_DIR", "./.cache/pages")
+
+# How long Yugipedia redirect lookups are trusted, in seconds. Names that do not
+# redirect are re-checked sooner, as a page move would add a redirect for them.
+REDIRECT_CACHE_TTL = 30 * 24 * 3600
+REDIRECT_NEGATIVE_CACHE_TTL = 7 * 24 * 3600
+
 RARITY_CATEGORIES_TO_SKIP = ["Variant card",
                              "Unlimited Edition",
                              "Rarity (grade)",
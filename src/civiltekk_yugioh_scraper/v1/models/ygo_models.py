@@ -4,6 +4,12 @@ from typing import TypedDict, List
 cols = ["region", "set_card_name_combined", "set_name", "set_card_code_updated",
         "rarity_name", "quantity", "price", "post_name", "post_title"]
 
+# Columns that identify one inventory line
+INVENTORY_KEY_COLUMNS = ["region", "set_card_name_combined", "set_name",
+                         "set_card_code_updated", "rarity_name"]
+# Low-cardinality columns, kept as categoricals in inventory frames
+INVENTORY_CATEGORY_COLUMNS = ["region", "set_name", "rarity_name"]
+
 
 class TekkxProductData(TypedDict):
     region: str
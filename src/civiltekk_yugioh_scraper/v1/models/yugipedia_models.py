@@ -32,6 +32,10 @@ def format_lore(value: Optional[str]) -> str:
 
 
 class YugiohSet:
+    # Columns read by get_yugioh_set_from_db_obj
+    DB_COLUMNS = ('name', 'set_code', 'set_image', 'language',
+                  'card_game', 'release_date', 'region')
+
     def __init__(self,
                  name: str | None = None,
                  set_code: str | None = None,
@@ -98,6 +102,11 @@ class YugiohCard:
     """
     A class to represent a Yu-Gi-Oh! card with relevant details.
     """
+    # Columns read by get_yugioh_card_from_db_obj that feed the set card exports
+    DB_COLUMNS = ('name', 'english_name', 'password', 'card_type', 'level', 'race',
+                  'archetypes', 'lore', 'attribute', 'atk_string', 'def_string',
+                  'link_arrows', 'link_rating', 'pendulum_scale', 'pendulum_effect',
+                  'rank', 'card_image_name')
 
     def __init__(self, name: str, attributes: Dict[str, Any]) -> None:
         self.name: str = name or ""
@@ -253,6 +262,9 @@ class YugiohCard:
 
 
 class YugiohRarity:
+    # Columns read by get_yugioh_rarity_from_db_obj
+    DB_COLUMNS = ('name', 'prefix', 'pageid')
+
     def __init__(self, name: str, prefix: str, pageid: int):
         self.name: str = name
         self.prefix: str = prefix
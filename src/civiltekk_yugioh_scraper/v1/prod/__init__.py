@@ -4,4 +4,4 @@ from .card_list_scraper import card_list_scraper
 from .bigwebscrape import bigweb_scrape
 from .yuyuteiscrape2 import yuyutei_scrape
 from .tcgcorner_scraper import tcgcorner_scrape, get_card_prices
-from .hitpay_income import hitpay_main
+from .hitpay_income import hitpay_main, hitpay_ledger_ingest
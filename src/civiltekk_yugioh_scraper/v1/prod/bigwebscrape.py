@@ -1,19 +1,31 @@
 import sys
 import os
 import datetime
-import requests
 import re
 import pandas as pd
 from concurrent.futures import ThreadPoolExecutor
 import concurrent.futures
 import concurrent
+import functools
 import logging
+from typing import Iterable, Iterator
+
+import requests
 
+from ..utilities.concurrency_utilities import get_host_limiter
 from ..utilities.misc_utilities import check_for_jap_chars, run_request_until_response
-from ..utilities.aws_utilities import upload_data
+from ..utilities.sink_utilities import LocalFileSink, MySQLSink, write_to_sinks
 from ..models.bigweb_models import BigwebRarity, BigwebSet, BigwebSetCard, BigwebSetCardCondition
 from dotenv import load_dotenv
 
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+    logging.warning(
+        "ijson not available, bigweb pages are decoded whole. Install with: pip install ijson")
+
 
 def get_rarity_mapping_dict():
     rarity_dict = {
@@ -69,83 +81,153 @@ def replace_the_word_new_in_set(x: str):
     return x
 
 
-def get_bigweb_objs2(page_number):
-    bigweb_set_cards = []
+BIGWEB_PRODUCTS_URL = "https://api.bigweb.co.jp/products?game_id=9"
+BIGWEB_HOST = "api.bigweb.co.jp"
+
+
+def get_bigweb_page_url(page_number: int) -> str:
+    return f"{BIGWEB_PRODUCTS_URL}&page={page_number}"
+
+
+class BigwebItemDecoder:
+    """
+    Builds set cards from bigweb product items.
+
+    Thousands of items share a handful of card sets, rarities and conditions. Each of
+    those is built once per id and shared, so the set-name regexes run once per set,
+    not once per card. The nested dicts themselves are still decoded in full for every
+    item, by ``iter_bigweb_items`` or ``response.json()``.
+    """
+
+    def __init__(self):
+        self.sets: dict = {}
+        self.rarities: dict = {}
+        self.conditions: dict = {}
+
+    def get_rarity(self, rarity_obj: dict) -> BigwebRarity:
+        bigweb_rarity = self.rarities.get(rarity_obj['id'])
+        if bigweb_rarity is None:
+            bigweb_rarity = self.rarities.setdefault(rarity_obj['id'], BigwebRarity(
+                id=rarity_obj['id'],
+                web=rarity_obj['web'],
+                slip=rarity_obj['slip'],
+                type=rarity_obj['type'],
+                ordering_id=rarity_obj['ordering_id']
+            ))
+        return bigweb_rarity
+
+    def get_condition(self, condition_obj: dict) -> BigwebSetCardCondition:
+        bigweb_condition = self.conditions.get(condition_obj['id'])
+        if bigweb_condition is None:
+            bigweb_condition = self.conditions.setdefault(condition_obj['id'], BigwebSetCardCondition(
+                id=condition_obj['id'],
+                web=condition_obj['web'],
+                slip=condition_obj['slip'],
+                type=condition_obj['type'],
+                ordering_id=condition_obj['ordering_id'],
+                name=condition_obj['name']
+            ))
+        return bigweb_condition
+
+    def get_set(self, cardset_obj: dict) -> BigwebSet:
+        bigweb_set = self.sets.get(cardset_obj['id'])
+        if bigweb_set is None:
+            bigweb_set = self.sets.setdefault(cardset_obj['id'], BigwebSet(
+                id=cardset_obj['id'],
+                web=cardset_obj['web'],
+                slip=cardset_obj['slip'],
+                type=cardset_obj['type'],
+                ordering_id=cardset_obj['ordering_id'],
+                desc=cardset_obj['desc'],
+                cardset_id=cardset_obj['cardset_id'],
+                code=cardset_obj['code'],
+                is_reservation=cardset_obj['is_reservation'],
+                is_box=cardset_obj['is_box'],
+                rack_number=cardset_obj['rack_number'],
+                rack_ordering=cardset_obj['rack_ordering'],
+                picking_type=cardset_obj['picking_type'],
+                release=cardset_obj['release']
+            ))
+        return bigweb_set
+
+    def decode(self, item: dict) -> BigwebSetCard | None:
+        """
+        Builds the set card for one item, or None if the item has no card condition.
+        """
+        condition_obj = item['card_condition']
+        if not condition_obj:
+            return None
+
+        return BigwebSetCard(
+            id=item['id'],
+            name=item['name'],
+            fname=item['fname'],
+            image=item['image'],
+            stock_count=item['stock_count'],
+            condition=self.get_condition(condition_obj),
+            price=item['price'],
+            sale_prices=item['sale_prices'],
+            rarity=self.get_rarity(item['rarity']),
+            bigweb_set=self.get_set(item['cardset']),
+        )
+
+    def decode_items(self, items: Iterable[dict]) -> list[BigwebSetCard]:
+        bigweb_set_cards: list[BigwebSetCard] = []
+        for item in items:
+            bigweb_set_card = self.decode(item)
+            if bigweb_set_card is not None:
+                bigweb_set_cards.append(bigweb_set_card)
+        return bigweb_set_cards
+
+
+def iter_bigweb_items(response: requests.Response) -> Iterator[dict]:
+    """
+    Yields the products of a products page one at a time.
+
+    With ijson the body is decoded incrementally as it streams in, so only one item is
+    held in memory instead of the whole decoded page. Without it, the page is decoded
+    whole.
+
+    Args:
+        response (requests.Response): Response requested with stream=True.
+
+    Yields:
+        dict: One product item.
+    """
+    if not IJSON_AVAILABLE:
+        yield from response.json().get('items') or []
+        return
+    response.raw.decode_content = True
+    yield from ijson.items(response.raw, 'items.item', use_float=True)
+
+
+def parse_bigweb_items(response_dict: dict, decoder: BigwebItemDecoder | None = None) -> list[BigwebSetCard]:
+    """
+    Builds set cards from one decoded page of the bigweb products API.
+
+    Args:
+        response_dict (dict): Decoded page, with the products under 'items'.
+        decoder (BigwebItemDecoder, optional): Decoder whose shared objects to reuse.
+
+    Returns:
+        list[BigwebSetCard]: One set card per item that has a card condition.
+    """
+    return (decoder or BigwebItemDecoder()).decode_items(response_dict['items'])
+
+
+def get_bigweb_objs2(page_number, decoder: BigwebItemDecoder | None = None):
     final_obj = {}
 
-    final_obj["bigweb_set_cards"] = bigweb_set_cards
-    params = {"page_number": page_number}
-    url_to_scrape = "https://api.bigweb.co.jp/products?game_id=9&page={page}".format(
-        page=page_number)
+    final_obj["bigweb_set_cards"] = []
+    url_to_scrape = get_bigweb_page_url(page_number)
 
     try:
-        response = run_request_until_response(url=url_to_scrape, params=params)
+        response = run_request_until_response(url=url_to_scrape, stream=True)
 
         if response:
-            response_dict = response.json()
-            if response_dict:
-                items = response_dict['items']
-                for item in items:
-                    rarity_obj = item['rarity']
-                    bigweb_rarity = BigwebRarity(
-                        id=rarity_obj['id'],
-                        web=rarity_obj['web'],
-                        slip=rarity_obj['slip'],
-                        type=rarity_obj['type'],
-                        ordering_id=rarity_obj['ordering_id']
-                    )
-
-                    condition_obj = item['card_condition']
-                    if not condition_obj:
-                        continue
-
-                    bigweb_condition = BigwebSetCardCondition(
-                        id=condition_obj['id'],
-                        web=condition_obj['web'],
-                        slip=condition_obj['slip'],
-                        type=condition_obj['type'],
-                        ordering_id=condition_obj['ordering_id'],
-                        name=condition_obj['name']
-                    )
-
-                    cardset_obj = item['cardset']
-                    bigweb_set = BigwebSet(
-                        id=cardset_obj['id'],
-                        web=cardset_obj['web'],
-                        slip=cardset_obj['slip'],
-                        type=cardset_obj['type'],
-                        ordering_id=cardset_obj['ordering_id'],
-                        desc=cardset_obj['desc'],
-                        cardset_id=cardset_obj['cardset_id'],
-                        code=cardset_obj['code'],
-                        is_reservation=cardset_obj['is_reservation'],
-                        is_box=cardset_obj['is_box'],
-                        rack_number=cardset_obj['rack_number'],
-                        rack_ordering=cardset_obj['rack_ordering'],
-                        picking_type=cardset_obj['picking_type'],
-                        release=cardset_obj['release']
-                    )
-
-                    bigweb_set_card = BigwebSetCard(
-                        id=item['id'],
-                        name=item['name'],
-                        fname=item['fname'],
-                        image=item['image'],
-                        stock_count=item['stock_count'],
-                        condition=bigweb_condition,
-                        price=item['price'],
-                        sale_prices=item['sale_prices'],
-                        rarity=bigweb_rarity,
-                        bigweb_set=bigweb_set,
-                        # date_updated=date_updated
-                    )
-
-                    set_card_check = next(
-                        (set_card for set_card in bigweb_set_cards if set_card.id == bigweb_set_card.id), None)
-                    if not set_card_check:
-                        bigweb_set_cards.append(bigweb_set_card)
-
-            final_obj["bigweb_set_cards"] = bigweb_set_cards
+            with response:
+                final_obj["bigweb_set_cards"] = (decoder or BigwebItemDecoder()).decode_items(
+                    iter_bigweb_items(response))
         else:
             logging.info("Response is None")
             return final_obj
@@ -159,58 +241,74 @@ def get_bigweb_objs2(page_number):
     return final_obj
 
 
-def bigweb_scrape():
-    load_dotenv()
-    start = datetime.datetime.now()
+def fetch_bigweb_set_cards() -> list[BigwebSetCard]:
+    """
+    Fetches every page of the bigweb catalog, deduplicated by product id.
+
+    Page 1 is fetched first and its response is reused both for the page count and for
+    its items. Pages 2..N are then fetched concurrently within the adaptive bigweb host
+    limit, each retried only if it fails, and their items are decoded as they stream in.
 
-    URL = 'https://api.bigweb.co.jp/products?game_id=9'
-    response = requests.get(URL, timeout=10)
+    Returns:
+        list[BigwebSetCard]: Unique set cards in page order.
+    """
+    limiter = get_host_limiter(BIGWEB_HOST)
+    decoder = BigwebItemDecoder()
+    response = run_request_until_response(url=get_bigweb_page_url(1))
+    if not response:
+        logging.error("Could not fetch the first bigweb page")
+        return []
     response_dict = response.json()
     total_page_to_iterate = response_dict['pagenate']['pageCount']
     logging.info(f"Total page count: {total_page_to_iterate}")
-    final_bigweb_sets: list[BigwebSet] = []
-    final_bigweb_set_cards: list[BigwebSetCard] = []
-    final_bigweb_rarities: list[BigwebRarity] = []
-    final_bigweb_conditions: list[BigwebSetCardCondition] = []
-
-    # optimally defined number of threads
-    with ThreadPoolExecutor(4) as executor:
-        futures = []
-        # total_page_to_iterate = 2  # for debugging
-        for page_number in range(0, total_page_to_iterate + 1):
-            futures.append(executor.submit(get_bigweb_objs2, page_number))
-        for future in concurrent.futures.as_completed(futures):
-            try:
-                bigweb_set_cards = future.result()['bigweb_set_cards']
-                final_bigweb_set_cards.extend(bigweb_set_cards)
-
-            except AttributeError as e:
-                logging.error(
-                    f"Error in processing future result: {e}. Skipping this page.")
 
-    date_updated = datetime.datetime.now()
+    bigweb_set_cards: dict[str, BigwebSetCard] = {}
 
-    for index, bw_set_card in enumerate(final_bigweb_set_cards.copy()):
-        bw_set_card.date_updated = date_updated
-        final_bigweb_set_cards[index] = bw_set_card
+    def add_set_cards(set_cards: list[BigwebSetCard]) -> None:
+        for set_card in set_cards:
+            bigweb_set_cards.setdefault(set_card.id, set_card)
 
-    for bw_set_card in final_bigweb_set_cards:
-        set_check = next(
-            (bw_set for bw_set in final_bigweb_sets if bw_set_card.set and bw_set and bw_set.id == bw_set_card.set.id), None)
-        if not set_check and bw_set_card.set:
-            final_bigweb_sets.append(bw_set_card.set)
+    add_set_cards(parse_bigweb_items(response_dict, decoder))
+    del response, response_dict
+
+    # The limiter decides how many of these threads may request at once
+    with ThreadPoolExecutor(limiter.max_limit) as executor:
+        for page_obj in executor.map(functools.partial(get_bigweb_objs2, decoder=decoder),
+                                     range(2, total_page_to_iterate + 1)):
+            add_set_cards(page_obj['bigweb_set_cards'])
+    limiter.log_summary()
+
+    logging.info(f"Fetched {len(bigweb_set_cards)} unique bigweb products")
+    return list(bigweb_set_cards.values())
+
+
+def bigweb_scrape():
+    load_dotenv()
+    start = datetime.datetime.now()
+
+    final_bigweb_set_cards: list[BigwebSetCard] = fetch_bigweb_set_cards()
+
+    date_updated = datetime.datetime.now()
 
     for bw_set_card in final_bigweb_set_cards:
-        rarity_check = next(
-            (bw_rarity for bw_rarity in final_bigweb_rarities if (bw_set_card.rarity and bw_rarity.id == bw_set_card.rarity.id)), None)
-        if not rarity_check and bw_set_card.rarity:
-            final_bigweb_rarities.append(bw_set_card.rarity)
+        bw_set_card.date_updated = date_updated
 
+    # Keyed by id so each distinct set, rarity and condition is kept once, in first-seen order
+    bigweb_sets: dict = {}
+    bigweb_rarities: dict = {}
+    bigweb_conditions: dict = {}
     for bw_set_card in final_bigweb_set_cards:
-        condition_check = next(
-            (bw_condition for bw_condition in final_bigweb_conditions if (bw_set_card.condition and bw_condition.id == bw_set_card.condition.id)), None)
-        if not condition_check and bw_set_card.condition:
-            final_bigweb_conditions.append(bw_set_card.condition)
+        if bw_set_card.set:
+            bigweb_sets.setdefault(bw_set_card.set.id, bw_set_card.set)
+        if bw_set_card.rarity:
+            bigweb_rarities.setdefault(bw_set_card.rarity.id, bw_set_card.rarity)
+        if bw_set_card.condition:
+            bigweb_conditions.setdefault(
+                bw_set_card.condition.id, bw_set_card.condition)
+    final_bigweb_sets: list[BigwebSet] = list(bigweb_sets.values())
+    final_bigweb_rarities: list[BigwebRarity] = list(bigweb_rarities.values())
+    final_bigweb_conditions: list[BigwebSetCardCondition] = list(
+        bigweb_conditions.values())
 
     df_sets = pd.DataFrame([bigweb_set.get_dict()
                            for bigweb_set in final_bigweb_sets])
@@ -230,26 +328,23 @@ def bigweb_scrape():
     df_conditions = pd.DataFrame([condition.get_dict()
                                  for condition in final_bigweb_conditions])
 
-    df_sets.to_csv("bigweb_sets.csv", index=False)
-    df_set_cards.to_csv("bigweb_set_cards.csv", index=False)
-    df_rarities.to_csv("bigweb_rarities.csv", index=False)
-    df_conditions.to_csv("bigweb_conditions.csv", index=False)
     # replace rarity for duel terminal
     df__bigweb_latest_set_cards = replace_rarity_main_for_duel_terminal(
         df=df__bigweb_latest_set_cards, set_card_code='card_code', rarity_column='mapped_rarity')
 
-    df__bigweb_latest_set_cards.to_csv("bigweb_latest.test.csv", index=False)
-
-    upload_data(df=df_sets,
-                table_name="bigweb_sets", if_exist="replace", db_name="yugioh_data")
-    upload_data(df=df_set_cards,
-                table_name="bigweb_set_cards", if_exist="replace", db_name="yugioh_data")
-    upload_data(df=df_rarities,
-                table_name="bigweb_rarities", if_exist="replace", db_name="yugioh_data")
-    upload_data(df=df__bigweb_latest_set_cards,
-                table_name="bigweb_latest", if_exist="replace", db_name="yugioh_data")
-    upload_data(df=df__bigweb_latest_set_cards,
-                table_name="bigweb", if_exist="append", db_name="yugioh_data")
+    write_to_sinks([
+        (df_sets, [LocalFileSink("bigweb_sets.csv"),
+                   MySQLSink("bigweb_sets", "replace", "yugioh_data")]),
+        (df_set_cards, [LocalFileSink("bigweb_set_cards.csv"),
+                        MySQLSink("bigweb_set_cards", "replace", "yugioh_data")]),
+        (df_rarities, [LocalFileSink("bigweb_rarities.csv"),
+                       MySQLSink("bigweb_rarities", "replace", "yugioh_data")]),
+        (df_conditions, [LocalFileSink("bigweb_conditions.csv")]),
+        (df__bigweb_latest_set_cards, [LocalFileSink("bigweb_latest.test.csv"),
+                                       MySQLSink("bigweb_latest",
+                                                 "replace", "yugioh_data"),
+                                       MySQLSink("bigweb", "append", "yugioh_data")]),
+    ])
     end = datetime.datetime.now()
     difference = end - start
     logging.info(f"The time difference between the 2 time is: {difference}")
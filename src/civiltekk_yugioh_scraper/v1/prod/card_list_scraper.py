@@ -1,7 +1,7 @@
 import datetime
 import pandas as pd
 from ..utilities.yugipedia.yugipedia_scraper_set_card import get_yugioh_set_cards_v2
-from ..utilities.aws_utilities import upload_data
+from ..utilities.sink_utilities import LocalFileSink, MySQLSink, OutputSink, write_to_sinks
 from ..config import TABLE_YUGIOH_OVERALL_CARD_CODE_LISTS
 from dotenv import load_dotenv
 import logging
@@ -17,14 +17,17 @@ def card_list_scraper(to_csv: bool = True, to_sql: bool = True) -> tuple[pd.Data
     df: pd.DataFrame = pd.DataFrame(yugioh_set_card_dicts)
     df_missing_links: pd.DataFrame = pd.DataFrame(missing_links_dict_list)
 
+    set_card_sinks: list[OutputSink] = []
+    missing_link_sinks: list[OutputSink] = []
     if to_csv:
-        df.to_csv("./output/yugioh_set_cards.csv", index=False)
-        df_missing_links.to_csv(
-            "./output/missing_links.csv", index=False)
-
+        set_card_sinks.append(LocalFileSink("./output/yugioh_set_cards.csv"))
+        missing_link_sinks.append(LocalFileSink("./output/missing_links.csv"))
     if to_sql:
-        upload_data(df, TABLE_YUGIOH_OVERALL_CARD_CODE_LISTS,
-                    "replace", db_name="yugioh_data")
+        set_card_sinks.append(MySQLSink(TABLE_YUGIOH_OVERALL_CARD_CODE_LISTS,
+                                        "replace", db_name="yugioh_data"))
+
+    write_to_sinks([(df, set_card_sinks),
+                    (df_missing_links, missing_link_sinks)])
 
     end = datetime.datetime.now()
     difference = end - start
@@ -1,45 +1,205 @@
+import glob
 import logging
+import os
+from typing import Iterator, Optional, Sequence
 
 import pandas as pd
 import numpy as np
 
+from ..utilities.cache_utilities import load_json_cache, save_json_cache
 from ..utilities.misc_utilities import get_file_path
 
+# Only the order export columns the income rows are built from
+HITPAY_ORDER_DTYPES = {
+    'Order ID': 'string',
+    'Order Date': 'string',
+    'Order Status': 'category',
+    'Order Total': 'float64',
+    'Payment Method Title': 'category',
+    'HitPay_fees': 'float64',
+    '_stripe_net': 'float64',
+    'Billing First Name': 'string',
+    'Billing Last Name': 'string',
+}
 
-def hitpay_main():
-    filename = "Orders-Export-2023-April-16-0629.csv"
-    export_filepath = "income_output.csv"
+INCOME_COLUMNS = ['Order Date Updated', 'Order Total',
+                  'Category', 'Subcategory',
+                  'Payment Method Title', 'Order ID Updated',
+                  'Hitpay Fee', 'Stripe Net',
+                  'Ref No', 'Payer', 'Status', 'picture', 'Account'
+                  ]
+
+HITPAY_EXPORT_PATTERN = "Orders-Export-*.csv"
+HITPAY_CHUNKSIZE = 50000
+
+
+def read_hitpay_orders(path: str, chunksize: Optional[int] = None):
+    """
+    Reads an order export with only the needed columns and explicit dtypes.
+
+    Args:
+        path (str): Path of the order export CSV.
+        chunksize (int, optional): Return an iterator of chunks of this many rows.
+
+    Returns:
+        pd.DataFrame | Iterator[pd.DataFrame]: The orders, or chunks of them.
+    """
+    return pd.read_csv(path, usecols=list(HITPAY_ORDER_DTYPES),
+                       dtype=HITPAY_ORDER_DTYPES, chunksize=chunksize)
+
+
+def build_income_rows(df_orders: pd.DataFrame) -> pd.DataFrame:
+    """
+    Turns completed orders into income ledger rows.
+
+    Args:
+        df_orders (pd.DataFrame): Orders as read by ``read_hitpay_orders``.
+
+    Returns:
+        pd.DataFrame: One row per completed order, with INCOME_COLUMNS.
+    """
+    df_completed = df_orders[df_orders['Order Status'] == 'wc-completed']
+    return pd.DataFrame({
+        'Order Date Updated': pd.to_datetime(df_completed['Order Date']).dt.date,
+        'Order Total': df_completed['Order Total'],
+        'Category': 'Income',
+        'Subcategory': np.nan,
+        'Payment Method Title': df_completed['Payment Method Title'],
+        'Order ID Updated': "#" + df_completed['Order ID'],
+        'Hitpay Fee': df_completed['HitPay_fees'],
+        'Stripe Net': df_completed['_stripe_net'],
+        'Ref No': np.nan,
+        'Payer': df_completed['Billing First Name'] + " " + df_completed['Billing Last Name'],
+        'Status': 'Cleared',
+        'picture': np.nan,
+        'Account': 'YGO',
+    }, index=df_completed.index)[INCOME_COLUMNS]
+
+
+def hitpay_main(filename: str = "Orders-Export-2023-April-16-0629.csv",
+                export_filepath: str = "income_output.csv"):
     orders_import_path = get_file_path(filename)
     orders_export_path = get_file_path(export_filepath)
-    df: pd.DataFrame = pd.read_csv(orders_import_path)
-
-    df_unique: pd.DataFrame = df.drop_duplicates(
-        keep='last', subset=['Order ID'])
-    df_unique['Order Date'] = pd.to_datetime(df_unique['Order Date'])
-    df_unique['Order Date Updated'] = df_unique['Order Date'].dt.date
-    df_unique = df_unique[df_unique['Order Status'] == 'wc-completed']
-
-    df_unique['Category'] = 'Income'
-    df_unique['Subcategory'] = np.nan
-    df_unique['Order ID Updated'] = "#" + df_unique['Order ID'].astype(str)
-    df_unique['Hitpay Fee'] = df_unique['HitPay_fees']
-    df_unique['Stripe Net'] = df_unique['_stripe_net']
-    df_unique['Ref No'] = np.nan
-    df_unique['Payer'] = df_unique['Billing First Name'] + \
-        " " + df_unique['Billing Last Name']
-    df_unique['Status'] = 'Cleared'
-    df_unique['picture'] = np.nan
-    df_unique['Account'] = 'YGO'
-
-    df_unique = df_unique[['Order Date Updated', 'Order Total',
-                           'Category', 'Subcategory',
-                           'Payment Method Title', 'Order ID Updated',
-                           'Hitpay Fee', 'Stripe Net',
-                           'Ref No', 'Payer', 'Status', 'picture', 'Account'
-                           ]]
+    df = read_hitpay_orders(orders_import_path)
+
+    df_unique = build_income_rows(df.drop_duplicates(
+        keep='last', subset=['Order ID']))
     logging.info(f"Total unique orders: {len(df_unique)}")
     df_unique.to_csv(orders_export_path, index=False)
 
 
+def get_ledger_state_path(ledger_path: str) -> str:
+    return f"{ledger_path}.state.json"
+
+
+def get_export_fingerprint(path: str) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_size}|{stat.st_mtime_ns}"
+
+
+def iter_new_income_rows(path: str, seen_order_ids: set,
+                         chunksize: int = HITPAY_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+    """
+    Streams income rows of one order export for completed orders not in the ledger yet.
+
+    Within the export the last row of each order wins, as in ``hitpay_main``: its Order
+    ID column is read first to find the last occurrences, and an order whose last row
+    is not completed gets no income row. Order IDs of yielded rows are added to
+    ``seen_order_ids`` as they are yielded.
+
+    Args:
+        path (str): Path of the order export CSV.
+        seen_order_ids (set): Order IDs already in the ledger, updated in place.
+        chunksize (int): Rows read from the export at a time.
+
+    Yields:
+        pd.DataFrame: Chunks of new income rows.
+    """
+    order_ids = pd.read_csv(path, usecols=['Order ID'], dtype={'Order ID': 'string'})['Order ID']
+    is_last_occurrence = ~order_ids.duplicated(keep='last').to_numpy()
+    del order_ids
+
+    for chunk in read_hitpay_orders(path, chunksize=chunksize):
+        # Chunks keep their row positions in the file as index
+        df_income = build_income_rows(chunk[is_last_occurrence[chunk.index]])
+        df_income = df_income[~df_income['Order ID Updated'].isin(seen_order_ids)]
+        seen_order_ids.update(df_income['Order ID Updated'].tolist())
+        yield df_income
+
+
+def hitpay_ledger_ingest(export_paths: Optional[Sequence[str]] = None,
+                         ledger_filename: str = "income_ledger.csv",
+                         chunksize: int = HITPAY_CHUNKSIZE) -> int:
+    """
+    Appends income rows for new completed orders from any number of order exports.
+
+    Exports are streamed in chunks, oldest first, and exports whose size and
+    modification time match the state are skipped. Orders are deduplicated with a
+    persistent index of the order IDs already in the ledger, kept with the fingerprints
+    of processed exports in ``<ledger>.state.json``. Within an export the last row of
+    an order wins, like ``hitpay_main``; the ledger is append-only, so across exports
+    and runs the first income row appended for an order is kept and later ones are
+    skipped.
+
+    The state is saved once per processed export. If a run stops in the middle of one,
+    the order ID index is rebuilt from the ledger on the next run and the export is
+    read again, so no order is appended twice.
+
+    Args:
+        export_paths (Sequence[str], optional): Order export CSVs. Defaults to every
+            HITPAY_EXPORT_PATTERN file in the export directory.
+        ledger_filename (str): Name of the income ledger CSV in the export directory.
+        chunksize (int): Rows read from an export at a time.
+
+    Returns:
+        int: Number of income rows appended.
+    """
+    ledger_path = get_file_path(ledger_filename)
+    state_path = get_ledger_state_path(ledger_path)
+    if export_paths is None:
+        export_paths = glob.glob(get_file_path(HITPAY_EXPORT_PATTERN))
+    export_paths = sorted(export_paths, key=os.path.getmtime)
+
+    saved_state = load_json_cache(state_path)
+    state = {"order_ids": set(saved_state.get("order_ids", [])),
+             "files": saved_state.get("files", {})}
+    is_rebuilt = os.path.exists(ledger_path) and os.path.getsize(ledger_path) > 0 and (
+        not os.path.exists(state_path) or os.path.getmtime(ledger_path) > os.path.getmtime(state_path))
+    if is_rebuilt:
+        # The last run stopped between appending rows and saving the state
+        logging.warning(f"Rebuilding the order ID index from {ledger_path}")
+        state["order_ids"].update(pd.read_csv(ledger_path, usecols=['Order ID Updated'],
+                                              dtype='string')['Order ID Updated'].dropna())
+
+    def save_state() -> None:
+        save_json_cache({"order_ids": sorted(state["order_ids"]),
+                         "files": state["files"]}, state_path)
+
+    appended = 0
+    for path in export_paths:
+        name = os.path.basename(path)
+        fingerprint = get_export_fingerprint(path)
+        if state['files'].get(name) == fingerprint:
+            logging.info(f"Skipping unchanged export {name}")
+            continue
+
+        for df_income in iter_new_income_rows(path, state["order_ids"], chunksize):
+            if not df_income.empty:
+                is_new_ledger = not os.path.exists(
+                    ledger_path) or os.path.getsize(ledger_path) == 0
+                df_income.to_csv(ledger_path, mode='a',
+                                 header=is_new_ledger, index=False)
+                appended += len(df_income)
+        state['files'][name] = fingerprint
+        save_state()
+        is_rebuilt = False
+    if is_rebuilt:
+        save_state()
+
+    logging.info(
+        f"Appended {appended} income rows to {ledger_path} from {len(export_paths)} exports")
+    return appended
+
+
 if __name__ == "__main__":
     hitpay_main()
@@ -1,11 +1,14 @@
-from io import StringIO
-import json
-import requests
-import csv
-import re
 import logging
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from urllib.parse import urlparse
+
+import pandas as pd
 
-from ..utilities.aws_utilities import save_to_s3
+from ..utilities.concurrency_utilities import get_host_limiter
+from ..utilities.misc_utilities import run_request_until_response
+from ..utilities.sink_utilities import COMPRESSION_SUFFIXES, LocalFileSink, S3Sink, write_to_sinks
 from ..config import DEFAULT_CARD_QUANTITY_INTERVAL, BUCKET_NAME
 
 
@@ -25,41 +28,55 @@ def get_tcgcorner_url(page_number: int):
     return 'https://filter-v9.globosoftware.net/filter?shop=6b44fd.myshopify.com&collection=462781972755&event=init&page_type=collection&limit={quantity}&page={page_number}&currency=SGD_SG&country=SG'.format(page_number=page_number, quantity=DEFAULT_CARD_QUANTITY_INTERVAL)
 
 
+TCGCORNER_RARITY_DICT = {
+    "QSCR": "Quarter Century Secret Rare",
+    "N": "Common",
+    "R": "Rare",
+    "QCSR": "Quarter Century Secret Rare",
+    "SR": "Super Rare",
+    "HR": "Holographic Rare",
+    "UR": "Ultra Rare",
+    "EXSER": "Extra Secret Rare",
+    "CR": "Collector's Rare",
+    "SER": "Secret Rare",
+    "UL": "Ultimate Rare",
+    "P-SER": "Secret Parallel Rare"
+}
+
+TCGCORNER_SET_DICT = {
+    "RARITY COLLECTION - QUARTER CENTURY EDITION - (RC04)": "Rarity Collection Quarter Century Edition",
+    "AGOV": "Age of Overlord",
+    "CR03": "Creation Pack 03",
+    "LEDE-JP": "Legacy of Destruction",
+    "24PP": "Premium Pack 2024",
+    "Side Unity": "Quarter Century Chronicle side:Unity"
+}
+
+# Store-wide collections that say nothing about which set a card belongs to
+TCGCORNER_EXCLUDED_COLLECTIONS = ("Yu-Gi-Oh! Single Card (Asia English)", "All Single Card", "Featured Single Card",
+                                  "OP05", "FB01", "Yu-Gi-Oh! Single Card (Japanese)")
+
+# e.g. "RA03-JP001 Dark Magician (UR)" -> card code, card name, rarity
+TCGCORNER_TITLE_PATTERN = r"^(\w+-\w+) (.+) \((.+)\)"
+
+TCGCORNER_DTYPES = {
+    "set_card_name_combined": "string",
+    "set_name": "string",
+    "set_card_code_updated": "string",
+    "rarity_name": "category",
+    # The API's price as given, a decimal string, or 0 when a product has no variant,
+    # so the exports keep their values. Use pd.to_numeric for arithmetic.
+    "price": object,
+    "region": "category",
+}
+
+
 def replace_card_rarity_name(tcgcorner_rarity: str):
-    rarity_dict = {
-        "QSCR": "Quarter Century Secret Rare",
-        "N": "Common",
-        "R": "Rare",
-        "QCSR": "Quarter Century Secret Rare",
-        "SR": "Super Rare",
-        "HR": "Holographic Rare",
-        "UR": "Ultra Rare",
-        "EXSER": "Extra Secret Rare",
-        "CR": "Collector's Rare",
-        "SER": "Secret Rare",
-        "UL": "Ultimate Rare",
-        "P-SER": "Secret Parallel Rare"
-    }
-
-    if tcgcorner_rarity in rarity_dict:
-        return rarity_dict[tcgcorner_rarity]
-    else:
-        return tcgcorner_rarity
+    return TCGCORNER_RARITY_DICT.get(tcgcorner_rarity, tcgcorner_rarity)
 
 
 def replace_tcgcorner_set_name(set_name: str | None):
-    set_dict = {
-        "RARITY COLLECTION - QUARTER CENTURY EDITION - (RC04)": "Rarity Collection Quarter Century Edition",
-        "AGOV": "Age of Overlord",
-        "CR03": "Creation Pack 03",
-        "LEDE-JP": "Legacy of Destruction",
-        "24PP": "Premium Pack 2024",
-        "Side Unity": "Quarter Century Chronicle side:Unity"
-    }
-    if set_name in set_dict:
-        return set_dict[set_name]
-    else:
-        return set_name
+    return TCGCORNER_SET_DICT.get(set_name, set_name) if set_name is not None else None
 
 
 def check_region(set_card_code_updated: str | None):
@@ -72,119 +89,160 @@ def check_region(set_card_code_updated: str | None):
     return None
 
 
-def tcgcorner_scrape_per_page(page_number=1) -> tuple[list[dict], int]:
-    # API endpoint
-    tcg_array: list[dict] = []
+def normalize_tcgcorner_products(products: list[dict]) -> pd.DataFrame:
+    """
+    Turns raw TCG Corner products into card price rows with column-wise string operations.
+
+    The title split, collection filter, set/rarity mapping and region detection each run
+    once over the whole batch, which can be one page or every page of a scrape.
+
+    Args:
+        products (list[dict]): Products as returned under 'products' by the filter API.
+
+    Returns:
+        pd.DataFrame: One row per product with a well-formed title, typed as TCGCORNER_DTYPES.
+    """
+    titles = pd.Series([item['title'] for item in products], dtype="string")
+    prices = pd.Series([item['variants'][0]['price'] if isinstance(item['variants'], list) and item['variants'] else 0
+                        for item in products], dtype=object)
+
+    # First collection of each product that is not a store-wide one
+    collections = pd.DataFrame([(index, collection['title']) for index, item in enumerate(products)
+                                for collection in item['collections']], columns=['index', 'title'])
+    collections = collections[~collections['title'].isin(
+        TCGCORNER_EXCLUDED_COLLECTIONS)]
+    card_sets = collections.drop_duplicates('index').set_index('index')[
+        'title'].reindex(range(len(products))).astype("string")
+
+    parts = titles.str.extract(TCGCORNER_TITLE_PATTERN)
+    is_match = parts[0].notna()
+    for title in titles[~is_match]:
+        logging.info(f"Title format mismatch: {title}")
+
+    card_codes = parts.loc[is_match, 0]
+    region = pd.Series(pd.NA, index=card_codes.index, dtype=object)
+    region[card_codes.str.contains("JP", regex=False)] = "JP"
+    region[card_codes.str.contains("AE", regex=False)] = "AE"
+
+    df = pd.DataFrame({
+        "set_card_name_combined": parts.loc[is_match, 1],
+        "set_name": card_sets[is_match].replace(TCGCORNER_SET_DICT),
+        "set_card_code_updated": card_codes,
+        "rarity_name": parts.loc[is_match, 2].replace(TCGCORNER_RARITY_DICT),
+        "price": prices[is_match],
+        "region": region,
+    })
+    return df.astype(TCGCORNER_DTYPES).reset_index(drop=True)
+
+
+def df_to_records(df: pd.DataFrame) -> list[dict]:
+    """
+    Converts a DataFrame into a list of dicts, with missing values as None.
+    """
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def fetch_tcgcorner_page(page_number: int) -> dict:
+    """
+    Fetches one page of the TCG Corner product filter API, retrying transient failures.
+
+    Args:
+        page_number (int): Page to fetch, starting at 1.
+
+    Returns:
+        dict: The decoded page, with 'products' and 'pagination'.
+
+    Raises:
+        requests.RequestException: If the page still fails after the retries.
+    """
     tcgcorner_url = get_tcgcorner_url(page_number)
-    # Make the API call
-    response = requests.get(tcgcorner_url, timeout=10)
-    data = response.json()
-    pagination_data = data['pagination']
-    last_page = pagination_data['last_page']
-
-    # Regular expression to split the title
-    # title_regex_1 = r"(\w+-\w+)\s+(.*?)\s+\((\w+)\)"
-    title_regex_1 = r"(\w+-\w+) (.+) \((.+)\)"
-
-    # Process each product
-    for item in data['products']:
-        obj = {}
-        title: str = item['title']
-        price: int | float = item['variants'][0]['price'] if isinstance(item['variants'], list) and len(
-            item['variants']) > 0 else 0
-        # Concatenate all collection names
-        card_sets = [collection['title'] for collection in item['collections'] if collection['title'] not in (
-            "Yu-Gi-Oh! Single Card (Asia English)", "All Single Card", "Featured Single Card", "OP05", "FB01", "Yu-Gi-Oh! Single Card (Japanese)")]
-        card_set: str | None = card_sets[0] if card_sets else None
-        match = re.match(title_regex_1, title)
-
-        if match:
-            card_code, card_name, rarity = match.groups()
-            # Write the data to the CSV file
-            obj['set_card_name_combined'] = card_name
-            obj['set_name'] = replace_tcgcorner_set_name(card_set)
-            obj['set_card_code_updated'] = card_code
-            obj['rarity_name'] = replace_card_rarity_name(rarity)
-            obj['price'] = price
-            obj['region'] = check_region(set_card_code_updated=card_code)
-            tcg_array.append(obj.copy())
-        else:
-            logging.info(f"Title format mismatch: {title}")
-
-    return tcg_array, last_page
-
-
-def dict_to_json(filename: str, data_array: list[dict], method="LOCAL"):
-    # Open the JSON file for writing
-    if method == "LOCAL":
-        filename = f"./{filename}"
-        with open(filename, 'w') as file:
-            # Convert the list of dictionaries to JSON and save it to the file
-            json.dump(data_array, file, indent=4)
-    if method == "S3":
-        # Convert the list of dictionaries to JSON
-        json_str = json.dumps(data_array, indent=4)
-        # Load the JSON string into an in-memory buffer
-        json_buffer = StringIO(json_str)
-
-        # Save the JSON data to a file in S3
-        save_to_s3(BUCKET_NAME, filename, json_buffer, file_type="json")
-
-        logging.info("JSON file has been created.")
-
-
-def dict_to_csv(filename: str, data_array: list[dict], method="LOCAL"):
-    # Create a DictWriter object, specifying the fieldnames (column headers)
-    if method == "LOCAL":
-        filename = f"./{filename}"
-        with open(filename, mode='w', newline='', encoding='utf-8') as file:
-            fieldnames = []
-            if len(data_array) == 0:
-                pass
-
-            fieldnames = data_array[0].keys()
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            # Write the header (column names)
-            writer.writeheader()
-
-            # Write the rows using the dictionaries
-            for row in data_array:
-                writer.writerow(row)
-
-            logging.info("CSV file has been created.")
-    if method == "S3":
-        # Create an in-memory string buffer
-        csv_buffer = StringIO()
-
-        # Create a csv writer object
-        writer = csv.DictWriter(csv_buffer, fieldnames=data_array[0].keys())
-        # Write the header and data to the buffer
-        writer.writeheader()
-        for row in data_array:
-            writer.writerow(row)
-
-        # Reset the buffer position to the beginning
-        csv_buffer.seek(0)
-        save_to_s3(BUCKET_NAME, filename, csv_buffer, file_type="csv")
+    response = run_request_until_response(tcgcorner_url)
+    if response is None:
+        raise requests.ConnectionError(f"No response from {tcgcorner_url}")
+    response.raise_for_status()
+    return response.json()
 
 
-def get_card_prices() -> list[dict[str, str | float | bool | None]]:
-    card_price_array: list[dict[str, str | float | bool | None]] = []
-    tcg_array_per_page, last_page = tcgcorner_scrape_per_page(1)
-    card_price_array.extend(tcg_array_per_page)
+def parse_tcgcorner_page(data: dict) -> list[dict]:
+    """
+    Extracts card prices from one decoded page of the TCG Corner product filter API.
+    """
+    return df_to_records(normalize_tcgcorner_products(data['products']))
+
+
+def tcgcorner_scrape_per_page(page_number=1) -> tuple[list[dict], int]:
+    data = fetch_tcgcorner_page(page_number)
+    return parse_tcgcorner_page(data), data['pagination']['last_page']
 
-    for page_number in range(2, last_page + 1):
-        tcg_array_per_page, last_page = tcgcorner_scrape_per_page(page_number)
-        card_price_array.extend(tcg_array_per_page)
-    return card_price_array
 
+def get_card_prices_df() -> pd.DataFrame:
+    """
+    Fetches card prices from every TCG Corner page, in page order.
 
-def tcgcorner_scrape():
-    card_prices = get_card_prices()
+    Page 1 gives the last page number; pages 2..N are then fetched concurrently within
+    the adaptive host limit, each retried on transient failures. All products are
+    normalized together in one batch.
+
+    Returns:
+        pd.DataFrame: Card prices of all pages, typed as TCGCORNER_DTYPES.
+    """
+    limiter = get_host_limiter(urlparse(get_tcgcorner_url(1)).netloc)
+    first_page = fetch_tcgcorner_page(1)
+    products: list[dict] = list(first_page['products'])
 
-    csv_name = 'tcgcorner_pricing.csv'
-    json_name = 'tcgcorner_pricing.json'
-    dict_to_csv(csv_name, card_prices, "LOCAL")
-    dict_to_json(json_name, card_prices, "LOCAL")
-    dict_to_csv(csv_name, card_prices, "S3")
-    dict_to_json(json_name, card_prices, "S3")
+    # executor.map yields pages in order, whichever finishes first
+    with ThreadPoolExecutor(limiter.max_limit) as executor:
+        for data in executor.map(fetch_tcgcorner_page, range(2, first_page['pagination']['last_page'] + 1)):
+            products.extend(data['products'])
+    limiter.log_summary()
+    return normalize_tcgcorner_products(products)
+
+
+def get_card_prices() -> list[dict[str, str | float | bool | None]]:
+    """
+    Fetches card prices from every TCG Corner page as a list of dicts, in page order.
+    """
+    return df_to_records(get_card_prices_df())
+
+
+def tcgcorner_scrape(compact: bool = False, compression: Optional[str] = None):
+    """
+    Scrapes TCG Corner prices and exports them as CSV and JSON, locally and to S3.
+
+    Each format is rendered once and the same bytes are written to both destinations.
+    tcgcorner_pricing.csv and tcgcorner_pricing.json are written the same way whatever
+    the options: the JSON indented with escaped non-ASCII characters as before, and the
+    CSV with the same columns and values (with '\n' line endings, like the other CSV
+    exports). The options only add files next to them.
+
+    Args:
+        compact (bool): Also write the JSON without indentation or escaped non-ASCII
+            characters, as tcgcorner_pricing.min.json.
+        compression (str, optional): 'gzip' or 'zstd' to also write compressed copies,
+            named with a '.gz' or '.zst' suffix.
+    """
+    card_prices = get_card_prices_df()
+
+    variants: list[tuple[str, Optional[str]]] = [("", None)]
+    if compression is not None:
+        variants.append((COMPRESSION_SUFFIXES[compression], compression))
+
+    sinks = []
+    for suffix, variant_compression in variants:
+        csv_name = f'tcgcorner_pricing.csv{suffix}'
+        json_name = f'tcgcorner_pricing.json{suffix}'
+        sinks += [
+            LocalFileSink(f"./{csv_name}", file_format="csv", compression=variant_compression),
+            LocalFileSink(f"./{json_name}", file_format="json", compression=variant_compression),
+            S3Sink(csv_name, BUCKET_NAME, file_format="csv", compression=variant_compression),
+            S3Sink(json_name, BUCKET_NAME, file_format="json", compression=variant_compression),
+        ]
+        if compact:
+            compact_json_name = f'tcgcorner_pricing.min.json{suffix}'
+            sinks += [
+                LocalFileSink(f"./{compact_json_name}", file_format="json", compact=True,
+                              compression=variant_compression),
+                S3Sink(compact_json_name, BUCKET_NAME, file_format="json", compact=True,
+                       compression=variant_compression),
+            ]
+    write_to_sinks([(card_prices, sinks)])
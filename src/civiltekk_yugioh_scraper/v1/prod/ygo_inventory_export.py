@@ -1,18 +1,31 @@
+import os
+import numpy as np
 import pandas as pd
 import datetime
+import re
+import time
+import unicodedata
 from sqlalchemy import text
 import logging
 import requests
 from concurrent.futures import ThreadPoolExecutor
 import concurrent.futures
 import csv
-from typing import cast, List, Dict
-
-from ..models.ygo_models import TekkxProductData
-from .tcgcorner_scraper import get_card_prices
-from ..utilities.aws_utilities import retrieve_data_from_db_to_df, get_engine_for_tekkx_scalable_db, save_df_to_mysql
+from typing import cast, Iterable, Iterator, List, Dict, Optional, Sequence
+
+from ..models.ygo_models import INVENTORY_KEY_COLUMNS, TekkxProductData, cols as TEKKX_PRODUCT_COLS
+from .tcgcorner_scraper import TCGCORNER_DTYPES, df_to_records, get_card_prices_df
+from ..utilities.aws_utilities import iter_data_from_db, retrieve_data_from_db_to_df, get_engine_for_tekkx_scalable_db, save_df_to_mysql
+from ..utilities.cache_utilities import PYARROW_AVAILABLE, load_json_cache, save_json_cache, get_snapshot_path, read_snapshot_metadata, read_table_snapshot, write_table_snapshot
+from ..utilities.concurrency_utilities import adaptive_get, get_host_limiter
+from ..utilities.excel_utilities import read_excel_streaming, write_excel_workbooks
+from ..utilities.inventory_utilities import compact_inventory_df, concat_inventory_frames, get_inventory_dtypes
 from ..utilities.misc_utilities import get_file_path, split
-from ..config import HEADERS, TABLE_YUGIOH_OVERALL_CARD_CODE_LISTS, MEDIAWIKI_URL, TEKKX_SCALABLE_DB_NAME
+from ..config import HEADERS, TABLE_YUGIOH_OVERALL_CARD_CODE_LISTS, MEDIAWIKI_URL, TEKKX_SCALABLE_DB_NAME, DEFAULT_DB_CHUNKSIZE, PAGE_CACHE_DIR, REDIRECT_CACHE_TTL, REDIRECT_NEGATIVE_CACHE_TTL
+
+
+OVERALL_CARD_CODE_LIST_COLS = ['region', 'set_card_name_combined', 'set_name',
+                               'set_card_code_updated', 'rarity_name']
 
 
 def create_overall_card_code_list() -> pd.DataFrame:
@@ -23,17 +36,120 @@ def create_overall_card_code_list() -> pd.DataFrame:
         pd.DataFrame: A processed DataFrame of card codes with selected columns and initialized quantities.
     """
     try:
+        cols = OVERALL_CARD_CODE_LIST_COLS
         df = retrieve_data_from_db_to_df(
-            TABLE_YUGIOH_OVERALL_CARD_CODE_LISTS, db_name="yugioh_data")
+            TABLE_YUGIOH_OVERALL_CARD_CODE_LISTS, db_name="yugioh_data", columns=cols,
+            dtype=get_inventory_dtypes(cols))
         df['quantity'] = None
-        cols = ['region', 'set_card_name_combined', 'set_name',
-                'set_card_code_updated', 'rarity_name', 'quantity']
-        return df[cols]
+        return df[cols + ['quantity']]
     except Exception as e:
         logging.error(f"Error fetching and processing card code list: {e}")
         return pd.DataFrame()
 
 
+def iter_overall_card_code_list(chunksize: int = DEFAULT_DB_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+    """
+    Streams the overall card code list from a server-side cursor, in the same shape
+    as ``create_overall_card_code_list``.
+
+    Yields:
+        pd.DataFrame: Chunks of at most ``chunksize`` card codes with an empty quantity.
+    """
+    for chunk in iter_data_from_db(TABLE_YUGIOH_OVERALL_CARD_CODE_LISTS, db_name="yugioh_data",
+                                   columns=OVERALL_CARD_CODE_LIST_COLS,
+                                   dtype=get_inventory_dtypes(OVERALL_CARD_CODE_LIST_COLS), chunksize=chunksize):
+        chunk['quantity'] = None
+        yield chunk
+
+
+WEBSITE_PRODUCT_CACHE_TABLE = "wc_products"
+
+# Products are titled "code | name | rarity | set | region"; the title is split in SQL
+WEBSITE_PRODUCT_TITLE_FILTER = """
+    p.post_type = 'product'
+    AND CHAR_LENGTH(p.post_title) - CHAR_LENGTH(REPLACE(p.post_title, '|', '')) = 4
+"""
+
+WEBSITE_PRODUCTS_SQL = f"""
+    SELECT p.ID AS product_id, p.post_title, p.post_name, p.post_modified_gmt,
+           TRIM(SUBSTRING_INDEX(p.post_title, '|', 1)) AS set_card_code_updated,
+           TRIM(SUBSTRING_INDEX(SUBSTRING_INDEX(p.post_title, '|', 2), '|', -1)) AS set_card_name_combined,
+           TRIM(SUBSTRING_INDEX(SUBSTRING_INDEX(p.post_title, '|', 3), '|', -1)) AS rarity_name,
+           TRIM(SUBSTRING_INDEX(SUBSTRING_INDEX(p.post_title, '|', 4), '|', -1)) AS set_name,
+           TRIM(SUBSTRING_INDEX(p.post_title, '|', -1)) AS region
+    FROM wp_posts p
+    WHERE {WEBSITE_PRODUCT_TITLE_FILTER}
+"""
+
+# Stock and price changes from orders do not bump post_modified, so they are
+# re-read on every pull. This is also how deleted products drop out of the cache.
+WEBSITE_PRODUCT_STOCK_SQL = f"""
+    SELECT p.ID AS product_id, COALESCE(m.stock_quantity, 0) AS quantity, m.max_price AS price
+    FROM wp_posts p
+    LEFT JOIN wp_wc_product_meta_lookup m ON m.product_id = p.ID
+    WHERE {WEBSITE_PRODUCT_TITLE_FILTER}
+"""
+
+
+def load_website_products(is_incremental: bool = True) -> pd.DataFrame:
+    """
+    Loads WooCommerce products with their title fields, stock and price.
+
+    Titles are split and joined to the product meta lookup in SQL. When pyarrow is
+    available, the parsed products are kept in a local snapshot and only products
+    modified since the last pull are fetched again.
+
+    Args:
+        is_incremental (bool): Reuse the local product snapshot. A full pull is done
+            when False or when no snapshot exists yet.
+
+    Returns:
+        pd.DataFrame: Products with the TekkxProductData columns and a 'duplicated' flag.
+    """
+    start = datetime.datetime.now()
+    snapshot_path = get_snapshot_path(
+        WEBSITE_PRODUCT_CACHE_TABLE, TEKKX_SCALABLE_DB_NAME)
+    df_cached = pd.DataFrame()
+    since = None
+    if is_incremental and PYARROW_AVAILABLE and os.path.exists(snapshot_path):
+        df_cached = read_table_snapshot(snapshot_path)
+        since = read_snapshot_metadata(snapshot_path).get("fingerprint")
+
+    _, engine = get_engine_for_tekkx_scalable_db(
+        db_name=TEKKX_SCALABLE_DB_NAME)
+    with engine.begin() as conn:
+        if since:
+            df_changed = pd.read_sql_query(
+                sql=text(WEBSITE_PRODUCTS_SQL +
+                         " AND p.post_modified_gmt >= :since"),
+                con=conn, params={"since": since})
+        else:
+            df_changed = pd.read_sql_query(
+                sql=text(WEBSITE_PRODUCTS_SQL), con=conn)
+        df_stock = pd.read_sql_query(
+            sql=text(WEBSITE_PRODUCT_STOCK_SQL), con=conn)
+    logging.info(
+        f"Pulled {len(df_changed)} changed products since {since or 'the beginning'}")
+
+    df_products = pd.concat([df_cached, df_changed], ignore_index=True).drop_duplicates(
+        subset=['product_id'], keep='last')
+    df_products = df_products[df_products['product_id'].isin(
+        df_stock['product_id'])].sort_values('product_id', ignore_index=True)
+
+    if PYARROW_AVAILABLE and not df_products.empty:
+        watermark = str(df_products['post_modified_gmt'].max())
+        write_table_snapshot(df_products, snapshot_path, watermark)
+
+    df = pd.merge(df_products, df_stock, on='product_id', how='left')
+    df['quantity'] = df['quantity'].fillna(0).astype('int64')
+    df = df[TEKKX_PRODUCT_COLS]
+    df['duplicated'] = df.duplicated(
+        subset=['set_card_code_updated', 'set_name', 'rarity_name', 'post_title'], keep='last')
+
+    logging.info(f"Data retrieval time: {datetime.datetime.now() - start}")
+    return df
+
+
 def retrieve_website_data() -> pd.DataFrame:
     """
     Retrieves product data from the WordPress database and processes it.
@@ -41,44 +157,8 @@ def retrieve_website_data() -> pd.DataFrame:
     Returns:
         pd.DataFrame: A DataFrame containing merged and formatted product data.
     """
-    start = datetime.datetime.now()
     try:
-        _, engine = get_engine_for_tekkx_scalable_db(
-            db_name=TEKKX_SCALABLE_DB_NAME)
-        with engine.begin() as conn:
-            df_posts = pd.read_sql_query(
-                sql=text("""
-                    SELECT id AS product_id, post_title, post_type, post_mime_type, post_name
-                    FROM wp_posts WHERE post_type IN ('product')
-                """), con=conn
-            )
-            df_product_meta = pd.read_sql_query(
-                sql=text("""
-                    SELECT product_id, stock_quantity AS quantity, max_price AS price
-                    FROM wp_wc_product_meta_lookup
-                """), con=conn
-            )
-
-        df_product_meta['quantity'] = df_product_meta['quantity'].fillna(0)
-        split_cols = df_posts['post_title'].str.split(r'\s*\|\s*', expand=True)
-        df_posts['set_card_code_updated'] = split_cols[0]
-        df_posts['set_card_name_combined'] = split_cols[1]
-        df_posts['rarity_name'] = split_cols[2]
-        df_posts['set_name'] = split_cols[3]
-        df_posts['region'] = split_cols[4]
-
-        df = pd.merge(df_posts, df_product_meta, on='product_id', how='left')
-        df = df.dropna(subset=['set_card_name_combined'])
-        df['quantity'] = df['quantity'].fillna(0).astype('int64')
-
-        cols = ["region", "set_card_name_combined", "set_name", "set_card_code_updated",
-                "rarity_name", "quantity", "price", "post_name", "post_title"]
-        df = df[cols]
-        df['duplicated'] = df.duplicated(
-            subset=['set_card_code_updated', 'set_name', 'rarity_name', 'post_title'], keep='last')
-
-        logging.info(f"Data retrieval time: {datetime.datetime.now() - start}")
-        return df
+        return load_website_products()
     except Exception as e:
         logging.error(f"Error retrieving and processing website data: {e}")
         return pd.DataFrame()
@@ -91,128 +171,153 @@ def retrieve_website_data_to_list_of_dict() -> List[TekkxProductData]:
     Returns:
         List[TekkxProductData]: List of product data as dictionaries.
     """
-    list_of_results: List[TekkxProductData] = []
-    start = datetime.datetime.now()
-
     try:
-        _, engine = get_engine_for_tekkx_scalable_db(
-            db_name=TEKKX_SCALABLE_DB_NAME)
-        with engine.begin() as conn:
-            df_posts = pd.read_sql_query(
-                sql=text("""
-                    SELECT id AS product_id, post_title, post_type, post_mime_type, post_name
-                    FROM wp_posts WHERE post_type IN ('product')
-                """), con=conn
-            )
-            df_product_meta = pd.read_sql_query(
-                sql=text("""
-                    SELECT product_id, stock_quantity AS quantity, max_price AS price
-                    FROM wp_wc_product_meta_lookup
-                """), con=conn
-            )
-
-        df_product_meta['quantity'] = df_product_meta['quantity'].fillna(0)
-        df_posts = df_posts[df_posts['post_title'].str.count(r'\|') == 4]
-        split_cols = df_posts['post_title'].str.split(r'\s*\|\s*', expand=True)
-        df_posts['set_card_code_updated'] = split_cols[0]
-        df_posts['set_card_name_combined'] = split_cols[1]
-        df_posts['rarity_name'] = split_cols[2]
-        df_posts['set_name'] = split_cols[3]
-        df_posts['region'] = split_cols[4]
-
-        df = pd.merge(df_posts, df_product_meta, on='product_id', how='left')
-        df = df.dropna(subset=['set_card_name_combined'])
-        cols = ["region", "set_card_name_combined", "set_name", "set_card_code_updated",
-                "rarity_name", "quantity", "price", "post_name", "post_title"]
-        df = df[cols]
-        df['quantity'] = df['quantity'].fillna(0).astype('int64')
-
-        df['duplicated'] = df.duplicated(
-            subset=['set_card_code_updated', 'set_name', 'rarity_name', 'post_title'], keep='last')
-        logging.info(f"Data retrieval time: {datetime.datetime.now() - start}")
-
-        return cast(List[TekkxProductData], df.to_dict(orient="records"))
+        return cast(List[TekkxProductData], load_website_products().to_dict(orient="records"))
     except Exception as e:
         logging.error(f"Error retrieving and processing website data: {e}")
-        return list_of_results
+        return []
+
+
+REDIRECT_CACHE_PATH = os.path.join(PAGE_CACHE_DIR, "yugipedia_redirects.json")
+REDIRECT_BATCH_SIZE = 50
+
+
+def is_redirect_entry_fresh(entry: dict, now: float) -> bool:
+    """
+    Whether a cached redirect lookup is still within its TTL. Lookups that found no
+    redirect use the shorter negative TTL.
+    """
+    ttl = REDIRECT_CACHE_TTL if entry.get("to") else REDIRECT_NEGATIVE_CACHE_TTL
+    return now - entry.get("checked_at", 0) < ttl
 
 
-def check_existing_card_names_to_update(card_name_list: list[str]) -> dict:
+def check_existing_card_names_to_update(card_name_list: Iterable[str], use_cache: bool = True) -> dict:
     """
     Checks for existing card names and updates their mappings using concurrent threads.
 
+    Names are deduplicated first. Lookups are kept in a local cache at
+    REDIRECT_CACHE_PATH, including names that do not redirect, so only names that are
+    new or past their TTL are sent to the Yugipedia API.
+
     Args:
-        card_name_list (list[str]): List of card names to check for updates.
+        card_name_list (Iterable[str]): Card names to check for updates.
+        use_cache (bool): Read cached lookups. When False every name is queried again,
+            and the results still refresh the cache.
 
     Returns:
         dict: A dictionary mapping old card names to new card names.
     """
-    redirect_dict = {}
     try:
-        list_of_split_card_name_list = list(split(card_name_list, 50))
-
-        with ThreadPoolExecutor(max_workers=8) as executor:
-            futures = [executor.submit(check_for_redirect, split_list)
-                       for split_list in list_of_split_card_name_list]
-            for future in concurrent.futures.as_completed(futures):
-                redirect_dict.update(future.result())
-
-        return redirect_dict
+        now = time.time()
+        card_names = list(dict.fromkeys(
+            name for name in card_name_list if isinstance(name, str) and name))
+        cache: dict[str, dict] = load_json_cache(REDIRECT_CACHE_PATH)
+        names_to_query = [name for name in card_names if not (
+            use_cache and name in cache and is_redirect_entry_fresh(cache[name], now))]
+        logging.info(
+            f"Checking redirects for {len(names_to_query)} of {len(card_names)} card names")
+
+        if names_to_query:
+            limiter = get_host_limiter("yugipedia.com")
+            with ThreadPoolExecutor(max_workers=limiter.max_limit) as executor:
+                futures = {executor.submit(fetch_redirects, split_list): split_list
+                           for split_list in split(names_to_query, REDIRECT_BATCH_SIZE)}
+                for future in concurrent.futures.as_completed(futures):
+                    try:
+                        redirects = future.result()
+                    except Exception as e:
+                        # Not cached, so these names are retried on the next run
+                        logging.warning(
+                            f"Redirect check failed for {len(futures[future])} card names: {e}")
+                        continue
+                    for name in futures[future]:
+                        cache[name] = {"to": redirects.get(
+                            name), "checked_at": now}
+            limiter.log_summary()
+
+            cache = {name: entry for name, entry in cache.items()
+                     if is_redirect_entry_fresh(entry, now)}
+            save_json_cache(cache, REDIRECT_CACHE_PATH)
+
+        return {name: cache[name]["to"] for name in card_names
+                if name in cache and cache[name].get("to")}
     except Exception as e:
         logging.error(f"Error checking and updating card names: {e}")
         return {}
 
 
-def check_for_redirect(list_of_card_names: list[str]) -> dict:
+def fetch_redirects(list_of_card_names: list[str]) -> dict:
     """
-    Checks for redirects for a list of card names using the Yugipedia API.
+    Queries the Yugipedia API for the redirects of up to 50 card names.
 
     Args:
-        list_of_card_names (list[str]): List of card names to check for redirects.
+        list_of_card_names (list[str]): Card names to check for redirects.
 
     Returns:
         dict: A dictionary mapping old card names to redirected card names.
+
+    Raises:
+        requests.RequestException: If a request fails or returns invalid JSON.
     """
     redirect_dict = {}
-    card_list_string = "|".join(list_of_card_names)
-
     obj = {
         "action": "query",
         "format": "json",
         "prop": "redirects",
-        "titles": card_list_string,
+        "titles": "|".join(list_of_card_names),
         "redirects": 1,
         "rdlimit": "500"
     }
 
-    try:
-        res_json = requests.get(
-            url=MEDIAWIKI_URL, headers=HEADERS, params=obj, timeout=60).json()
-        res_json_query_obj: dict = res_json.get("query", {})
+    while True:
+        response = adaptive_get(
+            MEDIAWIKI_URL, headers=HEADERS, params=obj, timeout=60)
+        response.raise_for_status()
+        res_json = response.json()
+
+        for item in res_json.get("query", {}).get("redirects", []):
+            redirect_dict[item["from"]] = item["to"]
 
-        if "redirects" in res_json_query_obj:
-            for item in res_json_query_obj["redirects"]:
-                redirect_dict[item["from"]] = item["to"]
+        if "continue" not in res_json:
+            return redirect_dict
+        obj.update(res_json["continue"])
 
-        while "continue" in res_json:
-            obj["rdcontinue"] = res_json["continue"].get("rdcontinue", "")
-            res_json = requests.get(
-                url=MEDIAWIKI_URL, headers=HEADERS, params=obj, timeout=60).json()
-            res_json_query_obj = res_json.get("query", {})
 
-            if "redirects" in res_json_query_obj:
-                for item in res_json_query_obj["redirects"]:
-                    redirect_dict[item["from"]] = item["to"]
+def check_for_redirect(list_of_card_names: list[str]) -> dict:
+    """
+    Checks for redirects for a list of card names using the Yugipedia API.
+
+    Args:
+        list_of_card_names (list[str]): List of card names to check for redirects.
 
-        return redirect_dict
-    except requests.exceptions.JSONDecodeError as e:
-        logging.error(f"JSONDecodeError in check_for_redirect: {e}")
-        return redirect_dict
+    Returns:
+        dict: A dictionary mapping old card names to redirected card names, empty if
+        the lookup failed.
+    """
+    try:
+        return fetch_redirects(list_of_card_names)
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Error in check_for_redirect: {e}")
+        return {}
 
 
-def export_inventory_excel_v2(is_check_existing_names: bool = True, is_to_save_to_mysql: bool = False):
+def export_inventory_excel_v2(is_check_existing_names: bool = True, is_to_save_to_mysql: bool = False,
+                              is_stream_overall: bool = False):
     """
     Combines website and database inventory data, handles card name redirections, and exports to Excel.
+
+    Both workbooks are written concurrently in constant-memory mode.
+
+    Args:
+        is_check_existing_names (bool): Map card names that redirect on Yugipedia.
+        is_to_save_to_mysql (bool): Replace the ygo_inventory_data table with the result.
+        is_stream_overall (bool): Stream the overall card code list from the database
+            straight into its workbook. It is then never held in memory, and None is
+            returned in its place, so only callers that ignore it should turn this on.
+
+    Returns:
+        tuple: The website, overall card code list, combined and Asian-English
+        DataFrames, or None if the export failed.
     """
     try:
         df_website = pd.DataFrame()
@@ -221,46 +326,39 @@ def export_inventory_excel_v2(is_check_existing_names: bool = True, is_to_save_t
             "OverallCardCodeList-2.xlsx")
 
         try:
-            _, engine = get_engine_for_tekkx_scalable_db(db_name="yugioh_data")
-            df_asian_english = pd.read_sql(
-                "SELECT * FROM ygo_inventory_data WHERE region = 'Asian-English'", engine)
+            df_asian_english = compact_inventory_df(retrieve_data_from_db_to_df(
+                "ygo_inventory_data", db_name="yugioh_data", where={"region": "Asian-English"}))
         except Exception as e:
             logging.warning(f"No Asian-English records found: {e}")
             df_asian_english = pd.DataFrame()
 
-        df_website = pd.DataFrame(retrieve_website_data_to_list_of_dict())
-        card_name_list = df_website["set_card_name_combined"].tolist()
+        df_website = compact_inventory_df(retrieve_website_data())
+        card_name_list = df_website["set_card_name_combined"].unique().tolist()
         if is_check_existing_names:
             dict_to_map = check_existing_card_names_to_update(card_name_list)
 
             if dict_to_map:
-                df_website = pd.merge(
-                    df_website,
-                    pd.DataFrame([{"name": k, "new name": v}
-                                  for k, v in dict_to_map.items()]),
-                    how="left",
-                    left_on="set_card_name_combined",
-                    right_on="name"
-                ).drop(columns=['name'])
-
-        df_combined = pd.concat(
-            [df_website, df_asian_english], ignore_index=True)
-
-        # Drop duplicates based on specified columns, keeping the last occurrence
+                # A lookup instead of a merge keeps the compact dtype of the name column
+                name_column = df_website["set_card_name_combined"]
+                df_website["new name"] = name_column.map(
+                    dict_to_map).astype(name_column.dtype)
+
+        df_combined = concat_inventory_frames([df_website, df_asian_english])
+
+        # Drop duplicates based on the inventory key, keeping the first occurrence
         df_combined = df_combined.drop_duplicates(
-            subset=["region", "set_card_name_combined", "set_name",
-                    "set_card_code_updated", "rarity_name"],
-            keep='first'
-        )
+            subset=INVENTORY_KEY_COLUMNS, keep='first')
 
-        df_overall = create_overall_card_code_list()
+        df_overall = None if is_stream_overall else create_overall_card_code_list()
 
+        excel_jobs = []
         if ygo_inventory_export_path:
-            with pd.ExcelWriter(ygo_inventory_export_path, engine='xlsxwriter') as writer:
-                df_combined.to_excel(writer, sheet_name="V2", index=False)
+            excel_jobs.append((ygo_inventory_export_path, df_combined, "V2"))
         if ygo_overall_card_list_export_path:
-            with pd.ExcelWriter(ygo_overall_card_list_export_path, engine='xlsxwriter') as writer:
-                df_overall.to_excel(writer, sheet_name="Sheet1", index=False)
+            excel_jobs.append((ygo_overall_card_list_export_path,
+                               iter_overall_card_code_list() if df_overall is None else df_overall, "Sheet1"))
+        # The CSV sidecars let upload_inventory_main skip parsing the workbooks
+        write_excel_workbooks(excel_jobs, csv_sidecar=True)
         if is_to_save_to_mysql:
             save_df_to_mysql(
                 df_combined, table_name="ygo_inventory_data", if_exists="replace")
@@ -269,21 +367,334 @@ def export_inventory_excel_v2(is_check_existing_names: bool = True, is_to_save_t
         logging.error(f"Error exporting inventory to Excel: {e}")
 
 
+AE_PRICE_FUZZY_THRESHOLD = 0.8
+# Names of very different lengths are different cards, e.g. "Dark Magician" and "Dark Magician Girl"
+AE_PRICE_FUZZY_MIN_LENGTH_RATIO = 0.85
+NGRAM_SIZE = 3
+NON_WORD_PATTERN = re.compile(r"[^\w]+")
+# Below code point 128, \w matches exactly these once the text is lower-cased
+ASCII_WORD_BYTES = np.zeros(256, dtype=bool)
+ASCII_WORD_BYTES[list(b"abcdefghijklmnopqrstuvwxyz0123456789_")] = True
+VALUE_SEPARATOR = "\n"
+MATCH_KEY_COLUMNS = ['name', 'set', 'rarity', 'code']
+
+
+def normalize_ascii_values(values: Sequence[str]) -> list[str]:
+    """
+    ``normalize_match_values`` for ASCII values without VALUE_SEPARATOR, done on one
+    byte buffer of all values instead of value by value. NFKC leaves ASCII as it is and
+    case folding it is lower-casing, so only the punctuation and spaces need work.
+    """
+    chars = np.frombuffer(VALUE_SEPARATOR.join(values).encode("ascii"), dtype=np.uint8).copy()
+    chars[(chars >= ord("A")) & (chars <= ord("Z"))] += ord("a") - ord("A")
+    is_separator = chars == ord(VALUE_SEPARATOR)
+    is_space = ~ASCII_WORD_BYTES[chars] & ~is_separator
+    chars[is_space] = ord(" ")
+    # Drop spaces following a space or the start of a value, then the one space left at its end
+    keep = ~(is_space & np.concatenate([[True], is_space[:-1] | is_separator[:-1]]))
+    chars, is_space, is_separator = chars[keep], is_space[keep], is_separator[keep]
+    chars = chars[~(is_space & np.concatenate([is_separator[1:], [True]]))]
+    return chars.tobytes().decode("ascii").split(VALUE_SEPARATOR)
+
+
+def normalize_match_values(values: Sequence) -> list[str]:
+    """
+    Normalizes text for matching: NFKC, case-folded, punctuation removed and whitespace
+    collapsed. ASCII values are normalized together by ``normalize_ascii_values``.
+    """
+    values = list(map(str, values))
+    if not values:
+        return []
+    joined = VALUE_SEPARATOR.join(values)
+    if joined.isascii() and joined.count(VALUE_SEPARATOR) == len(values) - 1:
+        return normalize_ascii_values(values)
+
+    is_ascii = [value.isascii() and VALUE_SEPARATOR not in value for value in values]
+    ascii_normalized = iter(normalize_ascii_values(
+        [value for value, flag in zip(values, is_ascii) if flag]) if any(is_ascii) else [])
+    return [next(ascii_normalized) if flag else
+            NON_WORD_PATTERN.sub(" ", unicodedata.normalize("NFKC", value).casefold()).strip()
+            for value, flag in zip(values, is_ascii)]
+
+
+def get_composite_keys(codes: Sequence[np.ndarray]) -> np.ndarray:
+    """
+    One integer key per row for a tuple of factorized columns: equal tuples get equal
+    keys, and rows with a missing part (code -1) get -1. Keys are re-factorized after
+    each column so they stay below the row count and never overflow.
+    """
+    keys = np.zeros(len(codes[0]), dtype="int64")
+    is_missing = np.zeros(len(codes[0]), dtype=bool)
+    for column_codes in codes:
+        is_missing |= column_codes < 0
+        keys, _ = pd.factorize(keys * (int(column_codes.max(initial=0)) + 2) + column_codes + 1)
+    keys[is_missing] = -1
+    return keys
+
+
+def find_last_positions(left_keys: np.ndarray, right_keys: np.ndarray) -> np.ndarray:
+    """
+    For each left key, the position of the last right row with that key, or -1. Keys
+    of -1 never match.
+    """
+    is_last = ~pd.Series(right_keys).duplicated(keep='last').to_numpy() & (right_keys >= 0)
+    positions = np.flatnonzero(is_last)
+    if not len(positions):
+        return np.full(len(left_keys), -1, dtype="int64")
+    found = pd.Index(right_keys[positions]).get_indexer(left_keys)
+    return np.where((found >= 0) & (left_keys >= 0), positions[found], -1)
+
+
+def get_ngram_pairs(names: Sequence[str], n: int = NGRAM_SIZE) -> tuple[np.ndarray, np.ndarray]:
+    """
+    The character n-grams of each space-padded name, hashed, as (name position, hash)
+    pairs. Computed for all names at once over a fixed-width array of code points.
+    """
+    padded = [f" {name} " for name in names]
+    if not padded:
+        return np.empty(0, dtype="int64"), np.empty(0, dtype="int64")
+    array = np.array(padded, dtype=f"<U{max(max(map(len, padded)), n)}")
+    width = array.dtype.itemsize // 4
+    chars = array.view(np.uint32).reshape(len(array), width).astype("int64")
+    # Code points take at most 21 bits, so three fit in an int64
+    hashes = sum(chars[:, i:width - n + 1 + i] << (21 * (n - 1 - i)) for i in range(n))
+    lengths = np.fromiter(map(len, padded), dtype="int64", count=len(padded))
+    valid = np.arange(width - n + 1) < (lengths - n + 1)[:, None]
+    rows = np.broadcast_to(np.arange(len(array))[:, None], hashes.shape)[valid]
+    return rows, hashes[valid]
+
+
+def find_fuzzy_matches(query_names: Sequence[str], query_groups: np.ndarray, query_codes: np.ndarray,
+                       names: Sequence[str], groups: np.ndarray, codes: np.ndarray,
+                       threshold: float, min_length_ratio: float) -> np.ndarray:
+    """
+    For each query, the position of the name in the same group with the highest
+    trigram Jaccard similarity, or -1 if none qualifies.
+
+    Candidates need a similarity of at least ``threshold``, a name length ratio of at
+    least ``min_length_ratio``, and no card code that differs from the query's. Every
+    query is scored at once: shared trigrams are counted by joining the queries'
+    (group, trigram) keys against an inverted index of the names' keys.
+
+    Args:
+        query_names (Sequence[str]): Names to match.
+        query_groups (np.ndarray): Integer group of each query, e.g. its rarity and set.
+        query_codes (np.ndarray): Integer card code of each query, -1 when unknown.
+        names (Sequence[str]): Names to match against.
+        groups (np.ndarray): Integer group of each name, comparable to ``query_groups``.
+        codes (np.ndarray): Integer card code of each name, comparable to
+            ``query_codes``, -1 when unknown.
+        threshold (float): Minimum trigram similarity.
+        min_length_ratio (float): Minimum ratio of the shorter to the longer name length.
+
+    Returns:
+        np.ndarray: A position in ``names`` per query, or -1.
+    """
+    best = np.full(len(query_names), -1, dtype="int64")
+    query_rows, query_hashes = get_ngram_pairs(query_names)
+    rows, hashes = get_ngram_pairs(names)
+    if not len(query_rows) or not len(rows):
+        return best
+
+    ngram_ids = pd.factorize(np.concatenate([query_hashes, hashes]))[0]
+    query_ngram_ids, ngram_ids = ngram_ids[:len(query_hashes)], ngram_ids[len(query_hashes):]
+    ngram_count = int(max(query_ngram_ids.max(), ngram_ids.max())) + 1
+    # Distinct (row, trigram) pairs, so each trigram counts once per name
+    query_pairs = pd.unique(query_rows * ngram_count + query_ngram_ids)
+    query_rows, query_ngrams = np.divmod(query_pairs, ngram_count)
+    query_ngram_counts = np.bincount(query_rows, minlength=len(query_names))
+
+    # The inverted index: (group, trigram, row) keys in one sorted array, which also
+    # puts a name's repeated trigrams next to each other
+    index = np.sort((groups[rows] * ngram_count + ngram_ids) * len(names) + rows)
+    index = index[np.concatenate([[True], index[1:] != index[:-1]])]
+    keys, rows = np.divmod(index, len(names))
+    ngram_counts = np.bincount(rows, minlength=len(names))
+    query_keys = query_groups[query_rows] * ngram_count + query_ngrams
+    starts = np.searchsorted(keys, query_keys, side="left")
+    hit_counts = np.searchsorted(keys, query_keys, side="right") - starts
+    if not hit_counts.sum():
+        return best
+    hit_queries = np.repeat(query_rows, hit_counts)
+    hit_offsets = np.arange(hit_counts.sum()) - np.repeat(np.cumsum(hit_counts) - hit_counts, hit_counts)
+    hit_rows = rows[np.repeat(starts, hit_counts) + hit_offsets]
+
+    hits = np.sort(hit_queries * len(names) + hit_rows)
+    starts = np.flatnonzero(np.concatenate([[True], hits[1:] != hits[:-1]]))
+    candidates, shared = hits[starts], np.diff(np.append(starts, len(hits)))
+    candidate_queries, candidate_rows = np.divmod(candidates, len(names))
+    scores = shared / (query_ngram_counts[candidate_queries] + ngram_counts[candidate_rows] - shared)
+
+    query_lengths = np.fromiter(map(len, query_names), dtype="int64", count=len(query_names))
+    lengths = np.fromiter(map(len, names), dtype="int64", count=len(names))
+    shorter = np.minimum(query_lengths[candidate_queries], lengths[candidate_rows])
+    longer = np.maximum(query_lengths[candidate_queries], lengths[candidate_rows])
+    candidate_query_codes, candidate_codes = query_codes[candidate_queries], codes[candidate_rows]
+    is_code_conflict = (candidate_query_codes >= 0) & (candidate_codes >= 0) & (
+        candidate_query_codes != candidate_codes)
+    qualifies = (scores >= threshold) & (shorter >= min_length_ratio * longer) & ~is_code_conflict
+
+    candidate_queries, candidate_rows, scores = (
+        candidate_queries[qualifies], candidate_rows[qualifies], scores[qualifies])
+    # Best score first, then the earliest name, as the first candidate per query
+    order = np.lexsort((candidate_rows, -scores, candidate_queries))
+    matched_queries, first = np.unique(candidate_queries[order], return_index=True)
+    best[matched_queries] = candidate_rows[order][first]
+    return best
+
+
+def match_ae_prices(df_inventory: pd.DataFrame, df_card_prices: pd.DataFrame,
+                    fuzzy_threshold: float = AE_PRICE_FUZZY_THRESHOLD,
+                    fuzzy_min_length_ratio: float = AE_PRICE_FUZZY_MIN_LENGTH_RATIO) -> tuple[pd.DataFrame, dict]:
+    """
+    Matches inventory rows to vendor prices.
+
+    Rows are matched in four passes, each only over rows the previous ones missed:
+
+    1. 'exact': hash join on (card name, set name, rarity) as they are.
+    2. 'normalized': hash join on the same key after ``normalize_match_values``.
+    3. 'card_code': hash join on normalized (card code, rarity).
+    4. 'fuzzy': the price row of the same normalized set name and rarity whose card
+       name shares the most character trigrams (Jaccard similarity of at least
+       ``fuzzy_threshold``), see ``find_fuzzy_matches``. Names whose lengths differ by
+       more than ``fuzzy_min_length_ratio`` allows and rows with a different card code
+       are skipped. A price row in another set only matches through an equal card
+       code, in pass 3.
+
+    The last price wins on duplicate keys, as with the old dict lookup. Unmatched rows
+    get a price of 0, like before.
+
+    Each key column is factorized once and every pass joins on the integer codes.
+    Only the values of rows left after pass 1, and of the prices, are normalized.
+
+    Args:
+        df_inventory (pd.DataFrame): Inventory with card name, set name and 'rarity' or
+            'rarity_name', plus optionally 'set_card_code_updated'.
+        df_card_prices (pd.DataFrame): Prices as returned by ``get_card_prices_df``.
+        fuzzy_threshold (float): Minimum trigram similarity for a fuzzy match.
+        fuzzy_min_length_ratio (float): Minimum ratio of the shorter to the longer
+            normalized card name for a fuzzy match.
+
+    Returns:
+        tuple[pd.DataFrame, dict]: The inventory with 'price' and 'match_type' columns,
+        and match counts per pass.
+    """
+    df = df_inventory.reset_index(drop=True).copy()
+    rarity_column = 'rarity' if 'rarity' in df.columns else 'rarity_name'
+    has_code = 'set_card_code_updated' in df.columns
+    inventory_count = len(df)
+    inventory_keys = {
+        'name': df['set_card_name_combined'].to_numpy(dtype=object),
+        'set': df['set_name'].to_numpy(dtype=object),
+        'rarity': df[rarity_column].to_numpy(dtype=object),
+        'code': df['set_card_code_updated'].to_numpy(dtype=object) if has_code
+        else np.full(inventory_count, None, dtype=object),
+    }
+    price_keys = {
+        'name': df_card_prices['set_card_name_combined'].to_numpy(dtype=object),
+        'set': df_card_prices['set_name'].to_numpy(dtype=object),
+        'rarity': df_card_prices['rarity_name'].to_numpy(dtype=object),
+        'code': df_card_prices['set_card_code_updated'].to_numpy(dtype=object),
+    }
+    price_values = pd.to_numeric(df_card_prices['price'], errors='coerce').to_numpy(dtype="float64")
+
+    # Each key column is factorized once over inventory and prices together; every
+    # pass below joins on integer codes. Empty strings count as missing, like NaN.
+    raw_codes: dict[str, np.ndarray] = {}
+    raw_uniques: dict[str, np.ndarray] = {}
+    for column in MATCH_KEY_COLUMNS:
+        codes, uniques = pd.factorize(np.concatenate([inventory_keys[column], price_keys[column]]))
+        codes[np.isin(codes, np.flatnonzero(uniques == ""))] = -1
+        raw_codes[column], raw_uniques[column] = codes, np.asarray(uniques, dtype=object)
+
+    price = np.full(inventory_count, np.nan)
+    match_type = np.full(inventory_count, None, dtype=object)
+
+    def join_pass(pass_name: str, codes: dict[str, np.ndarray], key: list[str]) -> None:
+        keys = get_composite_keys([codes[column] for column in key])
+        inventory_rows = keys[:inventory_count].copy()
+        inventory_rows[~pd.isna(match_type)] = -1
+        positions = find_last_positions(inventory_rows, keys[inventory_count:])
+        matched = np.flatnonzero(positions >= 0)
+        price[matched] = price_values[positions[matched]]
+        match_type[matched] = pass_name
+
+    join_pass("exact", raw_codes, ['name', 'set', 'rarity'])
+
+    # Only values of rows that missed the raw join, and of prices, are normalized
+    remaining = np.flatnonzero(pd.isna(match_type))
+    if len(remaining) and len(price_values):
+        normalized_codes: dict[str, np.ndarray] = {}
+        normalized_uniques: dict[str, np.ndarray] = {}
+        for column in MATCH_KEY_COLUMNS:
+            codes = raw_codes[column]
+            used_codes = np.concatenate([codes[remaining], codes[inventory_count:]])
+            used = np.unique(used_codes[used_codes >= 0])
+            normalized_ids, uniques = pd.factorize(pd.Series(
+                normalize_match_values(raw_uniques[column][used]), dtype=object))
+            uniques = np.asarray(uniques, dtype=object)
+            normalized_ids[np.isin(normalized_ids, np.flatnonzero(uniques == ""))] = -1
+            raw_to_normalized = np.full(len(raw_uniques[column]) + 1, -1, dtype="int64")
+            raw_to_normalized[used] = normalized_ids
+            # Code -1 picks the trailing -1
+            normalized_codes[column] = raw_to_normalized[codes]
+            normalized_uniques[column] = uniques
+
+        join_pass("normalized", normalized_codes, ['name', 'set', 'rarity'])
+        join_pass("card_code", normalized_codes, ['code', 'rarity'])
+
+        pending = np.flatnonzero(pd.isna(match_type) & (normalized_codes['name'][:inventory_count] >= 0))
+        if len(pending):
+            # Rows asking the same question are scored once
+            query_codes = {column: normalized_codes[column][pending] for column in MATCH_KEY_COLUMNS}
+            query_ids = pd.factorize(get_composite_keys(
+                [query_codes[column] + 1 for column in MATCH_KEY_COLUMNS]))[0]
+            first_rows = np.unique(query_ids, return_index=True)[1]
+
+            # Only prices in the same normalized set and rarity as a query can be candidates
+            groups = get_composite_keys([np.concatenate([query_codes[column][first_rows],
+                                                         normalized_codes[column][inventory_count:]]) + 1
+                                         for column in ['set', 'rarity']])
+            query_groups, price_groups = groups[:len(first_rows)], groups[len(first_rows):]
+            candidates = np.flatnonzero(np.isin(price_groups, query_groups))
+            best = find_fuzzy_matches(
+                normalized_uniques['name'][query_codes['name'][first_rows]].tolist(), query_groups,
+                query_codes['code'][first_rows],
+                np.append(normalized_uniques['name'], "")[normalized_codes['name'][inventory_count:][candidates]].tolist(),
+                price_groups[candidates], normalized_codes['code'][inventory_count:][candidates],
+                fuzzy_threshold, fuzzy_min_length_ratio)[query_ids]
+            is_matched = best >= 0
+            price[pending[is_matched]] = price_values[candidates[best[is_matched]]]
+            match_type[pending[is_matched]] = "fuzzy"
+
+    df['price'] = np.nan_to_num(price, nan=0.0)
+    df['match_type'] = match_type
+
+    types, counts = np.unique(match_type[~pd.isna(match_type)].astype(str), return_counts=True)
+    stats = {pass_name: 0 for pass_name in ("exact", "normalized", "card_code", "fuzzy")}
+    stats.update({str(pass_name): int(count) for pass_name, count in zip(types, counts)})
+    stats["unmatched"] = int(pd.isna(match_type).sum())
+    stats["rows"] = len(df)
+    logging.info(f"AE price matches: {stats}")
+    return df, stats
+
+
 def update_ae_price(list_of_inventory: List[Dict], list_of_card_prices: List[Dict]) -> List[Dict[str, str | float | bool | None]]:
     """
-    Updates inventory prices based on matched card price data.
+    Updates inventory prices based on matched card price data, see ``match_ae_prices``.
 
     Returns:
         List[Dict]: Inventory list with updated price fields.
     """
     try:
-        items_dict = {
-            (item['set_card_name_combined'], item['set_name'], item['rarity_name']): item for item in list_of_card_prices
-        }
-        for item in list_of_inventory:
-            key = (item['set_card_name_combined'], item['set_name'],
-                   item.get('rarity', item.get('rarity_name')))
-            item['price'] = items_dict.get(key, {}).get('price', 0)
+        if not list_of_inventory:
+            return list_of_inventory
+        df_card_prices = pd.DataFrame(list_of_card_prices, columns=list(
+            TCGCORNER_DTYPES) if not list_of_card_prices else None)
+        df_matched, _ = match_ae_prices(
+            pd.DataFrame(list_of_inventory), df_card_prices)
+        for item, price in zip(list_of_inventory, df_matched['price']):
+            item['price'] = price
         return list_of_inventory
     except Exception as e:
         logging.error(f"Error updating AE prices: {e}")
@@ -293,18 +704,33 @@ def update_ae_price(list_of_inventory: List[Dict], list_of_card_prices: List[Dic
 def combine_ae_price(filename: str = "YGOInventoryV2-AE.xlsx",
                      sheet_name: str = "Inventory",
                      output_card_prices: bool = False,
-                     output_updated_inventory: bool = False) -> tuple[list[dict[str, str | float | bool | None]], List[Dict[str, str | float | bool | None]]] | None:
+                     output_updated_inventory: bool = False,
+                     df_card_prices: Optional[pd.DataFrame] = None,
+                     return_stats: bool = False) -> tuple | None:
     """
     Combines AE card price data into existing inventory and exports both raw and updated lists to CSV.
+
+    The updated inventory CSV has a 'match_type' column with the pass that priced each
+    row (see ``match_ae_prices``), empty for rows left at 0.
+
+    Args:
+        df_card_prices (pd.DataFrame, optional): Prices from an earlier ``get_card_prices_df``
+            call. TCG Corner is only scraped when omitted.
+        return_stats (bool): Also return the match counts per pass.
+
+    Returns:
+        tuple | None: The card prices and the updated inventory as records, plus the
+        match counts when ``return_stats`` is set. None if anything failed.
     """
     try:
         filepath = get_file_path(filename=filename)
-        df_inventory = pd.read_excel(filepath, sheet_name=sheet_name)
-
-        list_of_inventory = df_inventory.to_dict("records")
-        card_prices = get_card_prices()
+        df_inventory, _ = read_excel_streaming(filepath, sheet_name=sheet_name)
 
-        updated_inventory = update_ae_price(list_of_inventory, card_prices)
+        if df_card_prices is None:
+            df_card_prices = get_card_prices_df()
+        df_updated, stats = match_ae_prices(df_inventory, df_card_prices)
+        card_prices = df_to_records(df_card_prices)
+        updated_inventory = df_to_records(df_updated.drop(columns=['match_type']))
 
         if output_card_prices:
             with open('list_of_card_prices.csv', 'w', newline='', encoding='utf-8') as f:
@@ -313,10 +739,13 @@ def combine_ae_price(filename: str = "YGOInventoryV2-AE.xlsx",
                 writer.writerows(card_prices)
         if output_updated_inventory:
             with open('list_of_updated_inventory.csv', 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, updated_inventory[0].keys())
+                inventory_with_match_type = df_to_records(df_updated)
+                writer = csv.DictWriter(f, inventory_with_match_type[0].keys())
                 writer.writeheader()
-                writer.writerows(updated_inventory)
+                writer.writerows(inventory_with_match_type)
 
+        if return_stats:
+            return card_prices, updated_inventory, stats
         return card_prices, updated_inventory
 
     except Exception as e:
@@ -326,6 +755,7 @@ def combine_ae_price(filename: str = "YGOInventoryV2-AE.xlsx",
 if __name__ == "__main__":
     try:
         combine_ae_price()
-        export_inventory_excel_v2()
+        # The returned frames are not used here, so the overall list can be streamed
+        export_inventory_excel_v2(is_stream_overall=True)
     except Exception as e:
         logging.error(f"Error in main execution: {e}")
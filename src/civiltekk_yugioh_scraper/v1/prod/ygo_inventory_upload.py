@@ -1,15 +1,13 @@
 import logging
 import pandas as pd
+from ..models.ygo_models import INVENTORY_KEY_COLUMNS
 from ..utilities.aws_utilities import save_df_to_s3, save_df_to_mysql
+from ..utilities.excel_utilities import read_excel_streaming, write_excel_streaming
 from ..utilities.misc_utilities import get_file_path
 
 
 def deduplicate_inventory_df(df: pd.DataFrame) -> pd.DataFrame:
-    return df.drop_duplicates(
-        subset=["region", "set_card_name_combined", "set_name",
-                "set_card_code_updated", "rarity_name"],
-        keep='last'
-    )
+    return df.drop_duplicates(subset=INVENTORY_KEY_COLUMNS, keep='last')
 
 
 def upload_inventory_main(filename="YGOInventoryV2.xlsx",
@@ -27,12 +25,15 @@ def upload_inventory_main(filename="YGOInventoryV2.xlsx",
         return
 
     if filepath:
-        df = pd.read_excel(filepath)
+        # Deduplicate based on key inventory fields while reading, keeping the last occurrence
+        df, duplicates_dropped = read_excel_streaming(
+            filepath, dedup_subset=INVENTORY_KEY_COLUMNS)
 
-        # Deduplicate based on key inventory fields, keeping the last occurrence
-        df = deduplicate_inventory_df(df)
-        with pd.ExcelWriter(ygo_inventory_export_path, engine='xlsxwriter') as writer:
-            df.to_excel(writer, sheet_name="V2", index=False)
+        if duplicates_dropped or filepath != ygo_inventory_export_path:
+            logging.info(
+                f"Dropped {duplicates_dropped} duplicate rows, rewriting {ygo_inventory_export_path}")
+            write_excel_streaming(
+                ygo_inventory_export_path, df, sheet_name="V2", csv_sidecar=True)
         if is_to_save_to_s3:
             save_df_to_s3(df, s3_bucket_name, dir, filename_to_upload)
             logging.info(
@@ -1,7 +1,6 @@
 import concurrent
 import concurrent.futures
 from concurrent.futures import ThreadPoolExecutor
-from io import BytesIO
 import requests
 import bs4 as bs
 from bs4 import BeautifulSoup, Tag
@@ -9,18 +8,27 @@ import pandas as pd
 import datetime
 from dotenv import load_dotenv
 import re
+import hashlib
 import logging
+import os
 import time
+from typing import Iterable
+from urllib.parse import parse_qs, urlencode, urljoin, urlparse, urlunparse
+import lxml.html
+from lxml import etree
 
-from ..utilities.aws_utilities import upload_data
+from ..config import PAGE_CACHE_DIR
+from ..utilities.concurrency_utilities import adaptive_get, get_host_limiter
+from ..utilities.cache_utilities import load_json_cache, save_json_cache
+from ..utilities.sink_utilities import MySQLSink, write_to_sinks
 
 try:
-    from selenium import webdriver
     from selenium.webdriver.common.by import By
     from selenium.webdriver.support.ui import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
-    from selenium.webdriver.chrome.options import Options
-    from selenium.common.exceptions import TimeoutException, NoSuchElementException
+    from selenium.common.exceptions import TimeoutException, WebDriverException
+    from ..utilities.browser_pool import (BrowserPool, count_visible_elements, get_browser_pool,
+                                          wait_for_page_idle, wait_for_visible_elements)
     SELENIUM_AVAILABLE = True
 except ImportError:
     SELENIUM_AVAILABLE = False
@@ -128,6 +136,212 @@ def get_set_code(text_string: str):
     return None
 
 
+# Card-list containers and the card tiles inside them, compiled once and reused
+CARD_LIST_XPATH = etree.XPath("//*[starts-with(@id, 'card-list')]")
+CARD_DIV_XPATH = etree.XPath(
+    ".//div[contains(concat(' ', normalize-space(@class), ' '), ' col-md ')]")
+FIRST_SPAN_XPATH = etree.XPath("(.//span)[1]")
+FIRST_STRONG_XPATH = etree.XPath("(.//strong)[1]")
+FIRST_H4_XPATH = etree.XPath("(.//h4)[1]")
+PAGINATION_HREF_XPATH = etree.XPath(
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' pagination ')]//a/@href")
+
+# Follow-on pages of sets that were known to be paginated before pagination discovery
+# existed, fetched when no pagination link is found on the first page
+YUYUTEI_FALLBACK_PAGE_URLS = {
+    'QCCU': ['https://yuyu-tei.jp/sell/ygo/s/search?search_word=qccu&page=2'],
+    'QCCP': ['https://yuyu-tei.jp/sell/ygo/s/search?search_word=qccp&page=2'],
+}
+
+# Requests in flight to yuyu-tei.jp are capped by one adaptive limiter, shared by set
+# pages and their follow-on pages
+YUYUTEI_HOST = "yuyu-tei.jp"
+
+
+def yuyutei_get(url: str, **kwargs) -> requests.Response:
+    """
+    GET a Yuyutei URL within the adaptive per-host request budget.
+    """
+    kwargs.setdefault('timeout', 10)
+    response = adaptive_get(url, limiter=get_host_limiter(YUYUTEI_HOST), **kwargs)
+    response.encoding = 'utf-8'
+    return response
+
+
+def get_pagination_urls(root, page_url: str) -> list[str]:
+    """
+    Finds the follow-on pages of a paginated set page.
+
+    Pagination bars elide the middle pages (1 2 3 ... 9 10), so every page from 2 up to
+    the highest linked page number is built from the URL of that last link.
+
+    Args:
+        root: Parsed lxml document of the first page
+        page_url (str): URL of the first page, used to resolve relative links
+
+    Returns:
+        list[str]: URLs of pages 2..N in order, empty when the page is not paginated
+    """
+    last_page = 1
+    last_page_url = None
+    for href in PAGINATION_HREF_XPATH(root):
+        absolute_url = urljoin(page_url, href)
+        page_numbers = parse_qs(urlparse(absolute_url).query).get('page', [])
+        if page_numbers and page_numbers[0].isdigit() and int(page_numbers[0]) > last_page:
+            last_page = int(page_numbers[0])
+            last_page_url = absolute_url
+
+    if last_page_url is None:
+        return []
+
+    parsed_url = urlparse(last_page_url)
+    query = parse_qs(parsed_url.query)
+    urls = []
+    for page in range(2, last_page + 1):
+        query['page'] = [str(page)]
+        urls.append(urlunparse(parsed_url._replace(
+            query=urlencode(query, doseq=True))))
+    return urls
+
+
+def fetch_follow_on_card_lists(root, page_url: str, fallback_urls: Iterable[str] = ()) -> list:
+    """
+    Fetches the remaining pages of a paginated set page concurrently.
+
+    Args:
+        root: Parsed lxml document of the first page
+        page_url (str): URL of the first page
+        fallback_urls (Iterable[str]): Follow-on pages to fetch when the first page has no
+                                       pagination links, see YUYUTEI_FALLBACK_PAGE_URLS
+
+    Returns:
+        list: #card-list* elements of pages 2..N, in page order
+    """
+    follow_on_urls = get_pagination_urls(root, page_url)
+    if not follow_on_urls and fallback_urls:
+        logging.warning(f"No pagination links found on {page_url}, using the known follow-on pages")
+        follow_on_urls = list(fallback_urls)
+    if not follow_on_urls:
+        return []
+    logging.info(f"Fetching {len(follow_on_urls)} more pages of {page_url}")
+
+    def fetch_card_lists(url: str) -> list:
+        response = yuyutei_get(url)
+        response.raise_for_status()
+        return CARD_LIST_XPATH(lxml.html.fromstring(response.text))
+
+    with ThreadPoolExecutor(min(len(follow_on_urls), get_host_limiter(YUYUTEI_HOST).max_limit)) as executor:
+        pages = list(executor.map(fetch_card_lists, follow_on_urls))
+    return [element for page in pages for element in page]
+
+
+def build_card_set_rows(obj: dict, sections) -> list[dict]:
+    """
+    Turns the parsed card-list sections of a set page into card rows.
+
+    Args:
+        obj (dict): Dictionary containing 'url' and 'set_code' for the card set
+        sections: Iterable of (rarity_code, cards) pairs, where cards is an iterable of
+                  (card_code, price_text, card_name) tuples in page order
+
+    Returns:
+        list[dict]: Card rows, see get_card_set_codes_from_card_set
+    """
+    list_needed: list = []
+    set_code = obj['set_code']
+    for rarity_code, cards in sections:
+        for set_card_code, jap_price_text, set_card_name_jap in cards:
+            jap_price = get_card_price2(
+                jap_price_text) if jap_price_text is not None else None
+
+            if "（イラス" in set_card_name_jap or "（イラ" in set_card_name_jap or "(新規" in set_card_name_jap or "(海外" in set_card_name_jap:
+                set_card_code = set_card_code + "b"
+
+            # ADD FOR QCAC Check
+            # As in the original parser, the marker card keeps the section's rarity and
+            # the cards after it in the same section become SPECIAL RED
+            card_rarity = rarity_code
+            if "(SPEC" in set_card_name_jap and set_code == "QCAC":
+                rarity_code = "SPECIAL RED"
+
+            if rarity_code is not None:  # to make sure that rarity code is not going to throw error
+                list_needed.append({'card_rarity': card_rarity,
+                                    'set_code': set_code,
+                                    'Price': jap_price,
+                                    'card_set_card_code': set_card_code,
+                                    'url': obj['url']})
+    return list_needed
+
+
+def _first_text(xpath: etree.XPath, element) -> str | None:
+    found = xpath(element)
+    return found[0].text_content() if found else None
+
+
+def extract_card_set_rows(card_list_elements, obj: dict) -> list[dict]:
+    """
+    Builds card rows from the #card-list* elements of a parsed set page.
+
+    Args:
+        card_list_elements: lxml elements matched by CARD_LIST_XPATH
+        obj (dict): Dictionary containing 'url' and 'set_code' for the card set
+
+    Returns:
+        list[dict]: Card rows, see get_card_set_codes_from_card_set
+    """
+    sections = []
+    for rarity_div in card_list_elements:
+        cards = [(_first_text(FIRST_SPAN_XPATH, card_div) or "",
+                  _first_text(FIRST_STRONG_XPATH, card_div),
+                  _first_text(FIRST_H4_XPATH, card_div) or "")
+                 for card_div in CARD_DIV_XPATH(rarity_div)]
+        sections.append((_first_text(FIRST_SPAN_XPATH, rarity_div), cards))
+    return build_card_set_rows(obj, sections)
+
+
+def parse_card_set_page(source: str, obj: dict) -> list[dict]:
+    """
+    Extracts card rows from a set page with lxml, reading only the #card-list* blocks.
+
+    Args:
+        source (str): HTML of the set page
+        obj (dict): Dictionary containing 'url' and 'set_code' for the card set
+
+    Returns:
+        list[dict]: Card rows, see get_card_set_codes_from_card_set
+    """
+    return extract_card_set_rows(CARD_LIST_XPATH(lxml.html.fromstring(source)), obj)
+
+
+def parse_card_set_page_bs4(source: str, obj: dict) -> list[dict]:
+    """
+    Extracts card rows from a set page with BeautifulSoup's html.parser.
+
+    This is the original parser, kept as the reference for parse_card_set_page.
+
+    Args:
+        source (str): HTML of the set page
+        obj (dict): Dictionary containing 'url' and 'set_code' for the card set
+
+    Returns:
+        list[dict]: Card rows, see get_card_set_codes_from_card_set
+    """
+    soup = bs.BeautifulSoup(source, 'html.parser')
+    sections = []
+    for rarity_div in soup.find_all(id=re.compile("^(card-list).?")):
+        rarity_span = rarity_div.find('span')
+        cards = []
+        for card_div in rarity_div.find_all('div', "col-md"):
+            set_card_code_span = card_div.find('span')
+            jap_price_strong = card_div.find('strong')
+            set_card_name_jap_h4 = card_div.find('h4')
+            cards.append((set_card_code_span.text if set_card_code_span else "",
+                          jap_price_strong.text if jap_price_strong else None,
+                          set_card_name_jap_h4.text if set_card_name_jap_h4 else ""))
+        sections.append((rarity_span.text if rarity_span else None, cards))
+    return build_card_set_rows(obj, sections)
+
+
 def get_card_set_codes_from_card_set(obj: dict) -> list[dict]:
     """
     Scrapes individual card data from a specific card set page on Yuyutei.
@@ -147,54 +361,12 @@ def get_card_set_codes_from_card_set(obj: dict) -> list[dict]:
     try:
         url: str = obj['url']
         logging.info('url: %s', url)
-        set_code = obj['set_code']
-        response = requests.get(url, timeout=10)
-        response.encoding = 'utf-8'
-        source = response.text
-        soup = bs.BeautifulSoup(source, 'html.parser')
-
-        rarity_divs = soup.find_all(id=re.compile("^(card-list).?"))
-
-        for rarity_div in rarity_divs:
-            rarity_span = rarity_div.find('span')
-            rarity_code = None
-
-            # search for rarity code
-            if rarity_span:
-                rarity_code = rarity_span.text
-
-            card_divs = rarity_div.find_all(
-                'div', "col-md")
-            for card_div in card_divs:
-                card_obj = {'card_rarity': rarity_code, 'set_code': set_code}
-                set_card_code = ""
-                jap_price = None
-                set_card_name_jap = None
-
-                set_card_code_span = card_div.find('span')
-                if set_card_code_span:
-                    set_card_code = set_card_code_span.text
-
-                jap_price_strong = card_div.find('strong')
-                jap_price_strong_text = jap_price_strong.text
-                if jap_price_strong:
-                    jap_price = get_card_price2(jap_price_strong_text)
-
-                set_card_name_jap_h4 = card_div.find('h4')
-                set_card_name_jap_h4_text = set_card_name_jap_h4.text
-
-                if "（イラス" in set_card_name_jap_h4_text or "（イラ" in set_card_name_jap_h4_text or "(新規" in set_card_name_jap_h4_text or "(海外" in set_card_name_jap_h4_text:
-                    set_card_code = set_card_code + "b"
-
-                # ADD FOR QCAC Check
-                if "(SPEC" in set_card_name_jap_h4_text and set_code == "QCAC":
-                    rarity_code = "SPECIAL RED"
-
-                card_obj['Price'] = jap_price
-                card_obj['card_set_card_code'] = set_card_code
-                card_obj['url'] = obj['url']
-                if rarity_code is not None:  # to make sure that rarity code is not going to throw error
-                    list_needed.append(card_obj.copy())
+        response = yuyutei_get(url)
+        response.raise_for_status()
+        root = lxml.html.fromstring(response.text)
+        list_needed = extract_card_set_rows(
+            CARD_LIST_XPATH(root) + fetch_follow_on_card_lists(
+                root, url, YUYUTEI_FALLBACK_PAGE_URLS.get(obj['set_code'], ())), obj)
 
     except requests.ConnectionError as e:
         logging.error(f"ConnectionError: {e}")
@@ -203,15 +375,331 @@ def get_card_set_codes_from_card_set(obj: dict) -> list[dict]:
     return list_needed
 
 
-def get_set_list_selenium(url: str) -> list[dict]:
+def get_card_set_codes_if_changed(obj: dict, cache_entry: dict | None = None) -> tuple[list[dict], dict | None, str]:
     """
-    Uses Selenium to extract card set information from Yuyutei website with dynamic content.
+    Scrapes a card set page only if it changed since the cached fetch.
+
+    The request is made conditional with the cached ETag/Last-Modified validators. Yuyutei
+    does not always honour them, so a full response is also compared against a hash of
+    its #card-list* markup, and rows are only rebuilt when that hash moved. Follow-on
+    pages of a paginated set are fetched with the first page and share its hash.
+
+    Args:
+        obj (dict): Dictionary containing 'url' and 'set_code' for the card set
+        cache_entry (dict, optional): Entry stored for this URL by the previous run, with
+                                      etag, last_modified, content_hash and rows
+
+    Any response other than 200 (or 304 with a cache entry), and a page without any
+    #card-list* block such as a maintenance page, counts as 'failed': nothing is parsed
+    and the previous cache entry is kept.
+
+    Returns:
+        tuple[list[dict], dict | None, str]: The card rows (cached rows when unchanged),
+            the cache entry to store for the URL, and 'changed', 'unchanged' or 'failed'
+    """
+    url: str = obj['url']
+    headers = {}
+    if cache_entry:
+        if cache_entry.get('etag'):
+            headers['If-None-Match'] = cache_entry['etag']
+        if cache_entry.get('last_modified'):
+            headers['If-Modified-Since'] = cache_entry['last_modified']
+
+    try:
+        response = yuyutei_get(url, headers=headers)
+        if response.status_code == 304 and cache_entry:
+            logging.info(f"Not modified: {url}")
+            return cache_entry['rows'], cache_entry, 'unchanged'
+        if response.status_code != 200:
+            logging.error(f"HTTP {response.status_code} for {url}")
+            return [], cache_entry, 'failed'
+
+        root = lxml.html.fromstring(response.text)
+        card_list_elements = CARD_LIST_XPATH(root)
+        if not card_list_elements:
+            logging.error(f"No card list on {url}")
+            return [], cache_entry, 'failed'
+        card_list_elements += fetch_follow_on_card_lists(
+            root, url, YUYUTEI_FALLBACK_PAGE_URLS.get(obj['set_code'], ()))
+        content_hash = hashlib.sha1(
+            b"".join(etree.tostring(element) for element in card_list_elements)).hexdigest()
+        entry = {'etag': response.headers.get('ETag'),
+                 'last_modified': response.headers.get('Last-Modified'),
+                 'content_hash': content_hash}
+
+        if cache_entry and cache_entry.get('content_hash') == content_hash:
+            logging.info(f"Card list unchanged: {url}")
+            entry['rows'] = cache_entry['rows']
+            return entry['rows'], entry, 'unchanged'
+
+        logging.info('url: %s', url)
+        entry['rows'] = extract_card_set_rows(card_list_elements, obj)
+        return entry['rows'], entry, 'changed'
+
+    except requests.ConnectionError as e:
+        logging.error(f"ConnectionError: {e}")
+    except Exception as e:
+        logging.error(f"Exception: {e}")
+    return [], cache_entry, 'failed'
+
+
+def benchmark_card_set_parsers(paths: list[str], repeat: int = 5) -> dict:
+    """
+    Compares parse throughput of the lxml and BeautifulSoup parsers on saved set pages.
+
+    The set code is taken from the file name (e.g. qcac.html -> QCAC).
+
+    Args:
+        paths (list[str]): Paths of saved Yuyutei set pages
+        repeat (int): Number of times each page is parsed by each parser
+
+    Returns:
+        dict: Pages per second for each parser, the speedup, and whether both
+              parsers returned the same rows
+    """
+    pages = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            set_code = os.path.splitext(os.path.basename(path))[0].upper()
+            pages.append((f.read(), {'url': path, 'set_code': set_code}))
+
+    results: dict = {'pages': len(pages), 'repeat': repeat}
+    for name, parser in (("bs4", parse_card_set_page_bs4), ("lxml", parse_card_set_page)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for source, obj in pages:
+                parser(source, obj)
+        elapsed = time.perf_counter() - start
+        results[f"{name}_pages_per_sec"] = len(pages) * repeat / elapsed if elapsed else float('inf')
+
+    results['speedup'] = results['lxml_pages_per_sec'] / results['bs4_pages_per_sec']
+    results['rows_match'] = all(parse_card_set_page(source, obj) == parse_card_set_page_bs4(source, obj)
+                                for source, obj in pages)
+    logging.info(f"Parser benchmark: {results}")
+    return results
+
+
+YUYUTEI_BASE_URL = "https://yuyu-tei.jp"
+YUYUTEI_SEARCH_URL = "https://yuyu-tei.jp/sell/ygo/s/search"
+YUYUTEI_PAGE_CACHE_PATH = os.path.join(PAGE_CACHE_DIR, "yuyutei_set_pages.json")
+# One file per set page, so saving a set does not rewrite the rows of all the others
+YUYUTEI_PAGE_ENTRY_DIR = os.path.join(PAGE_CACHE_DIR, "yuyutei_set_pages")
+# Changed rows are appended to the history table once either limit is reached
+YUYUTEI_FLUSH_ROWS = 2000
+YUYUTEI_FLUSH_SECONDS = 10
+
+# Matches set links in href/onclick attributes, inline scripts and embedded JSON
+# (where slashes may be escaped as \/), e.g. location.href='/sell/ygo/s/qcac'
+SELL_SET_LINK_PATTERN = re.compile(
+    r"(?:https?:\\?/\\?/yuyu-tei\.jp)?\\?/sell\\?/ygo\\?/s\\?/([a-zA-Z0-9]+)")
+
+
+ONCLICK_LOCATION_PATTERN = re.compile(
+    r"location\.href\s*=\s*['\"]([^'\"]+)['\"]")
+SET_CODE_IN_URL_PATTERN = re.compile(r'/ygo/s/([a-zA-Z0-9]+)')
+
+
+class SetRegistry:
+    """
+    Discovered card sets in discovery order, deduplicated by set code and by URL.
+
+    Lookups are dict/set based, so registering n links is O(n) no matter how many
+    discovery strategies feed the same registry.
+    """
+
+    def __init__(self, sets: Iterable[dict] = ()):
+        self._sets: dict[str, dict] = {}
+        self._urls: set[str] = set()
+        self.extend(sets)
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        """
+        Resolves a relative link against yuyu-tei.jp and drops the query string and hash
+        fragment, so a set has the same URL (and page cache key) however it was found.
+        """
+        return urljoin(YUYUTEI_BASE_URL + '/', url.strip()).split('#')[0].split('?')[0]
+
+    def add(self, url: str, set_code: str | None = None) -> bool:
+        """
+        Registers a set page. The set code is taken from the URL when not given.
+
+        Returns:
+            bool: False if the set code or URL was already registered, or no set code
+                  could be found
+        """
+        url = self.normalize_url(url)
+        if not set_code:
+            set_code_match = SET_CODE_IN_URL_PATTERN.search(url)
+            if not set_code_match or set_code_match.group(1).lower() == 'search':
+                return False
+            set_code = set_code_match.group(1).upper()
+
+        if set_code in self._sets or url in self._urls:
+            return False
+        self._sets[set_code] = {'url': url, 'set_code': set_code}
+        self._urls.add(url)
+        return True
+
+    def add_sell_link(self, value: str) -> bool:
+        """
+        Registers an href or onclick="location.href=..." value if it points to a
+        /sell/ygo/s/ set page.
+        """
+        location_href_match = ONCLICK_LOCATION_PATTERN.search(value)
+        if location_href_match:
+            value = location_href_match.group(1)
+        if '/sell/ygo/s/' not in value or '/ygo/s/search' in value:
+            return False
+        return self.add(value)
+
+    def extend(self, sets: Iterable[dict]) -> int:
+        """
+        Registers every {'url', 'set_code'} dictionary, returning how many were new.
+        """
+        return sum(self.add(item['url'], item.get('set_code'))
+                   for item in sets if item.get('url'))
+
+    def to_list(self) -> list[dict]:
+        return [item.copy() for item in self._sets.values()]
+
+    def __len__(self) -> int:
+        return len(self._sets)
+
+    def __contains__(self, set_code: str) -> bool:
+        return set_code in self._sets
+
+
+def extract_set_links_from_html(source: str) -> list[dict]:
+    """
+    Extracts every /sell/ygo/s/ set link from server-rendered HTML in one pass.
 
-    This function uses a headless Chrome browser to load the page and wait for JavaScript
-    to populate the sidebar with set links, then extracts all /sell/ygo/s/ pattern links.
+    The sidebar categories that Selenium expands by clicking are expected to be present
+    in the HTML, either as anchors or as onclick="location.href=..." targets, so scanning
+    the raw source finds them without running any JavaScript. The search.html test
+    fixture reconstructs that markup, but it has not been checked against a saved copy
+    of the live page, so yuyutei_scrape compares the result with the sets of the
+    previous run and falls back to Selenium when any are missing.
+
+    Args:
+        source (str): HTML of the Yuyutei search page
+
+    Returns:
+        list[dict]: Unique dictionaries (in page order) containing:
+                   - url: Full URL to the set page
+                   - set_code: Extracted set code
+    """
+    registry = SetRegistry()
+    for match in SELL_SET_LINK_PATTERN.finditer(source):
+        registry.add(f"{YUYUTEI_BASE_URL}/sell/ygo/s/{match.group(1)}")
+    return registry.to_list()
+
+
+def get_set_list_http(url: str = YUYUTEI_SEARCH_URL, source: str | None = None) -> list[dict]:
+    """
+    Discovers card sets with a single HTTP request, without a browser.
 
     Args:
         url (str): URL of the Yuyutei search page
+        source (str, optional): Already fetched or recorded HTML of the page. When given,
+                                no request is made.
+
+    Returns:
+        list[dict]: List of unique dictionaries containing:
+                   - url: Full URL to the set page
+                   - set_code: Extracted set code
+    """
+    if source is None:
+        try:
+            source = yuyutei_get(url).text
+        except requests.RequestException as e:
+            logging.error(f"Error fetching URL: {e}")
+            return []
+
+    dict_list = extract_set_links_from_html(source)
+    logging.info(f"HTTP method found {len(dict_list)} sets")
+    return dict_list
+
+
+def compare_set_lists(set_list: list[dict], reference_set_list: list[dict]) -> tuple[set, set]:
+    """
+    Compares two set discovery results by set code and logs the differences.
+
+    Args:
+        set_list (list[dict]): Sets found by the method being checked
+        reference_set_list (list[dict]): Sets found by the reference method (e.g. Selenium)
+
+    Returns:
+        tuple[set, set]: Set codes missing from set_list, and extra set codes only in set_list
+    """
+    set_codes = {item['set_code'] for item in set_list}
+    reference_set_codes = {item['set_code'] for item in reference_set_list}
+    missing = reference_set_codes - set_codes
+    extra = set_codes - reference_set_codes
+    logging.info(
+        f"Set discovery parity: {len(set_codes)} found, {len(reference_set_codes)} in reference, "
+        f"{len(missing)} missing {sorted(missing)}, {len(extra)} extra {sorted(extra)}")
+    return missing, extra
+
+
+def get_missing_set_codes(registry: SetRegistry, previous_sets: list[dict]) -> list[str]:
+    """
+    Lists the set codes of a previous discovery that are not in the registry.
+
+    Args:
+        registry (SetRegistry): Sets discovered by this run
+        previous_sets (list[dict]): Sets discovered by the previous run
+
+    Returns:
+        list[str]: Missing set codes, sorted
+    """
+    return sorted({item['set_code'] for item in previous_sets
+                   if item.get('set_code') and item['set_code'] not in registry})
+
+
+# Set links rendered in the sidebar, and how long a click on a category may take to
+# reveal more of them. A category that is already expanded reveals none.
+SELL_LINK_SELECTOR = "a[href*='/sell/ygo/s/']"
+SELENIUM_EXPAND_TIMEOUT = 3.0
+
+
+def click_and_wait_for_set_links(driver, element, timeout: float = 10.0) -> bool:
+    """
+    Clicks an element and waits until it has revealed more set links and the DOM has settled.
+
+    Args:
+        driver: Selenium WebDriver session
+        element: The element to click
+        timeout (float): Maximum seconds to wait for the page to settle
+
+    Returns:
+        bool: True if more set links became visible after the click
+    """
+    visible_before = count_visible_elements(driver, SELL_LINK_SELECTOR)
+    driver.execute_script("arguments[0].click();", element)
+    revealed = wait_for_visible_elements(driver, SELL_LINK_SELECTOR, visible_before + 1,
+                                         min(timeout, SELENIUM_EXPAND_TIMEOUT))
+    if not revealed:
+        logging.debug("Click revealed no new set links")
+    wait_for_page_idle(driver, timeout)
+    return revealed
+
+
+def get_set_list_selenium(url: str, pool: "BrowserPool | None" = None, timeout: float = 10.0) -> list[dict]:
+    """
+    Uses Selenium to extract card set information from Yuyutei website with dynamic content.
+
+    A warm headless Chrome session is borrowed from the browser pool, so concurrent
+    discovery tasks share a few long-lived browsers instead of starting one per page.
+    Instead of sleeping for a fixed time, each step waits for a DOM condition: the
+    シングルカード販売 section to appear, then more set links to become visible and the
+    DOM to settle after each click.
+
+    Args:
+        url (str): URL of the Yuyutei search page, or a file:// URL of a saved copy
+        pool (BrowserPool, optional): Pool to borrow the session from. Defaults to the
+                                      shared pool.
+        timeout (float): Maximum seconds to wait for each DOM condition
 
     Returns:
         list[dict]: List of unique dictionaries containing:
@@ -223,51 +711,26 @@ def get_set_list_selenium(url: str) -> list[dict]:
             "Selenium not available. Falling back to regular method.")
         return get_set_list_v2(url)
 
-    dict_list = []
-    driver = None
+    registry = SetRegistry()
 
     try:
-        # Setup Chrome options for headless browsing (Docker-compatible)
-        chrome_options = Options()
-        chrome_options.add_argument("--headless=new")  # Use new headless mode
-        chrome_options.add_argument("--no-sandbox")  # Required for Docker
-        chrome_options.add_argument(
-            "--disable-dev-shm-usage")  # Required for Docker
-        chrome_options.add_argument("--disable-gpu")  # Required for Docker
-        chrome_options.add_argument("--disable-software-rasterizer")
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_argument("--disable-plugins")
-        chrome_options.add_argument("--disable-images")  # Speed up loading
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument(
-            "--remote-debugging-port=9222")  # For debugging
-        chrome_options.add_argument(
-            "--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-
-        # Additional Docker-specific options
-        chrome_options.add_argument("--disable-background-timer-throttling")
-        chrome_options.add_argument("--disable-backgrounding-occluded-windows")
-        chrome_options.add_argument("--disable-renderer-backgrounding")
-        chrome_options.add_argument("--disable-features=TranslateUI")
-        chrome_options.add_argument("--disable-ipc-flooding-protection")
-
-        # Initialize the driver
-        driver = webdriver.Chrome(options=chrome_options)
-        logging.info(f"Loading page with Selenium: {url}")
-
-        # Load the page
-        driver.get(url)
-
-        # Wait for page to load
-        time.sleep(3)
-
-        # Look for the シングルカード販売 section
-        logging.info("Looking for シングルカード販売 section...")
+        pool = pool or get_browser_pool()
+        with pool.acquire() as driver:
+            logging.info(f"Loading page with Selenium: {url}")
+            driver.get(url)
+
+            # Look for the シングルカード販売 section
+            logging.info("Looking for シングルカード販売 section...")
+            single_card_xpath = "//*[contains(text(), 'シングルカード販売')]"
+            try:
+                WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+                    EC.presence_of_element_located((By.XPATH, single_card_xpath)))
+            except TimeoutException:
+                logging.warning(
+                    "Timeout waiting for シングルカード販売 section, extracting links anyway")
 
-        try:
-            # Try to find and click the シングルカード販売 button/link to expand it
             single_card_elements = driver.find_elements(
-                By.XPATH, "//*[contains(text(), 'シングルカード販売')]")
+                By.XPATH, single_card_xpath)
             logging.info(
                 f"Found {len(single_card_elements)} elements containing 'シングルカード販売'")
 
@@ -277,10 +740,9 @@ def get_set_list_selenium(url: str) -> list[dict]:
                     if element.is_displayed() and element.is_enabled():
                         logging.info(
                             f"Clicking on シングルカード販売 element: {element.tag_name}")
-                        driver.execute_script("arguments[0].click();", element)
-                        time.sleep(2)
+                        click_and_wait_for_set_links(driver, element, timeout)
                         break
-                except Exception as e:
+                except WebDriverException as e:
                     logging.debug(f"Could not click element: {e}")
                     continue
 
@@ -290,107 +752,36 @@ def get_set_list_selenium(url: str) -> list[dict]:
 
             for category in categories:
                 try:
-                    logging.info(f"Looking for category: {category}")
                     category_elements = driver.find_elements(
                         By.XPATH, f"//*[contains(text(), '{category}')]")
 
                     for cat_element in category_elements:
                         if cat_element.is_displayed():
                             logging.info(f"Clicking on category: {category}")
-                            driver.execute_script(
-                                "arguments[0].click();", cat_element)
-                            time.sleep(1)
+                            click_and_wait_for_set_links(
+                                driver, cat_element, timeout)
                             break
 
-                except Exception as e:
+                except WebDriverException as e:
                     logging.debug(
                         f"Could not interact with category {category}: {e}")
                     continue
 
-            # Wait a bit more for any dynamic content to load
-            time.sleep(3)
-
-            # Now extract all links with /sell/ygo/s/ pattern
+            # Read every href in one round trip instead of one call per element
             logging.info("Extracting all /sell/ygo/s/ links...")
-            sell_links = driver.find_elements(
-                By.XPATH, "//a[contains(@href, '/sell/ygo/s/')]")
-            logging.info(f"Found {len(sell_links)} sell links with Selenium")
-
-            for i, link in enumerate(sell_links):
-                try:
-                    href = link.get_attribute('href')
-                    text = link.text.strip()
-                    link_id = link.get_attribute('id') or ''
-
-                    if href and '/sell/ygo/s/' in href and '/sell/ygo/s/search' not in href:
-                        # Extract set code from URL
-                        set_code_match = re.search(
-                            r'/sell/ygo/s/([a-zA-Z0-9]+)', href)
-                        if set_code_match:
-                            set_code = set_code_match.group(1).upper()
-
-                            # Remove hash fragments
-                            clean_url = href.split('#')[0]
-
-                            obj = {
-                                'url': clean_url,
-                                'set_code': set_code
-                            }
-
-                            # Check for duplicates
-                            if not any(item['set_code'] == set_code for item in dict_list):
-                                dict_list.append(obj.copy())
-                                logging.info(
-                                    f"Selenium found: {set_code} - {clean_url}")
-
-                except Exception as e:
-                    logging.debug(f"Error processing link {i}: {e}")
-                    continue
-
-            # Also look for any toggle-buy links that we might need to convert
-            buy_links = driver.find_elements(
-                By.XPATH, "//a[contains(@href, '/buy/ygo/s/') and contains(@id, 'toggle-buy-ygo-s-')]")
-            logging.info(
-                f"Found {len(buy_links)} buy links (will skip as requested)")
+            hrefs = driver.execute_script(
+                "return Array.from(document.querySelectorAll(arguments[0]), a => a.href);",
+                SELL_LINK_SELECTOR) or []
+            logging.info(f"Found {len(hrefs)} sell links with Selenium")
 
-            for link in buy_links:
-                try:
-                    href = link.get_attribute('href')
-                    link_id = link.get_attribute('id') or ''
-                    text = link.text.strip()
-                    logging.info(
-                        f"Skipping buy link: id='{link_id}' href='{href}' text='{text[:50]}...'")
-                except:
-                    pass
-
-        except TimeoutException:
-            logging.warning("Timeout waiting for page elements to load")
-        except Exception as e:
-            logging.error(f"Error during Selenium interaction: {e}")
+        for href in hrefs:
+            registry.add_sell_link(href)
 
     except Exception as e:
-        logging.error(f"Error setting up Selenium: {e}")
-
-    finally:
-        if driver:
-            try:
-                driver.quit()
-            except:
-                pass
-
-    # Add manually specified URLs
-    dict_list = add_additional_url(dict_list)
-
-    # Remove duplicates
-    seen_keys = set()
-    unique_data = []
-    for item in dict_list:
-        if item['url'] not in seen_keys:
-            seen_keys.add(item['url'])
-            unique_data.append(item)
+        logging.error(f"Error during Selenium interaction: {e}")
 
-    logging.info(f"Selenium method found {len(unique_data)} unique sets")
-    return unique_data
+    logging.info(f"Selenium method found {len(registry)} unique sets")
+    return registry.to_list()
 
 
 def get_set_list_v2(url: str) -> list[dict]:
@@ -398,7 +789,8 @@ def get_set_list_v2(url: str) -> list[dict]:
     Extracts card set information from Yuyutei website by finding the シングルカード販売 section.
 
     This function searches for the "シングルカード販売" (Single Card Sales) section on the page
-    and extracts all nested links that match the '/ygo/s/' pattern. Falls back to alternative
+    and extracts all nested links that match the '/sell/ygo/s/' pattern, from hrefs and from
+    onclick="location.href=..." handlers, in a single pass. Falls back to alternative
     methods if the primary section is not found.
 
     Args:
@@ -409,16 +801,14 @@ def get_set_list_v2(url: str) -> list[dict]:
                    - url: Full URL to the set page
                    - set_code: Extracted set code
     """
-    dict_list = []
     try:
-        response = requests.get(url, timeout=10)
-        response.encoding = 'utf-8'
-        source = response.text
+        source = yuyutei_get(url).text
     except requests.RequestException as e:
         logging.info(f"Error fetching URL: {e}")
         return []
 
     soup = BeautifulSoup(source, 'html.parser')
+    registry = SetRegistry()
 
     # Look for the section that starts with "シングルカード販売"
     single_card_section = None
@@ -428,258 +818,32 @@ def get_set_list_v2(url: str) -> list[dict]:
     logging.info(
         f"Found {len(text_elements)} text elements containing 'シングルカード販売'")
 
-    for i, element in enumerate(text_elements):
-        logging.info(f"Text element {i+1}: '{element.strip()}'")
-        # Get the parent element that contains this text
-        parent = element.parent
-        if parent:
+    for element in text_elements:
+        # Find the container element (could be a div, section, etc.)
+        container = element.parent
+        while container and container.name not in ['div', 'section', 'aside', 'nav']:
+            container = container.parent
+
+        if container:
             logging.info(
-                f"  Parent element: <{parent.name}> with class: {parent.get('class', 'None')}")
-            # Find the container element (could be a div, section, etc.)
-            container = parent
-            while container and container.name not in ['div', 'section', 'aside', 'nav']:
-                container = container.parent
-
-            if container:
-                logging.info(
-                    f"  Found container: <{container.name}> with class: {container.get('class', 'None')} and id: {container.get('id', 'None')}")
-                single_card_section = container
-                break
+                f"Found container: <{container.name}> with class: {container.get('class', 'None')} and id: {container.get('id', 'None')}")
+            single_card_section = container
+            break
 
     if single_card_section:
         logging.info("Found シングルカード販売 section")
 
-        # Categories to look for under シングルカード販売
-        categories = [
-            "最新弾",
-            "基本ブースターパック",
-            "その他ブースターパック",
-            "構築済みデッキ",
-            "デュエルターミナル",
-            "限定パック",
-            "プロモーションカード"
-        ]
-
-        logging.info(f"Looking for categories: {categories}")
-
-        # Search for each category and its associated links
-        for category in categories:
-            logging.info(f"\n--- Searching for category: {category} ---")
-
-            # Find text elements that contain this category name
-            category_elements = single_card_section.find_all(
-                string=re.compile(category))
-            logging.info(
-                f"Found {len(category_elements)} text elements containing '{category}'")
-
-            for cat_element in category_elements:
-                logging.info(f"Category element text: '{cat_element.strip()}'")
-
-                # Get the parent container of this category
-                category_parent = cat_element.parent
-                if category_parent:
-                    logging.info(
-                        f"Category parent: <{category_parent.name}> with class: {category_parent.get('class', 'None')}")
-
-                    # Look for container that might hold the category and its links
-                    category_container = category_parent
-                    for _ in range(5):  # Search up to 5 levels up
-                        if category_container and category_container.parent:
-                            category_container = category_container.parent
-
-                            # Look for links within this container level
-                            container_links = category_container.find_all(
-                                ['a', '*'], attrs={'onclick': True})
-                            if container_links:
-                                logging.info(
-                                    f"Found {len(container_links)} clickable elements at container level <{category_container.name}>")
-
-                                for link in container_links:
-                                    onclick_value = link.get('onclick', '')
-                                    link_text = link.text.strip()
-
-                                    # Look for location.href patterns in onclick
-                                    location_href_match = re.search(
-                                        r"location\.href\s*=\s*['\"]([^'\"]+)['\"]", onclick_value)
-                                    if location_href_match:
-                                        url = location_href_match.group(1)
-                                        logging.info(
-                                            f"  ✓ Found location.href URL in {category}: {url}")
-
-                                        # Check if URL matches the /ygo/s/ pattern
-                                        if '/ygo/s/' in url and '/ygo/s/search' not in url:
-                                            set_code_match = re.search(
-                                                r'/ygo/s/([a-zA-Z0-9]+)', url)
-                                            if set_code_match:
-                                                set_code = set_code_match.group(
-                                                    1).upper()
-                                                logging.info(
-                                                    f"  ✓ Extracted set code from {category}: {set_code}")
-
-                                                # Create full URL
-                                                if url.startswith('/'):
-                                                    full_url = 'https://yuyu-tei.jp' + url
-                                                elif not url.startswith('http'):
-                                                    full_url = 'https://yuyu-tei.jp' + url
-                                                else:
-                                                    full_url = url
-
-                                                # Remove hash fragments for consistency
-                                                full_url = full_url.split('#')[
-                                                    0]
-
-                                                obj = {
-                                                    'url': full_url,
-                                                    'set_code': set_code
-                                                }
-
-                                                # Check for duplicates
-                                                if not any(item['set_code'] == set_code for item in dict_list):
-                                                    dict_list.append(
-                                                        obj.copy())
-                                                    logging.info(
-                                                        f"  ✓ Added to dict_list from {category}: {obj}")
-                                                else:
-                                                    logging.info(
-                                                        f"  ◦ Duplicate set_code {set_code}, skipping")
-                                break  # Found links at this level, no need to go deeper
-                        else:
-                            break
-
-        # Search for sell links only (skip buy links)
-        logging.info("\n--- Searching for sell links (skipping buy links) ---")
-
-        # Look for direct sell links first
-        sell_links = single_card_section.find_all(
-            'a', href=re.compile(r'/sell/ygo/s/'))
-        logging.info(f"Found {len(sell_links)} direct sell links")
-
-        for i, link in enumerate(sell_links):
-            link_id = link.get('id', '')
-            href = link.get('href', '')
-            text = link.text.strip()
-            logging.info(
-                f"Sell link {i+1}: id='{link_id}', href='{href}', text='{text}'")
-
-            # Extract set code from href
-            set_code_match = re.search(r'/sell/ygo/s/([a-zA-Z0-9]+)', href)
-            if set_code_match:
-                set_code = set_code_match.group(1).upper()
-                logging.info(
-                    f"  ✓ Extracted set code from sell URL: {set_code}")
-
-                # Create full URL if needed
-                if href.startswith('/'):
-                    full_url = 'https://yuyu-tei.jp' + href
-                elif not href.startswith('http'):
-                    full_url = 'https://yuyu-tei.jp' + href
-                else:
-                    full_url = href
-
-                # Remove hash fragments for consistency
-                full_url = full_url.split('#')[0]
-
-                obj = {
-                    'url': full_url,
-                    'set_code': set_code
-                }
-
-                # Check for duplicates
-                if not any(item['set_code'] == set_code for item in dict_list):
-                    dict_list.append(obj.copy())
-                    logging.info(
-                        f"  ✓ Added to dict_list from sell link: {obj}")
-                else:
-                    logging.info(
-                        f"  ◦ Duplicate set_code {set_code}, skipping")
-
-        # Search for toggle-buy-ygo-s- pattern links but skip them (just log for info)
-        logging.info(
-            "\n--- Found toggle-buy-ygo-s- pattern links (skipping as requested) ---")
-        toggle_links = single_card_section.find_all(
-            'a', id=re.compile(r'^toggle-buy-ygo-s-'))
-        logging.info(
-            f"Found {len(toggle_links)} toggle-buy-ygo-s- pattern links (will skip these)")
-
-        for i, link in enumerate(toggle_links):
-            link_id = link.get('id', '')
-            href = link.get('href', '')
-            text = link.text.strip()
-            logging.info(
-                f"Skipping buy link {i+1}: id='{link_id}', href='{href}', text='{text}'")
-            logging.info(f"  ✗ Skipping because it's a buy link")
-
-        # Additional fallback: Search for any /sell/ygo/s/ patterns only (skip buy links)
-        logging.info(
-            "\n--- Final fallback: Searching for /sell/ygo/s/ patterns only ---")
-        all_sell_elements = single_card_section.find_all(['a', '*'],
-                                                         href=lambda x: x and '/sell/ygo/s/' in x
-                                                         )
-        logging.info(
-            f"Found {len(all_sell_elements)} elements with /sell/ygo/s/ patterns")
-
-        for element in all_sell_elements:
-            href = element.get('href', '')
-            onclick = element.get('onclick', '')
-            element_id = element.get('id', '')
-            text = element.text.strip()
-
-            # Process href (only sell links)
-            if href and '/sell/ygo/s/' in href and '/ygo/s/search' not in href:
-                set_code_match = re.search(r'/sell/ygo/s/([a-zA-Z0-9]+)', href)
-                if set_code_match:
-                    set_code = set_code_match.group(1).upper()
-                    if not any(item['set_code'] == set_code for item in dict_list):
-                        if href.startswith('/'):
-                            full_url = 'https://yuyu-tei.jp' + href
-                        else:
-                            full_url = href
-
-                        full_url = full_url.split('#')[0]
-                        obj = {'url': full_url, 'set_code': set_code}
-                        dict_list.append(obj.copy())
-                        logging.info(
-                            f"  ✓ Added from final fallback (href): {obj}")
-
-            # Process onclick (only sell links)
-            if onclick and '/sell/ygo/s/' in onclick:
-                location_href_match = re.search(
-                    r"location\.href\s*=\s*['\"]([^'\"]+)['\"]", onclick)
-                if location_href_match:
-                    url = location_href_match.group(1)
-                    if '/sell/ygo/s/' in url and '/ygo/s/search' not in url:
-                        set_code_match = re.search(
-                            r'/sell/ygo/s/([a-zA-Z0-9]+)', url)
-                        if set_code_match:
-                            set_code = set_code_match.group(1).upper()
-                            if not any(item['set_code'] == set_code for item in dict_list):
-                                if url.startswith('/'):
-                                    full_url = 'https://yuyu-tei.jp' + url
-                                else:
-                                    full_url = url
-                                full_url = full_url.split('#')[0]
-                                obj = {'url': full_url, 'set_code': set_code}
-                                dict_list.append(obj.copy())
-                                logging.info(
-                                    f"  ✓ Added from final fallback (onclick): {obj}")
-
-        # Log any buy links found for information (but don't process them)
-        buy_elements = single_card_section.find_all('a',
-                                                    href=lambda x: x and '/buy/ygo/s/' in x
-                                                    )
-        if buy_elements:
-            logging.info(
-                f"\n--- Found {len(buy_elements)} buy links (skipped as requested) ---")
-            for i, element in enumerate(buy_elements[:5]):  # Show first 5 only
-                href = element.get('href', '')
-                onclick = element.get('onclick', '')
-                logging.info(
-                    f"Skipped buy element {i+1}: href='{href}', onclick='{onclick[:50]}...'")
-        else:
-            logging.info("\n--- No buy links found ---")
+        # The category blocks (最新弾, 基本ブースターパック, ...) all live inside this section,
+        # so one walk over its clickable elements finds every set link. Buy links are skipped.
+        clickable_elements = single_card_section.find_all(
+            lambda tag: tag.has_attr('href') or tag.has_attr('onclick'))
+        for element in clickable_elements:
+            for value in (element.get('onclick'), element.get('href')):
+                if value:
+                    registry.add_sell_link(value)
 
         logging.info(
-            f"Total items added from シングルカード販売 section: {len(dict_list)}")
+            f"Total items added from シングルカード販売 section: {len(registry)}")
     else:
         # Fallback: Original method - check for the old div structure
         logging.warning(
@@ -691,88 +855,27 @@ def get_set_list_v2(url: str) -> list[dict]:
                 "a", attrs={'id': re.compile(r'^(side-sell-ygo-s-).?')})
 
             for a in inputs:
-                obj = {}
                 a_text = a.text.strip() if a.text else None
                 a_href = a.get('href', None)
                 if a_href:
-                    obj['url'] = a_href
-                if a_text:
-                    obj['set_code'] = get_set_code(a_text)
-                dict_list.append(obj.copy())
+                    registry.add(a_href, get_set_code(a_text) if a_text else None)
         else:
             # Alternative method - scan all links
             logging.warning(
                 "Original sidebar not found, using alternative method")
-            all_links = soup.find_all('a', href=True)
-
-            for link in all_links:
+            for link in soup.find_all('a', href=True):
                 href = link.get('href', '')
-                text = link.text.strip()
 
-                # Check if link matches the pattern for set pages
+                # Check if link matches the pattern for set pages (e.g. '/ygo/s/wpp6' -> 'WPP6')
                 if '/ygo/s/' in href and href != '/ygo/s/search':
-                    # Extract set code from URL (e.g., '/ygo/s/wpp6' -> 'WPP6')
-                    set_code_match = re.search(r'/ygo/s/([a-zA-Z0-9]+)', href)
-                    if set_code_match:
-                        set_code = set_code_match.group(1).upper()
-
-                        # Create full URL if it's relative
-                        if href.startswith('/'):
-                            full_url = 'https://yuyu-tei.jp' + href
-                        else:
-                            full_url = href
-
-                        obj = {
-                            'url': full_url,
-                            'set_code': set_code
-                        }
-                        dict_list.append(obj.copy())
-
-                    # Look for set codes in brackets like [WPP6], [SD48], etc.
-                    set_code_match = re.search(r'\[([A-Z0-9]+)\]', text)
-                    if set_code_match:
-                        set_code = set_code_match.group(1)
-
-                        # Create full URL if it's relative
-                        if href.startswith('/'):
-                            full_url = 'https://yuyu-tei.jp' + href
-                        else:
-                            full_url = href
-
-                        obj = {
-                            'url': full_url,
-                            'set_code': set_code
-                        }
-                        dict_list.append(obj.copy())
-
-    dict_list = add_additional_url(dict_list)
-
-    # Remove duplicates while preserving the first occurrence
-    seen_keys = set()
-    unique_data = []
-    for item in dict_list:
-        if item['url'] not in seen_keys:
-            seen_keys.add(item['url'])
-            unique_data.append(item)
-
-    return unique_data
-
-
-def add_additional_url(dict_list: list[dict]):
-    """
-    Adds manually specified URLs for card sets that may not be found through scraping.
-
-    Args:
-        dict_list (list[dict]): Existing list of set dictionaries
+                    if not registry.add(href):
+                        # Look for set codes in brackets like [WPP6], [SD48], etc.
+                        set_code_match = re.search(
+                            r'\[([A-Z0-9]+)\]', link.text.strip())
+                        if set_code_match:
+                            registry.add(href, set_code_match.group(1))
 
-    Returns:
-        list[dict]: Updated list with additional QCCU and QCCP set entries
-    """
-    dict_list.append({'url': 'https://yuyu-tei.jp/sell/ygo/s/search?search_word=qccu&page=2',
-                      'set_code': 'QCCU'})
-    dict_list.append({'url': 'https://yuyu-tei.jp/sell/ygo/s/search?search_word=qccp&page=2',
-                      'set_code': 'QCCP'})
-    return dict_list
+    return registry.to_list()
 
 
 def replace_dt_rarity_name(input_df: pd.DataFrame):
@@ -813,18 +916,88 @@ def replace_dt_rarity_name(input_df: pd.DataFrame):
     return input_df
 
 
-def yuyutei_scrape(dev_type=None):
+def build_yuyutei_price_df(rows: list[dict], date: datetime.datetime) -> pd.DataFrame:
+    """
+    Normalizes scraped card rows into the yuyutei table layout.
+
+    Args:
+        rows (list[dict]): Card rows from the set pages
+        date (datetime.datetime): Scrape time stored in the date column
+
+    Returns:
+        pd.DataFrame: Price, card_set_card_code, mapped_rarity and date columns
+    """
+    df = pd.DataFrame(rows)
+    logging.debug(f"DataFrame shape: {df.shape}")
+
+    rarity_dict = get_rarity_mapping_dict()
+    df["mapped_rarity"] = df["card_rarity"].map(rarity_dict)
+    df['date'] = date
+
+    # Drop card_carity column
+    df = df.drop(columns=['card_rarity'])
+
+    # Drop rows with missing values in key columns
+    df = df.dropna(subset=['mapped_rarity', 'card_set_card_code'])
+
+    df = replace_dt_rarity_name(df)
+
+    return df[['Price', 'card_set_card_code', 'mapped_rarity', 'date']]
+
+
+def get_page_entry_path(url: str) -> str:
+    """
+    Path of the cache entry of one set page, named after a hash of its URL.
+    """
+    return os.path.join(YUYUTEI_PAGE_ENTRY_DIR, f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json")
+
+
+def load_page_entries(urls: Iterable[str]) -> dict:
+    """
+    Loads the cache entries of the given set pages, leaving out pages without one.
+
+    Args:
+        urls (Iterable[str]): Set page URLs
+
+    Returns:
+        dict: Entry per URL, see get_card_set_codes_if_changed
+    """
+    entries = {}
+    for url in urls:
+        entry = load_json_cache(get_page_entry_path(url))
+        if entry:
+            entries[url] = entry
+    return entries
+
+
+def save_page_entries(entries: dict) -> None:
+    """
+    Saves the cache entries of the given set pages, each to its own file.
+
+    Args:
+        entries (dict): Entry per set page URL
+    """
+    for url, entry in entries.items():
+        save_json_cache(entry, get_page_entry_path(url))
+
+
+def yuyutei_scrape(dev_type=None, is_incremental: bool = True):
     """
     Main function to scrape card pricing data from Yuyutei website and upload to database.
 
     This function orchestrates the entire scraping process:
-    1. Fetches all card sets from the main page
-    2. Scrapes individual card data from each set using concurrent threads
+    1. Fetches all card sets from the main page over plain HTTP, falling back to
+       Selenium when sets found by the previous run are missing
+    2. Scrapes individual card data from each set using concurrent threads, skipping
+       set pages whose card list has not changed since the previous run
     3. Processes and normalizes the data
-    4. Uploads results to AWS S3 and database
+    4. Appends the changed rows to the yuyutei history table in micro-batches as sets
+       complete, then rewrites yuyutei_latest
 
     Args:
-        dev_type (optional): Development mode parameter (currently unused)
+        dev_type (optional): Development mode parameter. "verify_discovery" also runs the
+                             Selenium discovery and logs any sets the HTTP discovery missed.
+        is_incremental (bool): If False, ignore the page cache and rescrape every set.
 
     Returns:
         None: Function performs side effects (data upload) and logs execution time
@@ -834,61 +1007,129 @@ def yuyutei_scrape(dev_type=None):
 
     logging.info(start.strftime("%Y-%m-%d %H:%M:%S"))
 
-    url2 = "https://yuyu-tei.jp/sell/ygo/s/search"
-
-    # Try Selenium method first for dynamic content, fallback to regular method
-    if SELENIUM_AVAILABLE:
-        logging.info(
-            "Using Selenium method to extract set links from dynamic content")
-        card_set_obj_list: list[dict] = get_set_list_selenium(url2)
-    else:
+    url2 = YUYUTEI_SEARCH_URL
+
+    # {"sets": [set], "latest_synced": bool}; the entry of each set page (see
+    # get_card_set_codes_if_changed) is stored on its own by save_page_entries
+    cache: dict = load_json_cache(YUYUTEI_PAGE_CACHE_PATH)
+    if cache.get('pages'):
+        # Caches written before entries had their own files
+        save_page_entries(cache.pop('pages'))
+        save_json_cache(cache, YUYUTEI_PAGE_CACHE_PATH)
+    previous_sets: list[dict] = cache.get('sets', [])
+    is_synced_on_disk = cache.get('latest_synced', False)
+
+    # Read set links straight from the server-rendered page; only start a browser
+    # when the page no longer exposes all of them
+    registry = SetRegistry(get_set_list_http(url2))
+    if dev_type == "verify_discovery" and SELENIUM_AVAILABLE:
+        selenium_set_list = get_set_list_selenium(url2)
+        compare_set_lists(registry.to_list(), selenium_set_list)
+        registry.extend(selenium_set_list)
+    missing_set_codes = get_missing_set_codes(registry, previous_sets)
+    if (not registry or missing_set_codes) and SELENIUM_AVAILABLE:
+        logging.warning(
+            f"HTTP discovery found {len(registry)} sets and missed {len(missing_set_codes)} from the last run "
+            f"{missing_set_codes}, using Selenium method to extract set links from dynamic content")
+        registry.extend(get_set_list_selenium(url2))
+    elif not registry:
         logging.warning(
-            "Selenium not available, using regular method (may find fewer sets)")
-        card_set_obj_list: list[dict] = get_set_list_v2(url2)
-    final_list: list[dict] = []
+            "No sets found over HTTP and Selenium not available, using regular method (may find fewer sets)")
+        registry.extend(get_set_list_v2(url2))
 
-    with ThreadPoolExecutor(4) as executor:
-        futures: list = []
+    missing_set_codes = get_missing_set_codes(registry, previous_sets)
+    if missing_set_codes:
+        logging.warning(
+            f"{len(missing_set_codes)} sets found by the last run were not discovered and will drop out of "
+            f"yuyutei_latest: {missing_set_codes}")
+        # yuyutei_latest still holds their rows, so it has to be rewritten even if no page changed
+        cache['latest_synced'] = False
+    card_set_obj_list: list[dict] = registry.to_list()
+    cache['sets'] = card_set_obj_list
+    page_cache: dict = load_page_entries(obj['url'] for obj in card_set_obj_list)
+    status_counts = {'changed': 0, 'unchanged': 0, 'failed': 0}
+    date = datetime.datetime.now()
+
+    # Changed sets waiting to be appended to the history table. Their page cache entries
+    # are only stored once the rows are flushed, so a crashed run resumes where it stopped.
+    pending_dfs: list[pd.DataFrame] = []
+    pending_entries: dict = {}
+    # Unchanged sets whose validators moved, saved once at the end
+    refreshed_entries: dict = {}
+    last_flush = time.monotonic()
+
+    def flush_pending() -> None:
+        nonlocal last_flush, is_synced_on_disk
+        if not pending_entries:
+            return
+        if pending_dfs:
+            batch_df = pd.concat(pending_dfs, ignore_index=True)
+            write_to_sinks(
+                [(batch_df, [MySQLSink('yuyutei', 'append', 'yugioh_data')])])
+            logging.info(
+                f"Flushed {len(batch_df)} rows from {len(pending_entries)} sets")
+            cache['latest_synced'] = False
+            if is_synced_on_disk:
+                # Saved before the entries, so a crash here cannot leave yuyutei_latest stale
+                save_json_cache(cache, YUYUTEI_PAGE_CACHE_PATH)
+                is_synced_on_disk = False
+        save_page_entries(pending_entries)
+        page_cache.update(pending_entries)
+        pending_dfs.clear()
+        pending_entries.clear()
+        last_flush = time.monotonic()
+
+    limiter = get_host_limiter(YUYUTEI_HOST)
+    with ThreadPoolExecutor(limiter.max_limit) as executor:
+        futures: dict = {}
 
         for obj in card_set_obj_list:
-            futures.append(executor.submit(
-                get_card_set_codes_from_card_set, obj))
+            cache_entry = page_cache.get(obj['url']) if is_incremental else None
+            futures[executor.submit(
+                get_card_set_codes_if_changed, obj, cache_entry)] = obj
 
         for future in concurrent.futures.as_completed(futures):
             try:
-                future_list = future.result()
-                final_list.extend(future_list)
+                future_list, entry, status = future.result()
             except Exception as e:
                 logging.error(e)
                 continue
+            status_counts[status] += 1
+            url = futures[future]['url']
+            if status == 'changed':
+                if future_list:
+                    pending_dfs.append(build_yuyutei_price_df(future_list, date))
+                pending_entries[url] = entry
+            elif entry is not None and entry != page_cache.get(url):
+                page_cache[url] = refreshed_entries[url] = entry
+
+            if sum(len(df) for df in pending_dfs) >= YUYUTEI_FLUSH_ROWS or \
+                    time.monotonic() - last_flush >= YUYUTEI_FLUSH_SECONDS:
+                flush_pending()
+
+    flush_pending()
+    save_page_entries(refreshed_entries)
+    save_json_cache(cache, YUYUTEI_PAGE_CACHE_PATH)
+    limiter.log_summary()
+    logging.info(
+        f"Set pages: {status_counts['changed']} changed, {status_counts['unchanged']} skipped as unchanged, "
+        f"{status_counts['failed']} failed")
 
-    # Check if final_list is empty
-    if not final_list:
+    if cache.get('latest_synced', False):
+        logging.info("No set page changed since the last run, nothing to upload")
+        return
+
+    # The latest table holds every current set, including the ones skipped as unchanged
+    latest_rows = [row for obj in card_set_obj_list
+                   for row in page_cache.get(obj['url'], {}).get('rows', [])]
+    if not latest_rows:
         logging.warning("No data found. Exiting the function.")
         return  # Exit the function early
 
-    df = pd.DataFrame(final_list)
-    logging.info(f"DataFrame shape: {df.shape}")
-    logging.info(f"DataFrame columns: {df.columns}")
-
-    rarity_dict = get_rarity_mapping_dict()
-    df["mapped_rarity"] = df["card_rarity"].map(rarity_dict)
-    df['date'] = datetime.datetime.now()
-
-    # Drop card_carity column
-    df = df.drop(columns=['card_rarity'])
-
-    # Drop rows with missing values in key columns
-    df = df.dropna(subset=['mapped_rarity', 'card_set_card_code'])
-
-    df = replace_dt_rarity_name(df)
-
-    buffer = BytesIO()
-    df.to_csv(buffer, index=False)
-
-    df = df[['Price', 'card_set_card_code', 'mapped_rarity', 'date']]
-    upload_data(df, 'yuyutei', 'append', 'yugioh_data')
-    upload_data(df, 'yuyutei_latest', 'replace', 'yugioh_data')
+    write_to_sinks([(build_yuyutei_price_df(latest_rows, date),
+                     [MySQLSink('yuyutei_latest', 'replace', 'yugioh_data')])])
+    cache['latest_synced'] = True
+    save_json_cache(cache, YUYUTEI_PAGE_CACHE_PATH)
 
     end = datetime.datetime.now()
     logging.info(f"Start time: {start.strftime('%Y-%m-%d %H:%M:%S')}")
@@ -1,12 +1,32 @@
-from typing import Dict, List, Literal, Optional
+from functools import lru_cache
+import gzip
+import io
+from typing import Any, Dict, Iterator, List, Literal, Mapping, Optional, Sequence
 import boto3
+from boto3.s3.transfer import TransferConfig
 from io import BytesIO, StringIO
 import sys
-from sqlalchemy import create_engine, text
+from sqlalchemy import Select, column, literal_column, select, table
 import logging
 import pandas as pd
 import pymysql
-from ..config import RDS_HOST, NAME, DB_PASSWORD, TEKKX_SCALABLE_DB_NAME, DB_PORT
+from .storage_backends import get_storage_backend
+from ..config import TEKKX_SCALABLE_DB_NAME, DEFAULT_DB_CHUNKSIZE, S3_ENDPOINT_URL, S3_MULTIPART_PART_SIZE
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# S3 rejects multipart parts smaller than 5 MiB (except the last one)
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+
+S3_CONTENT_TYPES = {
+    "csv": "text/csv",
+    "json": "application/json",
+    "parquet": "application/vnd.apache.parquet",
+}
 
 
 # Setup logging
@@ -18,36 +38,205 @@ def save_df_to_mysql(df: pd.DataFrame, table_name: str, if_exists="replace") ->
     _, engine = get_engine_for_tekkx_scalable_db(
         db_name="yugioh_data")  # or your actual DB
     try:
-        df.to_sql(table_name, con=engine, index=False,
-                  if_exists=if_exists, method='multi')  # type: ignore
-        logging.info(f"✅ Successfully uploaded to MySQL table: {table_name}")
+        get_storage_backend().write_df(df, engine, table_name,
+                                       if_exists, method='multi')  # type: ignore
+        logging.info(f"✅ Successfully uploaded to table: {table_name}")
     except Exception as e:
-        logging.info(f"❌ Error uploading to MySQL: {e}")
+        logging.info(f"❌ Error uploading to database: {e}")
+
+
+@lru_cache(maxsize=None)
+def get_s3_client():
+    """
+    Return a shared S3 client. boto3 clients are thread-safe, so one client is reused
+    for every upload. Set S3_ENDPOINT_URL to target an S3-compatible server (e.g. MinIO).
+    """
+    return boto3.client('s3', endpoint_url=S3_ENDPOINT_URL)
+
+
+class S3MultipartWriter(io.RawIOBase):
+    """
+    A writable file object that streams to an S3 object.
+
+    Data is buffered up to ``part_size`` bytes and sent as multipart upload parts, so
+    memory stays bounded by one part regardless of the object size. Objects smaller
+    than one part are sent with a single put_object. Leaving a ``with`` block through
+    an exception aborts the multipart upload instead of completing it.
+    """
+
+    def __init__(self, bucket_name: str, object_key: str,
+                 part_size: int = S3_MULTIPART_PART_SIZE,
+                 content_type: Optional[str] = None,
+                 content_encoding: Optional[str] = None):
+        super().__init__()
+        self.bucket_name = bucket_name
+        self.object_key = object_key
+        self.part_size = max(part_size, S3_MIN_PART_SIZE)
+        self.extra_args: Dict[str, str] = {}
+        if content_type:
+            self.extra_args['ContentType'] = content_type
+        if content_encoding:
+            self.extra_args['ContentEncoding'] = content_encoding
+        self._client = get_s3_client()
+        self._buffer = bytearray()
+        self._position = 0
+        self._upload_id: Optional[str] = None
+        self._parts: List[Dict[str, Any]] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def write(self, b) -> int:
+        if self.closed:
+            raise ValueError("write to closed S3MultipartWriter")
+        data = memoryview(b).cast("B")
+        self._buffer.extend(data)
+        self._position += len(data)
+        while len(self._buffer) >= self.part_size:
+            self._upload_part(bytes(self._buffer[:self.part_size]))
+            del self._buffer[:self.part_size]
+        return len(data)
+
+    def _upload_part(self, body: bytes) -> None:
+        if self._upload_id is None:
+            self._upload_id = self._client.create_multipart_upload(
+                Bucket=self.bucket_name, Key=self.object_key, **self.extra_args)['UploadId']
+        part_number = len(self._parts) + 1
+        response = self._client.upload_part(Bucket=self.bucket_name, Key=self.object_key,
+                                            UploadId=self._upload_id, PartNumber=part_number, Body=body)
+        self._parts.append({'ETag': response['ETag'], 'PartNumber': part_number})
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            if self._upload_id is None:
+                self._client.put_object(Bucket=self.bucket_name, Key=self.object_key,
+                                        Body=bytes(self._buffer), **self.extra_args)
+            else:
+                if self._buffer:
+                    self._upload_part(bytes(self._buffer))
+                self._client.complete_multipart_upload(Bucket=self.bucket_name, Key=self.object_key,
+                                                       UploadId=self._upload_id,
+                                                       MultipartUpload={'Parts': self._parts})
+            self._buffer.clear()
+        except Exception:
+            self.abort()
+            raise
+        finally:
+            super().close()
+
+    def abort(self) -> None:
+        if self._upload_id is not None:
+            try:
+                self._client.abort_multipart_upload(Bucket=self.bucket_name, Key=self.object_key,
+                                                    UploadId=self._upload_id)
+            except Exception as e:
+                logger.error(f"Failed to abort multipart upload of {self.object_key}: {e}")
+            self._upload_id = None
+        self._buffer.clear()
+        super().close()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+def open_compressed_stream(raw: io.RawIOBase, compression: Optional[Literal['gzip', 'zstd']] = None):
+    """
+    Wrap a writable binary stream with an on-the-fly compressor.
+
+    Args:
+        raw: The binary stream receiving the compressed bytes.
+        compression (str, optional): 'gzip', 'zstd' or None for no compression.
+
+    Returns:
+        A writable binary stream. Closing it flushes the compressor but leaves ``raw`` open.
+    """
+    if compression is None:
+        return io.BufferedWriter(_NonClosingWriter(raw))
+    if compression == "gzip":
+        # A fixed mtime keeps the bytes identical between runs with the same data
+        return gzip.GzipFile(fileobj=raw, mode="wb", mtime=0)
+    if compression == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise ImportError(
+                "zstandard not available. Install with: pip install zstandard")
+        return zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+    raise ValueError(f"Unsupported compression: {compression}")
 
 
-def save_df_to_s3(df: pd.DataFrame, bucket_name: str, dir: str, filename_for_backup: str) -> None:
+class _NonClosingWriter(io.RawIOBase):
+    def __init__(self, raw: io.RawIOBase):
+        super().__init__()
+        self._raw = raw
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        return self._raw.write(b)
+
+    def tell(self) -> int:
+        return self._raw.tell()
+
+
+def write_df_to_stream(df: pd.DataFrame, stream, file_format: Literal['csv', 'parquet'] = "csv",
+                       chunksize: int = DEFAULT_DB_CHUNKSIZE) -> None:
     """
-    Save a pandas DataFrame to an S3 bucket as a CSV file.
+    Serialize a DataFrame into a binary stream without rendering the whole file in memory.
+
+    CSV is written ``chunksize`` rows at a time. Parquet is written by pyarrow, one row
+    group per chunk.
+    """
+    if file_format == "csv":
+        text_stream = io.TextIOWrapper(stream, encoding="utf-8", newline="",
+                                       write_through=True)
+        try:
+            for i in range(0, max(len(df), 1), chunksize):
+                df.iloc[i:i + chunksize].to_csv(text_stream, index=False, header=(i == 0))
+            text_stream.flush()
+        finally:
+            text_stream.detach()
+    elif file_format == "parquet":
+        df.to_parquet(stream, index=False, row_group_size=chunksize)
+    else:
+        raise ValueError(f"Unsupported file format: {file_format}")
+
+
+def save_df_to_s3(df: pd.DataFrame, bucket_name: str, dir: str, filename_for_backup: str,
+                  file_format: Literal['csv', 'parquet'] = "csv",
+                  compression: Optional[Literal['gzip', 'zstd']] = None) -> None:
+    """
+    Stream a pandas DataFrame to an S3 bucket, optionally compressed.
+
+    The file is serialized in chunks and sent with a multipart upload, so peak memory
+    stays around one upload part instead of the size of the export.
 
     Args:
         df (pd.DataFrame): The DataFrame to save.
         bucket_name (str): The name of the S3 bucket.
         dir (str): The directory path inside the bucket.
-        filename_for_backup (str): The filename for the backup CSV file.
+        filename_for_backup (str): The filename for the backup file.
+        file_format (str): 'csv' or 'parquet'.
+        compression (str, optional): 'gzip' or 'zstd' compression applied on the fly.
 
     Raises:
         Exception: If the S3 upload fails.
     """
+    object_key = f"{dir}{filename_for_backup}"
     try:
-        buffer = BytesIO()
-        df.to_csv(buffer, index=False, encoding="utf-8")
-        buffer.seek(0)
-
-        client = boto3.client('s3')
-        client.put_object(Body=buffer.getvalue(),
-                          Bucket=bucket_name, Key=f"{dir}{filename_for_backup}")
+        with S3MultipartWriter(bucket_name, object_key, content_type=S3_CONTENT_TYPES[file_format],
+                               content_encoding=compression) as writer:
+            with open_compressed_stream(writer, compression) as stream:
+                write_df_to_stream(df, stream, file_format)
         logger.info(
-            f"DataFrame successfully uploaded to S3: {bucket_name}/{dir}{filename_for_backup}")
+            f"DataFrame successfully uploaded to S3: {bucket_name}/{object_key}")
     except Exception as e:
         logger.error(f"Failed to save DataFrame to S3: {e}")
         raise
@@ -61,17 +250,41 @@ def save_to_s3(bucket_name: str, object_key: str, body_buffer: StringIO, file_ty
         bucket_name (str): The name of the S3 bucket.
         object_key (str): The S3 object key (file path).
         body_buffer (StringIO): The buffer containing data to be uploaded.
-        file_type (str): The type of the file ('json' or 'csv').
+        file_type (str): The type of the file ('json' or 'csv'), sent as its ContentType.
 
     Raises:
         Exception: If the S3 upload fails.
     """
-    try:
-        s3_client = boto3.client('s3')
-        body = body_buffer.getvalue().encode(
-            'utf-8') if file_type == "json" else body_buffer.getvalue()
+    save_bytes_to_s3(bucket_name, object_key,
+                     body_buffer.getvalue().encode('utf-8'),
+                     content_type=S3_CONTENT_TYPES.get(file_type))
+
 
-        s3_client.put_object(Bucket=bucket_name, Key=object_key, Body=body)
+def save_bytes_to_s3(bucket_name: str, object_key: str, body: bytes,
+                     content_type: Optional[str] = None,
+                     content_encoding: Optional[str] = None) -> None:
+    """
+    Save an already serialized payload to an S3 bucket. Large payloads are sent as a
+    multipart upload by the shared client's transfer manager.
+
+    Args:
+        bucket_name (str): The name of the S3 bucket.
+        object_key (str): The S3 object key (file path).
+        body (bytes): The payload to upload.
+        content_type (str, optional): ContentType of the object.
+        content_encoding (str, optional): ContentEncoding of the object, e.g. 'gzip'.
+
+    Raises:
+        Exception: If the S3 upload fails.
+    """
+    extra_args: Dict[str, str] = {}
+    if content_type:
+        extra_args['ContentType'] = content_type
+    if content_encoding:
+        extra_args['ContentEncoding'] = content_encoding
+    try:
+        get_s3_client().upload_fileobj(BytesIO(body), bucket_name, object_key, ExtraArgs=extra_args,
+                                       Config=TransferConfig(multipart_chunksize=S3_MULTIPART_PART_SIZE))
         logger.info(
             f"File successfully uploaded to S3: {bucket_name}/{object_key}")
     except Exception as e:
@@ -79,24 +292,25 @@ def save_to_s3(bucket_name: str, object_key: str, body_buffer: StringIO, file_ty
         raise
 
 
-def upload_data(df: pd.DataFrame, table_name: str, if_exist: Literal['fail', 'replace', 'append'], db_name: Optional[str] = TEKKX_SCALABLE_DB_NAME) -> None:
+def upload_data(df: pd.DataFrame, table_name: str, if_exist: Literal['fail', 'replace', 'append'], db_name: Optional[str] = TEKKX_SCALABLE_DB_NAME, backend: Optional[str] = None) -> None:
     """
-    Upload a pandas DataFrame to a MySQL database.
+    Upload a pandas DataFrame to the configured storage backend (MySQL by default).
 
     Args:
         df (pd.DataFrame): The DataFrame to upload.
         table_name (str): The target table name.
         if_exist (Literal['fail', 'replace', 'append']): Behavior if the table exists.
         db_name (str): The name of the database.
+        backend (str, optional): Storage backend name. Defaults to STORAGE_BACKEND.
 
     Raises:
         Exception: If the data upload fails.
     """
     try:
-        engine = create_engine(
-            f"mysql+pymysql://{NAME}:{DB_PASSWORD}@{RDS_HOST}:{DB_PORT}/{db_name}")
+        storage_backend = get_storage_backend(backend)
+        engine = storage_backend.get_engine(db_name or TEKKX_SCALABLE_DB_NAME)
         logging.info(f"Connected to the database: {db_name}")
-        df.to_sql(con=engine, name=table_name, if_exists=if_exist, index=False)
+        storage_backend.write_df(df, engine, table_name, if_exist)
         logger.info(
             f"DataFrame successfully uploaded to {db_name}.{table_name}")
     except Exception as e:
@@ -106,7 +320,7 @@ def upload_data(df: pd.DataFrame, table_name: str, if_exist: Literal['fail', 're
 
 def upload_data_v2(df: pd.DataFrame, table_name: str, if_exist: Literal['fail', 'replace', 'append'], db_name: Optional[str] = TEKKX_SCALABLE_DB_NAME) -> None:
     """
-    Upload a pandas DataFrame to a MySQL database.
+    Upload a pandas DataFrame to the configured storage backend (MySQL by default).
 
     Args:
         df (pd.DataFrame): The DataFrame to upload.
@@ -118,9 +332,9 @@ def upload_data_v2(df: pd.DataFrame, table_name: str, if_exist: Literal['fail',
         Exception: If the data upload fails.
     """
     try:
-        engine = create_engine(
-            f"mysql+pymysql://{NAME}:{DB_PASSWORD}@{RDS_HOST}:{DB_PORT}/{db_name}")
-        df.to_sql(con=engine, name=table_name, if_exists=if_exist, index=False)
+        storage_backend = get_storage_backend()
+        engine = storage_backend.get_engine(db_name or TEKKX_SCALABLE_DB_NAME)
+        storage_backend.write_df(df, engine, table_name, if_exist)
         logger.info(
             f"DataFrame successfully uploaded to {db_name}.{table_name}")
     except Exception as e:
@@ -128,12 +342,13 @@ def upload_data_v2(df: pd.DataFrame, table_name: str, if_exist: Literal['fail',
         raise
 
 
-def get_engine_for_tekkx_scalable_db(db_name: str = TEKKX_SCALABLE_DB_NAME):
+def get_engine_for_tekkx_scalable_db(db_name: str = TEKKX_SCALABLE_DB_NAME, backend: Optional[str] = None):
     """
     Create and return a SQLAlchemy engine for the TekkX scalable database.
 
     Args:
         db_name (str): The name of the database to connect to.
+        backend (str, optional): Storage backend name. Defaults to STORAGE_BACKEND.
 
     Returns:
         tuple: A logger instance and a SQLAlchemy engine.
@@ -141,10 +356,8 @@ def get_engine_for_tekkx_scalable_db(db_name: str = TEKKX_SCALABLE_DB_NAME):
     Raises:
         Exception: If the connection to the database fails.
     """
-    db_uri = f"mysql+pymysql://{NAME}:{DB_PASSWORD}@{RDS_HOST}:{DB_PORT}/{db_name}"
-
     try:
-        engine = create_engine(db_uri, echo=True)
+        engine = get_storage_backend(backend).get_engine(db_name, echo=True)
         logger.info(f"Connected to the database: {db_name}")
         return logger, engine
     except pymysql.MySQLError as e:
@@ -153,40 +366,93 @@ def get_engine_for_tekkx_scalable_db(db_name: str = TEKKX_SCALABLE_DB_NAME):
         sys.exit()
 
 
-def retrieve_data_from_db_to_df(table_name: str, db_name: str = TEKKX_SCALABLE_DB_NAME) -> pd.DataFrame:
+def build_select_query(table_name: str,
+                       columns: Optional[Sequence[str]] = None,
+                       where: Optional[Mapping[str, Any]] = None) -> Select:
     """
-    Retrieve data from a MySQL database and load it into a pandas DataFrame.
+    Build a SELECT statement with optional column projection and equality filters.
+
+    Args:
+        table_name (str): The name of the table to select from.
+        columns (Sequence[str], optional): Columns to return. All columns when omitted.
+        where (Mapping[str, Any], optional): Column filters. Scalar values are matched with
+            ``=``, lists/tuples/sets with ``IN`` and ``None`` with ``IS NULL``.
+
+    Returns:
+        Select: A SQLAlchemy SELECT statement with bound parameters.
+    """
+    query = select(*[column(col) for col in columns]) if columns else select(literal_column("*"))
+    query = query.select_from(table(table_name))
+
+    for key, value in (where or {}).items():
+        if isinstance(value, (list, tuple, set)):
+            query = query.where(column(key).in_(list(value)))
+        elif value is None:
+            query = query.where(column(key).is_(None))
+        else:
+            query = query.where(column(key) == value)
+
+    return query
+
+
+def iter_data_from_db(table_name: str,
+                      db_name: str = TEKKX_SCALABLE_DB_NAME,
+                      columns: Optional[Sequence[str]] = None,
+                      where: Optional[Mapping[str, Any]] = None,
+                      dtype: Optional[Mapping[str, Any]] = None,
+                      chunksize: int = DEFAULT_DB_CHUNKSIZE,
+                      backend: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream rows from a MySQL table as DataFrame chunks using a server-side cursor.
 
     Args:
         table_name (str): The name of the table to retrieve data from.
         db_name (str): The name of the database.
+        columns (Sequence[str], optional): Columns to return. All columns when omitted.
+        where (Mapping[str, Any], optional): Equality/IN filters, see ``build_select_query``.
+        dtype (Mapping[str, Any], optional): Explicit dtypes applied to each chunk.
+        chunksize (int): Number of rows per chunk.
+        backend (str, optional): Storage backend name. Defaults to STORAGE_BACKEND.
 
-    Returns:
-        pd.DataFrame: A pandas DataFrame containing the retrieved data.
+    Yields:
+        pd.DataFrame: Chunks of at most ``chunksize`` rows.
 
     Raises:
         Exception: If the data retrieval fails.
     """
-    logger, engine = get_engine_for_tekkx_scalable_db(db_name)
+    logger, engine = get_engine_for_tekkx_scalable_db(db_name, backend)
+    query = build_select_query(table_name, columns, where)
 
     try:
-        with engine.begin() as conn:
-            df = pd.read_sql_query(
-                sql=text(f"SELECT * FROM {table_name}"), con=conn)
-            logger.info(f"Data retrieved from {db_name}.{table_name}")
-            return df
+        with engine.connect() as conn:
+            conn = conn.execution_options(stream_results=True)
+            row_count = 0
+            for chunk in pd.read_sql_query(sql=query, con=conn, dtype=dtype, chunksize=chunksize):  # type: ignore
+                row_count += len(chunk)
+                yield chunk
+            logger.info(
+                f"Streamed {row_count} rows from {db_name}.{table_name}")
     except Exception as e:
-        logger.error(f"Failed to retrieve data from database: {e}")
+        logger.error(f"Failed to stream data from database: {e}")
         raise
 
 
-def retrieve_data_from_db_to_list_of_dict(table_name: str, db_name: str = TEKKX_SCALABLE_DB_NAME) -> List[Dict]:
+def retrieve_data_from_db_to_df(table_name: str,
+                                db_name: str = TEKKX_SCALABLE_DB_NAME,
+                                columns: Optional[Sequence[str]] = None,
+                                where: Optional[Mapping[str, Any]] = None,
+                                dtype: Optional[Mapping[str, Any]] = None,
+                                backend: Optional[str] = None) -> pd.DataFrame:
     """
     Retrieve data from a MySQL database and load it into a pandas DataFrame.
 
     Args:
         table_name (str): The name of the table to retrieve data from.
         db_name (str): The name of the database.
+        columns (Sequence[str], optional): Columns to return. All columns when omitted.
+        where (Mapping[str, Any], optional): Equality/IN filters, see ``build_select_query``.
+        dtype (Mapping[str, Any], optional): Explicit dtypes for the returned columns.
+        backend (str, optional): Storage backend name. Defaults to STORAGE_BACKEND.
 
     Returns:
         pd.DataFrame: A pandas DataFrame containing the retrieved data.
@@ -194,14 +460,81 @@ def retrieve_data_from_db_to_list_of_dict(table_name: str, db_name: str = TEKKX_
     Raises:
         Exception: If the data retrieval fails.
     """
-    logger, engine = get_engine_for_tekkx_scalable_db(db_name)
+    logger, engine = get_engine_for_tekkx_scalable_db(db_name, backend)
+    query = build_select_query(table_name, columns, where)
 
     try:
         with engine.begin() as conn:
-            df = pd.read_sql_query(
-                sql=text(f"SELECT * FROM {table_name}"), con=conn)
+            df = pd.read_sql_query(sql=query, con=conn, dtype=dtype)  # type: ignore
             logger.info(f"Data retrieved from {db_name}.{table_name}")
-            return df.to_dict(orient="records")
+            return df
     except Exception as e:
         logger.error(f"Failed to retrieve data from database: {e}")
         raise
+
+
+def retrieve_data_from_db_to_list_of_dict(table_name: str,
+                                          db_name: str = TEKKX_SCALABLE_DB_NAME,
+                                          columns: Optional[Sequence[str]] = None,
+                                          where: Optional[Mapping[str, Any]] = None,
+                                          chunksize: int = DEFAULT_DB_CHUNKSIZE) -> List[Dict]:
+    """
+    Retrieve data from a MySQL database as a list of dictionaries.
+
+    Rows are streamed in chunks so the full table is never held as a DataFrame
+    and a list of dicts at the same time.
+
+    Args:
+        table_name (str): The name of the table to retrieve data from.
+        db_name (str): The name of the database.
+        columns (Sequence[str], optional): Columns to return. All columns when omitted.
+        where (Mapping[str, Any], optional): Equality/IN filters, see ``build_select_query``.
+        chunksize (int): Number of rows per streamed chunk.
+
+    Returns:
+        List[Dict]: One dictionary per row.
+
+    Raises:
+        Exception: If the data retrieval fails.
+    """
+    records: List[Dict] = []
+    for chunk in iter_data_from_db(table_name, db_name=db_name, columns=columns,
+                                   where=where, chunksize=chunksize):
+        records.extend(chunk.to_dict(orient="records"))
+    return records
+
+
+def copy_table_to_backend(table_name: str,
+                          target_backend: str,
+                          db_name: str = TEKKX_SCALABLE_DB_NAME,
+                          source_backend: Optional[str] = None,
+                          columns: Optional[Sequence[str]] = None,
+                          where: Optional[Mapping[str, Any]] = None,
+                          chunksize: int = DEFAULT_DB_CHUNKSIZE) -> int:
+    """
+    Copy a table between storage backends chunk by chunk, e.g. price history from
+    MySQL into a local DuckDB file for analysis. The target table is replaced.
+
+    Args:
+        table_name (str): The table to copy.
+        target_backend (str): Backend to write to ('sqlite', 'duckdb', ...).
+        db_name (str): The database name on both backends.
+        source_backend (str, optional): Backend to read from. Defaults to STORAGE_BACKEND.
+        columns (Sequence[str], optional): Columns to copy. All columns when omitted.
+        where (Mapping[str, Any], optional): Equality/IN filters, see ``build_select_query``.
+        chunksize (int): Number of rows per chunk.
+
+    Returns:
+        int: The number of rows copied.
+    """
+    row_count = 0
+    if_exist: Literal['replace', 'append'] = "replace"
+    for chunk in iter_data_from_db(table_name, db_name=db_name, columns=columns, where=where,
+                                   chunksize=chunksize, backend=source_backend):
+        upload_data(chunk, table_name, if_exist,
+                    db_name=db_name, backend=target_backend)
+        if_exist = "append"
+        row_count += len(chunk)
+    logger.info(
+        f"Copied {row_count} rows of {db_name}.{table_name} to {target_backend}")
+    return row_count
@@ -0,0 +1,245 @@
+import atexit
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional, Sequence
+
+try:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import TimeoutException, WebDriverException
+    SELENIUM_AVAILABLE = True
+except ImportError:
+    SELENIUM_AVAILABLE = False
+
+# Requests that are never needed to read links from a page
+DEFAULT_BLOCKED_URL_PATTERNS = (
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*connect.facebook.com*", "*clarity.ms*",
+)
+
+# True once the document has loaded, no jQuery requests are pending and the DOM has not
+# changed for arguments[0] milliseconds. The MutationObserver is installed on the first
+# call for a document, so scripts and toggles that do not go through jQuery are seen too.
+PAGE_IDLE_SCRIPT = """
+    if (window.__lastDomMutation === undefined) {
+        window.__lastDomMutation = performance.now();
+        new MutationObserver(function () { window.__lastDomMutation = performance.now(); })
+            .observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    }
+    return document.readyState === 'complete'
+        && (!window.jQuery || window.jQuery.active === 0)
+        && performance.now() - window.__lastDomMutation >= arguments[0];
+"""
+
+# Number of elements matching the CSS selector in arguments[0] that are rendered
+VISIBLE_COUNT_SCRIPT = """
+    return Array.from(document.querySelectorAll(arguments[0]),
+                      function (el) { return el.getClientRects().length > 0; })
+        .filter(Boolean).length;
+"""
+
+
+def build_chrome_options(user_agent: Optional[str] = None) -> "Options":
+    """
+    Chrome options for a headless, Docker-compatible session that skips images.
+    """
+    chrome_options = Options()
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--no-sandbox")  # Required for Docker
+    chrome_options.add_argument("--disable-dev-shm-usage")  # Required for Docker
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--disable-software-rasterizer")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-plugins")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--disable-background-timer-throttling")
+    chrome_options.add_argument("--disable-backgrounding-occluded-windows")
+    chrome_options.add_argument("--disable-renderer-backgrounding")
+    chrome_options.add_argument("--disable-features=TranslateUI")
+    chrome_options.add_argument("--disable-ipc-flooding-protection")
+    chrome_options.add_argument(
+        "--user-agent=" + (user_agent or "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"))
+    chrome_options.add_experimental_option(
+        "prefs", {"profile.managed_default_content_settings.images": 2})
+    return chrome_options
+
+
+def wait_for_page_idle(driver, timeout: float = 10.0, quiet_period: float = 0.3) -> bool:
+    """
+    Wait until the page has loaded, has no pending jQuery requests and its DOM has
+    stopped changing for ``quiet_period`` seconds.
+
+    Returns:
+        bool: False if the page was still busy when the timeout expired.
+    """
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: d.execute_script(PAGE_IDLE_SCRIPT, quiet_period * 1000))
+        return True
+    except TimeoutException:
+        logging.warning(f"Page still busy after {timeout}s: {driver.current_url}")
+        return False
+
+
+def count_visible_elements(driver, css_selector: str) -> int:
+    """
+    Count the elements matching a CSS selector that are rendered on the page.
+    """
+    return int(driver.execute_script(VISIBLE_COUNT_SCRIPT, css_selector) or 0)
+
+
+def wait_for_visible_elements(driver, css_selector: str, min_count: int = 1, timeout: float = 10.0) -> bool:
+    """
+    Wait until at least ``min_count`` elements matching a CSS selector are rendered,
+    e.g. the links a click is expected to reveal.
+
+    Returns:
+        bool: False if fewer elements were visible when the timeout expired.
+    """
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: count_visible_elements(d, css_selector) >= min_count)
+        return True
+    except TimeoutException:
+        return False
+
+
+class BrowserPool:
+    """
+    A pool of warm headless Chrome sessions.
+
+    Sessions are created on first use and kept open between ``acquire`` calls, so
+    discovery tasks don't pay Chrome start-up time on every page. Images, fonts and
+    analytics requests are blocked in every session. A session that has crashed is
+    replaced the next time it is handed out.
+    """
+
+    def __init__(self, size: int = 2,
+                 blocked_url_patterns: Sequence[str] = DEFAULT_BLOCKED_URL_PATTERNS,
+                 user_agent: Optional[str] = None):
+        if not SELENIUM_AVAILABLE:
+            raise ImportError(
+                "Selenium not available. Install with: pip install selenium")
+        self.size = size
+        self.blocked_url_patterns = list(blocked_url_patterns)
+        self.user_agent = user_agent
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._drivers: list = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+    def _create_driver(self):
+        driver = webdriver.Chrome(options=build_chrome_options(self.user_agent))
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {
+                                   "urls": self.blocked_url_patterns})
+        except WebDriverException as e:
+            logging.debug(f"Could not set blocked URLs: {e}")
+        with self._lock:
+            self._drivers.append(driver)
+        logging.info(f"Started browser session {len(self._drivers)}/{self.size}")
+        return driver
+
+    def _discard_driver(self, driver) -> None:
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _is_alive(driver) -> bool:
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None) -> Iterator["webdriver.Chrome"]:
+        """
+        Borrow a session, blocking until one is free.
+
+        Args:
+            timeout (float, optional): Seconds to wait for a free session.
+
+        Yields:
+            webdriver.Chrome: A ready browser session.
+
+        Raises:
+            TimeoutError: If no session became free in time.
+        """
+        if self._closed:
+            raise RuntimeError("BrowserPool is closed")
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("No browser session became available")
+
+        driver = None
+        try:
+            try:
+                driver = self._idle.get_nowait()
+                if not self._is_alive(driver):
+                    self._discard_driver(driver)
+                    driver = self._create_driver()
+            except queue.Empty:
+                driver = self._create_driver()
+
+            yield driver
+        except WebDriverException:
+            if driver is not None:
+                self._discard_driver(driver)
+                driver = None
+            raise
+        finally:
+            if driver is not None:
+                if self._closed:
+                    self._discard_driver(driver)
+                else:
+                    self._idle.put(driver)
+            self._slots.release()
+
+    def close(self) -> None:
+        """
+        Quit every session in the pool.
+        """
+        self._closed = True
+        with self._lock:
+            drivers = list(self._drivers)
+            self._drivers.clear()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def __enter__(self) -> "BrowserPool":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+_shared_pool: Optional[BrowserPool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_browser_pool(size: int = 2) -> BrowserPool:
+    """
+    Return the process-wide browser pool, creating it on first use. It is closed
+    automatically when the interpreter exits.
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None or _shared_pool._closed:
+            _shared_pool = BrowserPool(size=size)
+            atexit.register(_shared_pool.close)
+        return _shared_pool
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Iterator, Optional, Sequence
+
+import pandas as pd
+from .aws_utilities import iter_data_from_db, retrieve_data_from_db_to_df
+from .storage_backends import get_storage_backend
+from ..config import SNAPSHOT_CACHE_DIR, TEKKX_SCALABLE_DB_NAME, DEFAULT_DB_CHUNKSIZE
+
+# The table snapshot cache only turns on with the optional 'arrow' extra
+# (poetry install -E arrow); without it every read goes to the database.
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.ipc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logging.warning(
+        "pyarrow not available, table snapshots are disabled and tables are read from the database "
+        "every time. Install the 'arrow' extra to enable them: poetry install -E arrow")
+
+
+def get_table_fingerprint(table_name: str, db_name: str = TEKKX_SCALABLE_DB_NAME) -> str:
+    """
+    Build a cheap fingerprint of a table on the configured storage backend.
+
+    For MySQL this is the row count plus the table create/update times; see
+    ``StorageBackend.get_table_fingerprint``.
+
+    Args:
+        table_name (str): The name of the table.
+        db_name (str): The name of the database.
+
+    Returns:
+        str: A fingerprint string that changes whenever the table is rewritten.
+    """
+    backend = get_storage_backend()
+    return backend.get_table_fingerprint(backend.get_engine(db_name), table_name, db_name)
+
+
+def get_snapshot_path(table_name: str, db_name: str, columns: Optional[Sequence[str]] = None) -> str:
+    """
+    Get the local snapshot file path for a table and column projection.
+
+    Args:
+        table_name (str): The name of the table.
+        db_name (str): The name of the database.
+        columns (Sequence[str], optional): Projected columns, part of the cache key.
+
+    Returns:
+        str: Path of the Arrow IPC snapshot file.
+    """
+    columns_key = hashlib.sha1(
+        ",".join(columns or ["*"]).encode("utf-8")).hexdigest()[:10]
+    return os.path.join(SNAPSHOT_CACHE_DIR, f"{db_name}.{table_name}.{columns_key}.arrow")
+
+
+def read_snapshot_metadata(snapshot_path: str) -> dict:
+    try:
+        with open(f"{snapshot_path}.json", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def read_table_snapshot(snapshot_path: str) -> pd.DataFrame:
+    """
+    Load a whole snapshot file into a DataFrame through a memory map.
+
+    Args:
+        snapshot_path (str): Path of the snapshot.
+
+    Returns:
+        pd.DataFrame: The snapshot contents.
+    """
+    return feather.read_feather(snapshot_path, memory_map=True)
+
+
+def write_table_snapshot(df: pd.DataFrame, snapshot_path: str, fingerprint: str) -> None:
+    """
+    Write a DataFrame as an uncompressed Arrow IPC file so it can be memory-mapped on load.
+
+    The data file and its metadata are written to temporary files first and then moved
+    into place, so an interrupted run never leaves a snapshot with a stale fingerprint.
+
+    Args:
+        df (pd.DataFrame): The table contents.
+        snapshot_path (str): Destination path of the snapshot.
+        fingerprint (str): Fingerprint of the table the snapshot was taken from.
+    """
+    os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+    feather.write_feather(df, f"{snapshot_path}.tmp",
+                          compression="uncompressed")
+    with open(f"{snapshot_path}.json.tmp", "w", encoding="utf-8") as f:
+        json.dump({"fingerprint": fingerprint, "rows": len(df)}, f)
+    os.replace(f"{snapshot_path}.tmp", snapshot_path)
+    os.replace(f"{snapshot_path}.json.tmp", f"{snapshot_path}.json")
+
+
+def iter_table_snapshot(table_name: str,
+                        db_name: str = TEKKX_SCALABLE_DB_NAME,
+                        columns: Optional[Sequence[str]] = None,
+                        chunksize: int = DEFAULT_DB_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+    """
+    Stream a reference table from the local snapshot cache, refreshing it only when
+    the remote table fingerprint changes.
+
+    The cache needs pyarrow, from the optional 'arrow' extra (``poetry install -E arrow``).
+    Without it every call streams straight from the database.
+    A stale snapshot is served if the fingerprint cannot be read (e.g. no connection).
+
+    Args:
+        table_name (str): The name of the table.
+        db_name (str): The name of the database.
+        columns (Sequence[str], optional): Columns to return. All columns when omitted.
+        chunksize (int): Number of rows per chunk.
+
+    Yields:
+        pd.DataFrame: Chunks of at most ``chunksize`` rows.
+    """
+    if not PYARROW_AVAILABLE:
+        yield from iter_data_from_db(table_name, db_name=db_name, columns=columns, chunksize=chunksize)
+        return
+
+    snapshot_path = get_snapshot_path(table_name, db_name, columns)
+    cached_fingerprint = read_snapshot_metadata(
+        snapshot_path).get("fingerprint")
+
+    try:
+        fingerprint = get_table_fingerprint(table_name, db_name)
+    except Exception as e:
+        if cached_fingerprint is None or not os.path.exists(snapshot_path):
+            raise
+        logging.warning(
+            f"Could not fingerprint {db_name}.{table_name}, using cached snapshot: {e}")
+        fingerprint = cached_fingerprint
+
+    if fingerprint != cached_fingerprint or not os.path.exists(snapshot_path):
+        logging.info(
+            f"Refreshing snapshot of {db_name}.{table_name} ({fingerprint})")
+        df = retrieve_data_from_db_to_df(
+            table_name, db_name=db_name, columns=columns)
+        write_table_snapshot(df, snapshot_path, fingerprint)
+        del df
+    else:
+        logging.info(f"Using cached snapshot of {db_name}.{table_name}")
+
+    with pa.memory_map(snapshot_path, "r") as source:
+        arrow_table = pa.ipc.open_file(source).read_all()
+        for batch in arrow_table.to_batches(max_chunksize=chunksize):
+            yield batch.to_pandas()
+
+
+def load_json_cache(path: str) -> dict:
+    """
+    Load a JSON cache file, returning an empty cache if it is missing or unreadable.
+
+    Args:
+        path (str): Path of the cache file.
+
+    Returns:
+        dict: The cached data.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable cache {path}: {e}")
+        return {}
+
+
+def save_json_cache(data: dict, path: str) -> None:
+    """
+    Atomically write a JSON cache file.
+
+    Args:
+        data (dict): The data to cache.
+        path (str): Path of the cache file.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(f"{path}.tmp", path)
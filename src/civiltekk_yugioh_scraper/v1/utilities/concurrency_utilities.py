@@ -0,0 +1,226 @@
+import logging
+import math
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..config import (DEFAULT_INITIAL_CONCURRENCY, DEFAULT_MAX_CONCURRENCY, HOST_MAX_CONCURRENCY,
+                      CONCURRENCY_LATENCY_TARGET)
+
+# Responses that mean the host wants us to slow down
+OVERLOAD_STATUS_CODES = {429, 503}
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    An AIMD (additive increase, multiplicative decrease) limit on requests in flight to one host.
+
+    After every window of completed requests the limit grows by one if the window's p95
+    latency and error rate were healthy. A timeout, connection error, 429 or 503 halves
+    the limit straight away, at most once per window so a burst of failures from the
+    same requests only counts once.
+
+    Requests go through one ``requests.Session`` per limiter, so connections to the host
+    are kept alive and reused, with a connection pool as large as the maximum limit.
+    """
+
+    def __init__(self, host: str,
+                 initial_limit: int = DEFAULT_INITIAL_CONCURRENCY,
+                 min_limit: int = 1,
+                 max_limit: int = DEFAULT_MAX_CONCURRENCY,
+                 latency_target: float = CONCURRENCY_LATENCY_TARGET,
+                 max_error_rate: float = 0.05,
+                 window_size: int = 20):
+        self.host = host
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self.limit = min(max(initial_limit, min_limit), self.max_limit)
+        self.latency_target = latency_target
+        self.max_error_rate = max_error_rate
+        self.window_size = window_size
+
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._window_latencies: list[float] = []
+        self._window_errors = 0
+        self._completed = 0
+        self._last_decrease_at = -window_size
+        self._reset_run_stats()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_limit)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _reset_run_stats(self) -> None:
+        self._run_requests = 0
+        self._run_errors = 0
+        self._run_overloads = 0
+        self._run_latencies: list[float] = []
+        self._run_min_limit = self.limit
+        self._run_max_limit = self.limit
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, latency: float, is_error: bool = False, is_overload: bool = False) -> None:
+        """
+        Free a slot and record how the request went.
+
+        Args:
+            latency (float): Seconds the request took.
+            is_error (bool): The request failed (counts towards the error rate).
+            is_overload (bool): The host timed out or throttled us; backs off immediately.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            self._completed += 1
+            self._window_latencies.append(latency)
+            self._window_errors += is_error or is_overload
+            self._run_requests += 1
+            self._run_errors += is_error
+            self._run_overloads += is_overload
+            self._run_latencies.append(latency)
+
+            if is_overload and self._completed - self._last_decrease_at >= self.window_size:
+                self._set_limit(max(self.min_limit, self.limit // 2))
+                self._last_decrease_at = self._completed
+                self._reset_window()
+            elif len(self._window_latencies) >= self.window_size:
+                p95 = percentile(self._window_latencies, 95)
+                error_rate = self._window_errors / len(self._window_latencies)
+                if p95 <= self.latency_target and error_rate <= self.max_error_rate:
+                    self._set_limit(min(self.max_limit, self.limit + 1))
+                self._reset_window()
+
+            self._condition.notify_all()
+
+    def _set_limit(self, limit: int) -> None:
+        if limit != self.limit:
+            logging.debug(
+                f"{self.host}: concurrency {self.limit} -> {limit}")
+            self.limit = limit
+            self._run_min_limit = min(self._run_min_limit, limit)
+            self._run_max_limit = max(self._run_max_limit, limit)
+
+    def _reset_window(self) -> None:
+        self._window_latencies = []
+        self._window_errors = 0
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request within the limit, feeding its latency and outcome back into it.
+
+        With ``stream=True`` a successful response keeps its slot until it is closed, so
+        the body download counts towards the limit and its latency. Close such responses,
+        e.g. by using them as a context manager.
+
+        Raises:
+            requests.RequestException: Whatever ``requests`` raised.
+        """
+        self.acquire()
+        start = time.perf_counter()
+        is_error = is_overload = False
+        is_released_on_close = False
+        try:
+            response = self.session.request(method, url, **kwargs)
+            is_overload = response.status_code in OVERLOAD_STATUS_CODES
+            is_error = response.status_code >= 500 and not is_overload
+            if kwargs.get('stream') and response.ok:
+                self._release_on_close(response, start)
+                is_released_on_close = True
+            return response
+        except (requests.Timeout, requests.ConnectionError):
+            is_overload = True
+            raise
+        except requests.RequestException:
+            is_error = True
+            raise
+        finally:
+            if not is_released_on_close:
+                self.release(time.perf_counter() - start, is_error, is_overload)
+
+    def _release_on_close(self, response: requests.Response, start: float) -> None:
+        close = response.close
+        lock = threading.Lock()
+        is_released = False
+
+        def close_and_release() -> None:
+            nonlocal is_released
+            try:
+                close()
+            finally:
+                with lock:
+                    is_first_close, is_released = not is_released, True
+                if is_first_close:
+                    self.release(time.perf_counter() - start)
+
+        response.close = close_and_release  # type: ignore[method-assign]
+
+    def log_summary(self) -> None:
+        """
+        Log the concurrency this run settled on, then start counting a new run.
+        """
+        with self._condition:
+            p95 = percentile(self._run_latencies, 95) if self._run_latencies else 0.0
+            logging.info(
+                f"{self.host}: concurrency {self.limit} (ranged {self._run_min_limit}-{self._run_max_limit}, "
+                f"max {self.max_limit}) over {self._run_requests} requests, p95 latency {p95:.2f}s, "
+                f"{self._run_errors} errors, {self._run_overloads} timeouts/throttles")
+            self._reset_run_stats()
+
+    def __repr__(self) -> str:
+        return f"AdaptiveConcurrencyLimiter(host={self.host!r}, limit={self.limit}, max_limit={self.max_limit})"
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """
+    Nearest-rank percentile of a non-empty list.
+    """
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+_host_limiters: dict[str, AdaptiveConcurrencyLimiter] = {}
+_host_limiters_lock = threading.Lock()
+
+
+def get_host_limiter(host: str) -> AdaptiveConcurrencyLimiter:
+    """
+    Get the process-wide limiter for a host, creating it with the configured maximum.
+
+    Args:
+        host (str): Host name, e.g. 'yuyu-tei.jp'.
+
+    Returns:
+        AdaptiveConcurrencyLimiter: The shared limiter.
+    """
+    with _host_limiters_lock:
+        if host not in _host_limiters:
+            _host_limiters[host] = AdaptiveConcurrencyLimiter(
+                host, max_limit=HOST_MAX_CONCURRENCY.get(host, DEFAULT_MAX_CONCURRENCY))
+        return _host_limiters[host]
+
+
+def adaptive_get(url: str, limiter: Optional[AdaptiveConcurrencyLimiter] = None, **kwargs) -> requests.Response:
+    """
+    A GET over the pooled session of the URL's host, gated by its adaptive limiter.
+
+    Args:
+        url (str): The URL to request.
+        limiter (AdaptiveConcurrencyLimiter, optional): Limiter to use instead of the host's.
+        **kwargs: Passed on to ``requests.Session.request``. A response requested with
+            ``stream=True`` holds its slot until it is closed.
+
+    Returns:
+        requests.Response: The response.
+    """
+    limiter = limiter or get_host_limiter(urlparse(url).netloc)
+    return limiter.request("GET", url, **kwargs)
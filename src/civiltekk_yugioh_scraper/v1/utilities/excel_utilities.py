@@ -0,0 +1,353 @@
+import csv
+import json
+import logging
+import os
+import concurrent.futures
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional, Sequence, Union
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import xlsxwriter
+
+from ..config import DEFAULT_DB_CHUNKSIZE
+
+# The header style pandas uses with the xlsxwriter engine
+HEADER_FORMAT = {"bold": True, "border": 1,
+                 "align": "center", "valign": "top"}
+
+ExcelSource = Union[pd.DataFrame, Iterable[pd.DataFrame]]
+
+# The dtypes the workbook reader gives a column, by the kinds of value found in it
+SIDECAR_DTYPES = {
+    frozenset(): "float64",
+    frozenset({"integer"}): "int64",
+    frozenset({"floating"}): "float64",
+    frozenset({"integer", "floating"}): "float64",
+    frozenset({"string"}): "object",
+    frozenset({"boolean"}): "bool",
+    frozenset({"datetime"}): "datetime64[ns]",
+}
+
+
+def get_file_fingerprint(path: str) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_size}|{stat.st_mtime_ns}"
+
+
+def get_value_kind(values: pd.Series) -> str:
+    """
+    The kind of the non-missing values of a column as they come back from a workbook:
+    'integer', 'floating', 'string', 'boolean', 'datetime' or 'mixed'. Whole floats
+    count as integers, since a workbook does not keep them apart.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(object)
+    if pd.api.types.is_bool_dtype(values):
+        return "boolean"
+    if pd.api.types.is_datetime64_dtype(values):
+        return "datetime"
+    if not pd.api.types.is_numeric_dtype(values):
+        kind = pd.api.types.infer_dtype(values, skipna=True)
+        if kind not in ("integer", "floating", "mixed-integer-float", "decimal"):
+            return {"string": "string", "boolean": "boolean",
+                    "datetime": "datetime", "datetime64": "datetime", "date": "datetime"}.get(kind, "mixed")
+        values = pd.to_numeric(values)
+    return "integer" if (values % 1 == 0).all() else "floating"
+
+
+def get_sidecar_dtypes(kinds: Sequence[set], has_missing: Sequence[bool]) -> list[Optional[str]]:
+    """
+    The dtype of each sidecar column, or None where the CSV cannot reproduce how the
+    workbook reader would type it (mixed values, or missing values in an integer or
+    boolean column).
+    """
+    dtypes = []
+    for column_kinds, column_has_missing in zip(kinds, has_missing):
+        dtype = SIDECAR_DTYPES.get(frozenset(column_kinds))
+        if column_has_missing and dtype == "int64":
+            dtype = "float64"
+        elif column_has_missing and dtype == "bool":
+            dtype = None
+        dtypes.append(dtype)
+    return dtypes
+
+
+def get_csv_sidecar_paths(path: str) -> tuple[str, str]:
+    """
+    The CSV sidecar of a workbook (same name, .csv extension) and its metadata file.
+    """
+    csv_path = f"{os.path.splitext(path)[0]}.csv"
+    return csv_path, f"{csv_path}.meta.json"
+
+
+def dedup_column_names(columns: Sequence) -> list:
+    """
+    Rename repeated column names to ``x.1``, ``x.2``, ... the way ``pd.read_excel`` does.
+    """
+    names = list(columns)
+    original_names = set(names)
+    counts: defaultdict = defaultdict(int)
+    for index, original_name in enumerate(names):
+        name = original_name
+        count = counts[name]
+        while count > 0:
+            counts[original_name] = count + 1
+            name = f"{original_name}.{count}"
+            # Suffixes already taken by a later header are skipped
+            count = count + 1 if name in original_names else counts[name]
+        names[index] = name
+        counts[name] = count + 1
+    return names
+
+
+def write_excel_streaming(path: str, source: ExcelSource, sheet_name: str = "Sheet1",
+                          columns: Optional[Sequence[str]] = None,
+                          chunksize: int = DEFAULT_DB_CHUNKSIZE,
+                          csv_sidecar: bool = False) -> int:
+    """
+    Write rows to a single-sheet workbook in xlsxwriter's constant_memory mode.
+
+    Each row is flushed to disk as soon as the next one starts, so memory stays flat
+    however long the sheet is. The source can be a DataFrame or an iterator of
+    DataFrame chunks, e.g. from ``iter_data_from_db``, and is read only once. A
+    DataFrame is converted ``chunksize`` rows at a time.
+
+    With ``csv_sidecar`` the same rows are also written to ``<name>.csv``, with a
+    ``<name>.csv.meta.json`` recording the fingerprints of both files and the dtype of
+    each column, so ``read_excel_streaming`` can read the CSV instead and type it the
+    same way.
+
+    Args:
+        path (str): Destination .xlsx path.
+        source (pd.DataFrame | Iterable[pd.DataFrame]): The rows to write.
+        sheet_name (str): Name of the worksheet.
+        columns (Sequence[str], optional): Columns to write, in order. Defaults to the
+            columns of the first chunk.
+        chunksize (int): Rows converted at a time when the source is a DataFrame.
+        csv_sidecar (bool): Also write a CSV sidecar.
+
+    Returns:
+        int: Number of data rows written.
+    """
+    if isinstance(source, pd.DataFrame):
+        if columns is None:
+            columns = list(source.columns)
+        chunks: Iterable[pd.DataFrame] = (source.iloc[start:start + chunksize]
+                                          for start in range(0, len(source), chunksize))
+    else:
+        chunks = source
+    csv_path, meta_path = get_csv_sidecar_paths(path)
+    if os.path.exists(meta_path):
+        # A sidecar is only trusted once both files are complete
+        os.remove(meta_path)
+    csv_file = open(csv_path, "w", newline="", encoding="utf-8") if csv_sidecar else None
+    kinds: list[set] = []
+    has_missing: list[bool] = []
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True,
+                                          "nan_inf_to_errors": True,
+                                          "default_date_format": "yyyy-mm-dd hh:mm:ss"})
+    try:
+        worksheet = workbook.add_worksheet(sheet_name)
+        header_format = workbook.add_format(HEADER_FORMAT)
+        header: Optional[list] = list(columns) if columns is not None else None
+        if header is not None:
+            worksheet.write_row(0, 0, header, header_format)
+            if csv_file is not None:
+                pd.DataFrame(columns=header).to_csv(csv_file, index=False)
+
+        row = 0
+        for chunk in chunks:
+            if header is None:
+                header = list(chunk.columns)
+                worksheet.write_row(0, 0, header, header_format)
+                if csv_file is not None:
+                    pd.DataFrame(columns=header).to_csv(csv_file, index=False)
+            chunk = chunk.reindex(columns=header)
+            # Missing values become None, which xlsxwriter leaves as empty cells
+            values = chunk.astype(object).where(chunk.notna(), None)
+            for record in values.itertuples(index=False, name=None):
+                row += 1
+                worksheet.write_row(row, 0, record)
+            if csv_file is not None:
+                chunk.to_csv(csv_file, header=False, index=False)
+                update_column_kinds(chunk, kinds, has_missing)
+    finally:
+        workbook.close()
+        if csv_file is not None:
+            csv_file.close()
+
+    if csv_file is not None:
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"workbook": get_file_fingerprint(path),
+                       "csv": get_file_fingerprint(csv_path),
+                       "sheet_name": sheet_name,
+                       "dtypes": get_sidecar_dtypes(kinds, has_missing) if kinds
+                       else ["float64"] * len(header or [])}, f)
+
+    logging.info(f"Saved {row} rows to {path}")
+    return row
+
+
+def update_column_kinds(chunk: pd.DataFrame, kinds: list[set], has_missing: list[bool]) -> None:
+    """
+    Add the value kinds and missing values of a chunk's columns to the running totals.
+    Rows with no values at all are left out, as the workbook reader skips them.
+    """
+    chunk = chunk[chunk.notna().any(axis=1)]
+    if not kinds:
+        kinds.extend(set() for _ in range(chunk.shape[1]))
+        has_missing.extend(False for _ in range(chunk.shape[1]))
+    for index in range(chunk.shape[1]):
+        values = chunk.iloc[:, index]
+        present = values.dropna()
+        if len(present):
+            kinds[index].add(get_value_kind(present))
+        has_missing[index] = has_missing[index] or len(present) < len(values)
+
+
+def write_excel_workbooks(jobs: Sequence[tuple[str, ExcelSource, str]], max_workers: int = 4,
+                          csv_sidecar: bool = False) -> None:
+    """
+    Write independent workbooks concurrently with ``write_excel_streaming``.
+
+    All workbooks are attempted even if one fails. The first failure is re-raised
+    once every workbook has finished.
+
+    Args:
+        jobs: Triples of (path, DataFrame or chunk iterator, sheet name).
+        max_workers (int): Maximum number of workbooks written at the same time.
+        csv_sidecar (bool): Also write a CSV sidecar next to each workbook.
+
+    Raises:
+        Exception: The first error raised while writing a workbook.
+    """
+    errors: list[Exception] = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(write_excel_streaming, path, source, sheet_name,
+                                   csv_sidecar=csv_sidecar): path
+                   for path, source, sheet_name in jobs}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                logging.error(f"Failed to write {futures[future]}: {e}")
+                errors.append(e)
+
+    if errors:
+        raise errors[0]
+
+
+def get_csv_sidecar(path: str, sheet_name: Optional[str] = None) -> Optional[tuple[str, list[str]]]:
+    """
+    The CSV sidecar ``write_excel_streaming`` wrote with a workbook, and its column
+    dtypes, if neither file has changed since and every column can be typed from it.
+    """
+    csv_path, meta_path = get_csv_sidecar_paths(path)
+    if not (os.path.exists(meta_path) and os.path.exists(csv_path)):
+        return None
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (meta.get("workbook") != get_file_fingerprint(path) or meta.get("csv") != get_file_fingerprint(csv_path)
+            or sheet_name not in (None, meta.get("sheet_name"))):
+        return None
+    dtypes = meta.get("dtypes") or []
+    if any(dtype is None for dtype in dtypes):
+        return None
+    return csv_path, dtypes
+
+
+def read_csv_sidecar(csv_path: str, dtypes: Sequence[str]) -> pd.DataFrame:
+    """
+    Read a CSV sidecar with the dtypes the workbook reader would have given its columns.
+    """
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f), [])
+    # Blank header cells are empty in the workbook too
+    columns = dedup_column_names(name if name else f"Unnamed: {index}"
+                                 for index, name in enumerate(header))
+    read_dtypes = {column: "float64" if dtype in ("int64", "float64") else "bool" if dtype == "bool" else str
+                   for column, dtype in zip(columns, dtypes)}
+    df = pd.read_csv(csv_path, header=0, names=columns, dtype=read_dtypes,
+                     keep_default_na=False, na_values=[""])
+    df = df.dropna(how="all").reset_index(drop=True)
+    for column, dtype in zip(columns, dtypes):
+        if dtype == "int64":
+            df[column] = df[column].astype("int64")
+        elif dtype == "datetime64[ns]":
+            # Each chunk was written with its own precision, e.g. dates without times
+            df[column] = pd.to_datetime(df[column], format="ISO8601").astype("datetime64[ns]")
+    return df
+
+
+def read_excel_streaming(path: str, sheet_name: Optional[str] = None,
+                         dedup_subset: Optional[Sequence[str]] = None,
+                         use_csv_sidecar: bool = True) -> tuple[pd.DataFrame, int]:
+    """
+    Read a sheet into a DataFrame with openpyxl's read_only/values_only mode.
+
+    Rows are taken as plain tuples straight from the sheet XML, without building
+    cell objects, and typed per column the way ``pd.read_excel`` types them, with
+    repeated header names renamed to ``x.1``, ``x.2``. When ``dedup_subset`` is given,
+    rows are deduplicated while reading, keeping the last occurrence like
+    ``drop_duplicates(keep='last')``. A CSV sidecar written by ``write_excel_streaming``
+    is read instead of the workbook while both are unchanged.
+
+    Args:
+        path (str): Path of the .xlsx workbook.
+        sheet_name (str, optional): Sheet to read. Defaults to the first sheet.
+        dedup_subset (Sequence[str], optional): Columns identifying duplicate rows.
+        use_csv_sidecar (bool): Read the workbook's CSV sidecar instead when it can be.
+
+    Returns:
+        tuple[pd.DataFrame, int]: The rows, and how many duplicate rows were dropped.
+    """
+    sidecar = get_csv_sidecar(path, sheet_name) if use_csv_sidecar else None
+    if sidecar:
+        csv_path, dtypes = sidecar
+        logging.info(f"Reading {csv_path} instead of {path}")
+        df = read_csv_sidecar(csv_path, dtypes)
+        if dedup_subset is None:
+            return df, 0
+        df_deduped = df.drop_duplicates(subset=list(dedup_subset), keep='last').reset_index(drop=True)
+        return df_deduped, len(df) - len(df_deduped)
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        rows_iter = worksheet.iter_rows(values_only=True)
+        header_row = next(rows_iter, ())
+        columns = dedup_column_names(name if name is not None else f"Unnamed: {index}"
+                                     for index, name in enumerate(header_row))
+        key_indexes = [columns.index(column)
+                       for column in dedup_subset] if dedup_subset else None
+
+        row_count = 0
+        rows: dict = {}
+        for row in rows_iter:
+            if all(value is None for value in row):
+                continue
+            row_count += 1
+            if key_indexes is None:
+                rows[row_count] = row
+            else:
+                key = tuple(row[index] for index in key_indexes)
+                # Re-inserting moves the key to the end, so rows stay in order of their last occurrence
+                rows.pop(key, None)
+                rows[key] = row
+    finally:
+        workbook.close()
+
+    df = pd.DataFrame.from_records(list(rows.values()), columns=columns)
+    for column in df.columns[df.dtypes == object]:
+        if df[column].isna().all():
+            df[column] = df[column].astype("float64")
+        elif df[column].isna().any():
+            df[column] = df[column].where(df[column].notna(), np.nan)
+    return df, row_count - len(df)
@@ -0,0 +1,45 @@
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .cache_utilities import PYARROW_AVAILABLE
+from ..models.ygo_models import INVENTORY_CATEGORY_COLUMNS, INVENTORY_KEY_COLUMNS
+
+
+# Arrow-backed strings take a fraction of the memory of Python string objects
+INVENTORY_STRING_DTYPE = "string[pyarrow]" if PYARROW_AVAILABLE else object
+
+
+def get_inventory_dtypes(columns) -> dict:
+    """
+    Dtypes for the inventory key columns among ``columns``: categoricals for the
+    low-cardinality ones and strings for card names and codes.
+    """
+    return {column: "category" if column in INVENTORY_CATEGORY_COLUMNS else INVENTORY_STRING_DTYPE
+            for column in INVENTORY_KEY_COLUMNS if column in columns}
+
+
+def compact_inventory_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Casts the inventory key columns of a frame to their compact dtypes.
+    """
+    return df.astype(get_inventory_dtypes(df.columns))
+
+
+def concat_inventory_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenates inventory frames without losing categorical dtypes.
+
+    ``pd.concat`` falls back to object dtype when categories differ between frames, so
+    every categorical column is first given the union of the categories of all frames.
+    Empty frames are skipped.
+    """
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    for column in INVENTORY_CATEGORY_COLUMNS:
+        if all(isinstance(frame.get(column, pd.Series(dtype=object)).dtype, pd.CategoricalDtype) for frame in frames):
+            categories = union_categoricals(
+                [frame[column] for frame in frames], ignore_order=True).categories
+            frames = [frame.assign(**{column: frame[column].cat.set_categories(categories)})
+                      for frame in frames]
+    return pd.concat(frames, ignore_index=True)
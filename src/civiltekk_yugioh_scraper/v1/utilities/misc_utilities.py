@@ -5,6 +5,7 @@ import time
 import os
 import platform
 from typing import Dict, Generator, Mapping, Tuple, Optional
+from .concurrency_utilities import adaptive_get
 from ..config import JAPANESE_CHARS_REGEX, WINDOWS_EXPORT_PATH, LINUX_EXPORT_PATH, READ_TIMEOUT_ERROR, JSON_ERROR, BASE_TEKKX_PRODUCT_URL, BIGWEB_DEFAULT_HEADER, HEADERS
 
 
@@ -70,29 +71,46 @@ def get_file_path(filename: str) -> str:
     return export_path
 
 
-def run_request_until_response(url: str, params: dict, max_counter: int = 5) -> requests.Response | None:
+def run_request_until_response(url: str, params: Optional[dict] = None, max_counter: int = 5,
+                               backoff: float = 1.0, stream: bool = False) -> requests.Response | None:
+    """
+    Sends a GET request, retrying with exponential backoff only when it fails.
+
+    The first attempt goes out immediately. A timeout, connection error or non-2xx/3xx
+    response is retried after backoff, 2 * backoff, 4 * backoff, ... seconds.
+
+    Args:
+        url (str): The URL to request.
+        params (dict, optional): Query string parameters.
+        max_counter (int): Maximum number of attempts.
+        backoff (float): Seconds to wait before the first retry.
+        stream (bool): Leave the body unread so the caller can stream it. A successful
+            streamed response holds its host limiter slot until the caller closes it.
+            Failed responses are closed right away.
+
+    Returns:
+        requests.Response | None: The successful response, the last failed response
+                                  (closed), or None if no attempt got a response at all.
+    """
     response = None
-    counter = 0
-    while not response and counter < max_counter:
-        time.sleep(1)
+    for counter in range(max_counter):
+        if counter:
+            time.sleep(backoff * 2 ** (counter - 1))
         try:
             logging.info(f"Running URL: {url} - Counter {counter}")
-            response = requests.get(url, timeout=10)
-        except requests.exceptions.ReadTimeout as e:
-            error_string = ""
-            for key, value in params.items():
-                error_string = error_string + \
-                    "{key}:{value}".format(key=key, value=value) + "\n"
-            # logging.error("{error_string}".format(
-            #     error_string=error_string))
+            response = adaptive_get(
+                url, params=params, timeout=10, stream=stream)
+            if response:
+                return response
+            logging.warning(
+                f"HTTP {response.status_code}: {url} - Counter {counter}")
+            # An unread streamed body would keep its connection out of the pool
+            response.close()
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
             logging.error(
-                "ReadTimeoutError: {url} - Counter {counter}".format(url=url, counter=counter))
-        finally:
-            counter += 1
-
-    if counter == max_counter:
-        logging.warning(f"Exceeded trying {max_counter} times for {url}")
+                f"{type(e).__name__}: {url} - Counter {counter}")
 
+    logging.warning(f"Exceeded trying {max_counter} times for {url}")
     return response
 
 
@@ -0,0 +1,163 @@
+import abc
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+import concurrent.futures
+from io import BytesIO
+from typing import Literal, Optional, Sequence
+
+import pandas as pd
+
+from .aws_utilities import S3_CONTENT_TYPES, open_compressed_stream, save_bytes_to_s3, upload_data
+from ..config import BUCKET_NAME, TEKKX_SCALABLE_DB_NAME
+
+# File name suffix of each compression a sink can apply
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def serialize_df(df: pd.DataFrame, file_format: str, compact: bool = False,
+                 compression: Optional[str] = None) -> bytes:
+    """
+    Serialize a DataFrame into the bytes written by file sinks.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to serialize.
+        file_format (str): 'csv' or 'json' (a list of records, indented like the old exports).
+        compact (bool): Write JSON without indentation or spaces after separators.
+        compression (str, optional): 'gzip' or 'zstd' to compress the payload.
+
+    Returns:
+        bytes: UTF-8 encoded payload, compressed if requested.
+    """
+    if file_format == "csv":
+        payload = df.to_csv(index=False).encode("utf-8")
+    elif file_format == "json":
+        records = df.astype(object).where(
+            df.notna(), None).to_dict(orient="records")
+        if compact:
+            payload = json.dumps(records, separators=(",", ":"),
+                                 ensure_ascii=False, default=str).encode("utf-8")
+        else:
+            payload = json.dumps(records, indent=4, default=str).encode("utf-8")
+    else:
+        raise ValueError(f"Unsupported file format: {file_format}")
+
+    if compression is None:
+        return payload
+    buffer = BytesIO()
+    with open_compressed_stream(buffer, compression) as stream:  # type: ignore[arg-type]
+        stream.write(payload)
+    return buffer.getvalue()
+
+
+class OutputSink(abc.ABC):
+    """
+    A destination for a DataFrame. Sinks with a file_format receive the serialized
+    payload, which is rendered once per frame and payload key and shared between sinks.
+    """
+    file_format: Optional[str] = None
+    compact: bool = False
+    compression: Optional[str] = None
+
+    @property
+    def payload_key(self) -> Optional[tuple[str, bool, Optional[str]]]:
+        """
+        The serialization options of this sink; sinks with the same key share one payload.
+        """
+        if not self.file_format:
+            return None
+        return (self.file_format, self.compact, self.compression)
+
+    @abc.abstractmethod
+    def write(self, df: pd.DataFrame, payload: Optional[bytes]) -> None:
+        """
+        Write the DataFrame, or the payload rendered for this sink's payload key.
+        """
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.__dict__})"
+
+
+class LocalFileSink(OutputSink):
+    def __init__(self, path: str, file_format: str = "csv",
+                 compact: bool = False, compression: Optional[str] = None):
+        self.path = path
+        self.file_format = file_format
+        self.compact = compact
+        self.compression = compression
+
+    def write(self, df: pd.DataFrame, payload: Optional[bytes]) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "wb") as f:
+            f.write(payload or b"")
+        logging.info(f"Saved {len(df)} rows to {self.path}")
+
+
+class S3Sink(OutputSink):
+    def __init__(self, object_key: str, bucket_name: str = BUCKET_NAME, file_format: str = "csv",
+                 compact: bool = False, compression: Optional[str] = None):
+        self.object_key = object_key
+        self.bucket_name = bucket_name
+        self.file_format = file_format
+        self.compact = compact
+        self.compression = compression
+
+    def write(self, df: pd.DataFrame, payload: Optional[bytes]) -> None:
+        save_bytes_to_s3(self.bucket_name, self.object_key, payload or b"",
+                         content_type=S3_CONTENT_TYPES.get(self.file_format or ""),
+                         content_encoding=self.compression)
+
+
+class MySQLSink(OutputSink):
+    def __init__(self, table_name: str,
+                 if_exist: Literal['fail', 'replace', 'append'] = "replace",
+                 db_name: str = TEKKX_SCALABLE_DB_NAME):
+        self.table_name = table_name
+        self.if_exist = if_exist
+        self.db_name = db_name
+
+    def write(self, df: pd.DataFrame, payload: Optional[bytes]) -> None:
+        upload_data(df, self.table_name, self.if_exist, db_name=self.db_name)
+
+
+def write_to_sinks(outputs: Sequence[tuple[pd.DataFrame, Sequence[OutputSink]]], max_workers: int = 8) -> None:
+    """
+    Write each DataFrame to all of its sinks concurrently.
+
+    Every frame is serialized once per payload key (format, compact, compression), and
+    the same bytes go to each file/S3 sink with that key. All writes are attempted even
+    if one fails. The first failure is re-raised once every sink has finished.
+
+    Args:
+        outputs: Pairs of (DataFrame, sinks to write it to).
+        max_workers (int): Maximum number of sinks written at the same time.
+
+    Raises:
+        Exception: The first error raised by a sink.
+    """
+    errors: list[Exception] = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for df, sinks in outputs:
+            payloads: dict[tuple, bytes] = {}
+            for sink in sinks:
+                key = sink.payload_key
+                if key is not None and key not in payloads:
+                    payloads[key] = serialize_df(
+                        df, sink.file_format, compact=sink.compact, compression=sink.compression)
+                payload = payloads.get(key) if key is not None else None
+                futures[executor.submit(sink.write, df, payload)] = sink
+
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                logging.error(f"Failed to write to {futures[future]}: {e}")
+                errors.append(e)
+
+    if errors:
+        raise errors[0]
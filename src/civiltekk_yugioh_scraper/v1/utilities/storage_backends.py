@@ -0,0 +1,171 @@
+import abc
+import os
+from typing import Literal, Optional
+
+import pandas as pd
+from sqlalchemy import Engine, create_engine, func, select, table, text
+
+from ..config import RDS_HOST, NAME, DB_PASSWORD, DB_PORT, STORAGE_BACKEND, LOCAL_DB_DIR
+
+try:
+    import duckdb_engine  # noqa: F401  registers the duckdb:// dialect
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+
+class StorageBackend(abc.ABC):
+    """
+    Base class for the databases the pipeline reads from and writes to.
+
+    Every backend hands out SQLAlchemy engines, so pandas ``to_sql``/``read_sql`` keep
+    the same table semantics (replace/append/fail) on all of them.
+    """
+    name: str = ""
+
+    @abc.abstractmethod
+    def get_url(self, db_name: str) -> str:
+        """
+        Return the SQLAlchemy URL of a database.
+        """
+
+    def get_engine_kwargs(self) -> dict:
+        return {}
+
+    def get_engine(self, db_name: str, echo: bool = False) -> Engine:
+        return create_engine(self.get_url(db_name), echo=echo, **self.get_engine_kwargs())
+
+    def write_df(self, df: pd.DataFrame, engine: Engine, table_name: str,
+                 if_exist: Literal['fail', 'replace', 'append'], method: Optional[str] = None) -> None:
+        """
+        Write a DataFrame to a table with pandas ``if_exists`` semantics.
+        """
+        df.to_sql(con=engine, name=table_name, if_exists=if_exist,
+                  index=False, method=method)  # type: ignore
+
+    @abc.abstractmethod
+    def get_table_fingerprint(self, engine: Engine, table_name: str, db_name: str) -> str:
+        """
+        Return a cheap value that changes whenever the table is rewritten.
+        """
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}()"
+
+
+class MySQLBackend(StorageBackend):
+    name = "mysql"
+
+    def get_url(self, db_name: str) -> str:
+        return f"mysql+pymysql://{NAME}:{DB_PASSWORD}@{RDS_HOST}:{DB_PORT}/{db_name}"
+
+    def get_table_fingerprint(self, engine: Engine, table_name: str, db_name: str) -> str:
+        # Tables uploaded with if_exists="replace" are dropped and recreated, so the
+        # create time changes on every refresh even when the row count does not.
+        with engine.connect() as conn:
+            row_count = conn.execute(
+                select(func.count()).select_from(table(table_name))).scalar()
+            times = conn.execute(
+                text("""
+                    SELECT CREATE_TIME, UPDATE_TIME FROM information_schema.TABLES
+                    WHERE TABLE_SCHEMA = :db_name AND TABLE_NAME = :table_name
+                """), {"db_name": db_name, "table_name": table_name}).first()
+
+        create_time, update_time = times if times else (None, None)
+        return f"{row_count}|{create_time}|{update_time}"
+
+
+class LocalFileBackend(StorageBackend):
+    """
+    A backend that keeps each database in a single local file under LOCAL_DB_DIR.
+    """
+    file_extension: str = ""
+    # Suffix of the write-ahead log next to the database file, where recent writes
+    # live until they are checkpointed into the file itself
+    wal_suffix: str = ""
+
+    def __init__(self, directory: str = LOCAL_DB_DIR):
+        self.directory = directory
+
+    def get_path(self, db_name: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, f"{db_name}.{self.file_extension}")
+
+    def get_table_fingerprint(self, engine: Engine, table_name: str, db_name: str) -> str:
+        # There is no table create time here, but the database file and its WAL are
+        # only touched by writes. A write may sit in the WAL without changing the file.
+        with engine.connect() as conn:
+            row_count = conn.execute(
+                select(func.count()).select_from(table(table_name))).scalar()
+        path = self.get_path(db_name)
+        fingerprint = f"{row_count}|{os.stat(path).st_mtime_ns}"
+        wal_path = f"{path}{self.wal_suffix}"
+        if self.wal_suffix and os.path.exists(wal_path):
+            wal_stat = os.stat(wal_path)
+            fingerprint += f"|{wal_stat.st_size}|{wal_stat.st_mtime_ns}"
+        return fingerprint
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(directory={self.directory!r})"
+
+
+class SQLiteBackend(LocalFileBackend):
+    name = "sqlite"
+    file_extension = "sqlite"
+    wal_suffix = "-wal"
+
+    def get_url(self, db_name: str) -> str:
+        return f"sqlite:///{self.get_path(db_name)}"
+
+    def get_engine_kwargs(self) -> dict:
+        # Sinks write several tables at once, so wait for the file lock instead of failing
+        return {"connect_args": {"timeout": 60}}
+
+
+class DuckDBBackend(LocalFileBackend):
+    name = "duckdb"
+    file_extension = "duckdb"
+    wal_suffix = ".wal"
+
+    def get_url(self, db_name: str) -> str:
+        if not DUCKDB_AVAILABLE:
+            raise ImportError(
+                "duckdb_engine not available. Install with: pip install duckdb duckdb_engine")
+        return f"duckdb:///{self.get_path(db_name)}"
+
+    def write_df(self, df: pd.DataFrame, engine: Engine, table_name: str,
+                 if_exist: Literal['fail', 'replace', 'append'], method: Optional[str] = None) -> None:
+        # duckdb_engine cannot reflect existing tables, which pandas does before a
+        # replace, so drop the table here and let pandas create it again
+        if if_exist == "replace":
+            with engine.begin() as conn:
+                conn.execute(text(f'DROP TABLE IF EXISTS "{table_name}"'))
+            if_exist = "append"
+        super().write_df(df, engine, table_name, if_exist, method)
+
+
+STORAGE_BACKENDS: dict[str, type[StorageBackend]] = {
+    MySQLBackend.name: MySQLBackend,
+    SQLiteBackend.name: SQLiteBackend,
+    DuckDBBackend.name: DuckDBBackend,
+}
+
+
+def get_storage_backend(name: Optional[str] = None) -> StorageBackend:
+    """
+    Get a storage backend by name, defaulting to the STORAGE_BACKEND setting.
+
+    Args:
+        name (str, optional): 'mysql', 'sqlite' or 'duckdb'.
+
+    Returns:
+        StorageBackend: The backend instance.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    backend_name = (name or STORAGE_BACKEND).lower()
+    if backend_name not in STORAGE_BACKENDS:
+        raise ValueError(
+            f"Unknown storage backend '{backend_name}', expected one of {list(STORAGE_BACKENDS)}")
+    return STORAGE_BACKENDS[backend_name]()
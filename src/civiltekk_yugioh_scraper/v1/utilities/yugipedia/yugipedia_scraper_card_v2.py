@@ -5,6 +5,7 @@ from typing import List, Dict, Any, Optional
 from ...models.yugipedia_models import YugiohCard
 from ..yugipedia.mediawiki_params import card_semantic_search_params, card_semantic_search_params_v2
 from ...config import HEADERS
+from ..concurrency_utilities import adaptive_get, get_host_limiter
 import concurrent.futures
 import string
 import csv
@@ -22,7 +23,7 @@ def fetch_card_data_v2(character: str, offset: int = 0, limit: int = 500) -> Opt
     params = card_semantic_search_params_v2(character, offset, limit)
 
     try:
-        response = requests.get(base_url, params=params,
+        response = adaptive_get(base_url, params=params,
                                 headers=HEADERS, timeout=60)
         # Raise HTTPError for bad responses (4xx and 5xx)
         response.raise_for_status()
@@ -134,7 +135,7 @@ def get_card_data(character: str, offset: int = 0, limit: int = 500) -> Optional
 
     try:
         time.sleep(1)
-        response = requests.get(base_url, headers=HEADERS,
+        response = adaptive_get(base_url, headers=HEADERS,
                                 params=params, timeout=60)
         response.raise_for_status()  # Raise HTTPError for bad responses (4xx and 5xx)
 
@@ -196,9 +197,10 @@ def get_yugioh_cards() -> list[YugiohCard]:
     character_list.extend(
         ["\"", "1", "3", "4", "7", "8", "@"])
     yugioh_cards: list[YugiohCard] = []
+    limiter = get_host_limiter("yugipedia.com")
 
-    # optimally defined number of threads
-    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+    # The limiter decides how many of these threads may request at once
+    with concurrent.futures.ThreadPoolExecutor(max_workers=limiter.max_limit) as executor:
         futures = []
         for character in character_list:
             time.sleep(1)
@@ -211,6 +213,7 @@ def get_yugioh_cards() -> list[YugiohCard]:
                 pass
         logging.info("Total semantic cards:{overall_list_count}".format(
             overall_list_count=len(yugioh_cards)))
+    limiter.log_summary()
 
     return yugioh_cards
 
@@ -227,11 +230,14 @@ def main() -> None:
     # Output CSV file
     output_file = "yugioh_cards.csv"
 
-    # Multi-threaded execution
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
+    limiter = get_host_limiter("yugipedia.com")
+
+    # Multi-threaded execution, with the limiter deciding how many threads request at once
+    with concurrent.futures.ThreadPoolExecutor(max_workers=limiter.max_limit) as executor:
         futures = [executor.submit(
             fetch_and_save_cards, char, output_file) for char in search_characters]
         concurrent.futures.wait(futures)
+    limiter.log_summary()
 
     logging.info("\nAll tasks completed.")
 
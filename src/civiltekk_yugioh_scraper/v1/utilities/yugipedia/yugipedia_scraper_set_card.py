@@ -8,7 +8,7 @@ import pandas as pd
 import unicodedata
 import html
 
-from ..aws_utilities import retrieve_data_from_db_to_df
+from ..cache_utilities import iter_table_snapshot
 
 
 from ...config import MEDIAWIKI_URL, HEADERS
@@ -631,19 +631,18 @@ def get_yugioh_set_cards_v2() -> tuple[list[YugiohSetCard], list[dict]]:
     yugioh_set_cards_v2: List[YugiohSetCard] = []
     yugioh_set_cards_v2_step2: List[YugiohSetCard] = []
     yugioh_set_cards_v2_overall: List[YugiohSetCard] = []
-    yugioh_set_objs_from_db = retrieve_data_from_db_to_df(
-        TABLE_YUGIOH_SETS, db_name='yugioh_data').to_dict(orient='records')
-    yugioh_rarity_objs_from_db = retrieve_data_from_db_to_df(
-        TABLE_YUGIOH_RARITIES, db_name='yugioh_data').to_dict(orient='records')
-    yugioh_card_objs_from_db = retrieve_data_from_db_to_df(
-        TABLE_YUGIOH_CARDS, db_name='yugioh_data').to_dict(orient='records')
-
-    yugioh_sets: list[YugiohSet] = [YugiohSet.get_yugioh_set_from_db_obj(
-        yugioh_set_obj) for yugioh_set_obj in yugioh_set_objs_from_db]
-    yugioh_rarities: list[YugiohRarity] = [YugiohRarity.get_yugioh_rarity_from_db_obj(
-        yugioh_rarity_obj) for yugioh_rarity_obj in yugioh_rarity_objs_from_db]
-    yugioh_cards: list[YugiohCard] = [YugiohCard.get_yugioh_card_from_db_obj(
-        yugioh_card_obj) for yugioh_card_obj in yugioh_card_objs_from_db]
+    yugioh_sets: list[YugiohSet] = [
+        YugiohSet.get_yugioh_set_from_db_obj(yugioh_set_obj)
+        for chunk in iter_table_snapshot(TABLE_YUGIOH_SETS, db_name='yugioh_data', columns=YugiohSet.DB_COLUMNS)
+        for yugioh_set_obj in chunk.to_dict(orient='records')]
+    yugioh_rarities: list[YugiohRarity] = [
+        YugiohRarity.get_yugioh_rarity_from_db_obj(yugioh_rarity_obj)
+        for chunk in iter_table_snapshot(TABLE_YUGIOH_RARITIES, db_name='yugioh_data', columns=YugiohRarity.DB_COLUMNS)
+        for yugioh_rarity_obj in chunk.to_dict(orient='records')]
+    yugioh_cards: list[YugiohCard] = [
+        YugiohCard.get_yugioh_card_from_db_obj(yugioh_card_obj)
+        for chunk in iter_table_snapshot(TABLE_YUGIOH_CARDS, db_name='yugioh_data', columns=YugiohCard.DB_COLUMNS)
+        for yugioh_card_obj in chunk.to_dict(orient='records')]
 
     # to remove after testing
     # yugioh_sets = [
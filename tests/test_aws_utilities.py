@@ -0,0 +1,117 @@
+import gzip
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+moto = pytest.importorskip("moto")
+
+from civiltekk_yugioh_scraper.v1.utilities import aws_utilities  # noqa: E402
+from civiltekk_yugioh_scraper.v1.utilities.aws_utilities import (  # noqa: E402
+    S3MultipartWriter, S3_MIN_PART_SIZE, get_s3_client, save_bytes_to_s3, save_df_to_s3, save_to_s3)
+
+BUCKET = "test-bucket"
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    get_s3_client.cache_clear()
+    with moto.mock_aws():
+        client = get_s3_client()
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+    get_s3_client.cache_clear()
+
+
+def make_df(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({"set_card_code_updated": [f"RA03-JP{i:06d}" for i in range(rows)],
+                         "price": rng.random(rows)})
+
+
+def test_small_object_uses_single_put(s3, monkeypatch):
+    calls = []
+    monkeypatch.setattr(S3MultipartWriter, "_upload_part",
+                        lambda self, body: calls.append(len(body)))
+    df = make_df(100)
+    save_df_to_s3(df, BUCKET, "backup/", "small.csv")
+
+    obj = s3.get_object(Bucket=BUCKET, Key="backup/small.csv")
+    assert calls == []
+    assert obj["ContentType"] == "text/csv"
+    assert "ContentEncoding" not in obj
+    pd.testing.assert_frame_equal(pd.read_csv(obj["Body"]), df)
+
+
+def test_large_object_uses_multipart(s3):
+    payload = np.random.default_rng(1).bytes(2 * S3_MIN_PART_SIZE + 123)
+    with S3MultipartWriter(BUCKET, "big.bin", part_size=S3_MIN_PART_SIZE) as writer:
+        for start in range(0, len(payload), 1_000_000):
+            writer.write(payload[start:start + 1_000_000])
+        assert len(writer._parts) == 2
+
+    obj = s3.get_object(Bucket=BUCKET, Key="big.bin")
+    assert obj["Body"].read() == payload
+    assert obj["ETag"].strip('"').endswith("-3")
+
+
+def test_failed_multipart_upload_is_aborted(s3):
+    with pytest.raises(RuntimeError):
+        with S3MultipartWriter(BUCKET, "broken.bin", part_size=S3_MIN_PART_SIZE) as writer:
+            writer.write(b"x" * (S3_MIN_PART_SIZE + 1))
+            raise RuntimeError("serialization failed")
+
+    assert s3.list_multipart_uploads(Bucket=BUCKET).get("Uploads", []) == []
+    assert "Contents" not in s3.list_objects_v2(Bucket=BUCKET)
+
+
+def test_gzip_upload_sets_content_encoding(s3):
+    df = make_df(1000)
+    save_df_to_s3(df, BUCKET, "", "prices.csv.gz", compression="gzip")
+
+    obj = s3.get_object(Bucket=BUCKET, Key="prices.csv.gz")
+    assert obj["ContentEncoding"] == "gzip"
+    assert obj["ContentType"] == "text/csv"
+    pd.testing.assert_frame_equal(
+        pd.read_csv(io.BytesIO(gzip.decompress(obj["Body"].read()))), df)
+
+
+def test_zstd_upload(s3):
+    zstandard = pytest.importorskip("zstandard")
+    df = make_df(1000)
+    save_df_to_s3(df, BUCKET, "", "prices.csv.zst", compression="zstd")
+
+    obj = s3.get_object(Bucket=BUCKET, Key="prices.csv.zst")
+    assert obj["ContentEncoding"] == "zstd"
+    body = zstandard.ZstdDecompressor().stream_reader(obj["Body"].read()).read()
+    pd.testing.assert_frame_equal(pd.read_csv(io.BytesIO(body)), df)
+
+
+def test_parquet_upload(s3):
+    pytest.importorskip("pyarrow")
+    df = make_df(1000)
+    save_df_to_s3(df, BUCKET, "", "prices.parquet", file_format="parquet")
+
+    obj = s3.get_object(Bucket=BUCKET, Key="prices.parquet")
+    assert obj["ContentType"] == "application/vnd.apache.parquet"
+    pd.testing.assert_frame_equal(pd.read_parquet(io.BytesIO(obj["Body"].read())), df)
+
+
+def test_save_to_s3_uses_file_type(s3):
+    save_to_s3(BUCKET, "prices.json", io.StringIO("[]"), file_type="json")
+    save_bytes_to_s3(BUCKET, "prices.csv.gz", gzip.compress(b"a\n1\n"),
+                     content_type="text/csv", content_encoding="gzip")
+
+    assert s3.get_object(Bucket=BUCKET, Key="prices.json")["ContentType"] == "application/json"
+    obj = s3.get_object(Bucket=BUCKET, Key="prices.csv.gz")
+    assert (obj["ContentType"], obj["ContentEncoding"]) == ("text/csv", "gzip")
+
+
+def test_zstd_unavailable(monkeypatch):
+    monkeypatch.setattr(aws_utilities, "ZSTD_AVAILABLE", False)
+    with pytest.raises(ImportError):
+        aws_utilities.open_compressed_stream(io.BytesIO(), "zstd")
@@ -0,0 +1,108 @@
+import pathlib
+import time
+
+import pytest
+
+pytest.importorskip("selenium")
+
+from selenium.common.exceptions import WebDriverException  # noqa: E402
+
+from civiltekk_yugioh_scraper.v1.prod import yuyuteiscrape2 as yuyutei  # noqa: E402
+from civiltekk_yugioh_scraper.v1.utilities.browser_pool import (  # noqa: E402
+    PAGE_IDLE_SCRIPT, VISIBLE_COUNT_SCRIPT, BrowserPool, count_visible_elements,
+    wait_for_page_idle, wait_for_visible_elements)
+
+FIXTURES = pathlib.Path(__file__).parent / "fixtures" / "browser_pool"
+
+
+class FakeDriver:
+    """
+    Answers the wait scripts from canned sequences; the last value repeats.
+    """
+    current_url = "about:blank"
+
+    def __init__(self, visible_counts, idle_states=(True,)):
+        self.visible_counts = list(visible_counts)
+        self.idle_states = list(idle_states)
+        self.clicked = []
+
+    @staticmethod
+    def _next(values):
+        return values.pop(0) if len(values) > 1 else values[0]
+
+    def execute_script(self, script, *args):
+        if script == VISIBLE_COUNT_SCRIPT:
+            return self._next(self.visible_counts)
+        if script == PAGE_IDLE_SCRIPT:
+            return self._next(self.idle_states)
+        self.clicked.append(args[0])
+
+
+def test_wait_for_visible_elements_waits_for_the_count():
+    assert wait_for_visible_elements(FakeDriver([0, 0, 1, 3]), "a", min_count=3, timeout=2)
+
+
+def test_wait_for_visible_elements_times_out():
+    start = time.perf_counter()
+    assert not wait_for_visible_elements(FakeDriver([2]), "a", min_count=3, timeout=0.3)
+    assert time.perf_counter() - start >= 0.3
+
+
+def test_wait_for_page_idle_times_out_while_busy():
+    assert not wait_for_page_idle(FakeDriver([0], idle_states=[False]), timeout=0.3)
+
+
+def test_click_reports_whether_links_were_revealed():
+    driver = FakeDriver([2, 2, 5])
+    assert yuyutei.click_and_wait_for_set_links(driver, "category", timeout=1)
+    assert driver.clicked == ["category"]
+
+    assert not yuyutei.click_and_wait_for_set_links(FakeDriver([2]), "category", timeout=0.2)
+
+
+@pytest.fixture(scope="module")
+def pool():
+    browser_pool = BrowserPool(size=1)
+    try:
+        with browser_pool.acquire():
+            pass
+    except WebDriverException as e:
+        browser_pool.close()
+        pytest.skip(f"Chrome is not available: {e.msg}")
+    yield browser_pool
+    browser_pool.close()
+
+
+def open_fixture(driver, name: str) -> None:
+    driver.get((FIXTURES / name).as_uri())
+
+
+def test_pure_dom_toggle_reveals_links(pool):
+    with pool.acquire() as driver:
+        open_fixture(driver, "sidebar_toggle.html")
+        assert count_visible_elements(driver, yuyutei.SELL_LINK_SELECTOR) == 0
+
+        driver.execute_script("document.querySelector('h2').click();")
+        driver.execute_script("document.querySelector('h3').click();")
+        assert wait_for_visible_elements(driver, yuyutei.SELL_LINK_SELECTOR, 2, timeout=5)
+
+
+def test_click_waits_for_links_added_later(pool):
+    with pool.acquire() as driver:
+        open_fixture(driver, "sidebar_delayed.html")
+        toggle = driver.find_element("id", "latest-toggle")
+        assert yuyutei.click_and_wait_for_set_links(driver, toggle, timeout=5)
+        assert count_visible_elements(driver, yuyutei.SELL_LINK_SELECTOR) == 3
+
+
+def test_page_idle_waits_for_dom_to_settle_without_jquery(pool):
+    with pool.acquire() as driver:
+        open_fixture(driver, "dom_busy.html")
+        assert wait_for_page_idle(driver, timeout=5)
+        assert driver.execute_script("return window.done;")
+
+
+def test_selenium_discovery_on_saved_sidebar(pool):
+    set_list = yuyutei.get_set_list_selenium(
+        (FIXTURES / "sidebar_toggle.html").as_uri(), pool=pool, timeout=5)
+    assert [item['set_code'] for item in set_list] == ["QCAC", "RA03", "AGOV"]
@@ -0,0 +1,113 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from civiltekk_yugioh_scraper.v1.utilities.concurrency_utilities import (
+    AdaptiveConcurrencyLimiter, adaptive_get, get_host_limiter, percentile)
+from civiltekk_yugioh_scraper.v1.utilities.misc_utilities import run_request_until_response
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        status = 429 if self.path.startswith("/throttled") else 200
+        body = b"x" * 10000
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.client_ports.add(self.client_address[1])
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients closing kept-alive connections are expected here
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = Server(("127.0.0.1", 0), Handler)
+    httpd.client_ports = set()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+
+
+def base_url(server) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_requests_reuse_the_host_session(server):
+    limiter = AdaptiveConcurrencyLimiter("local", initial_limit=1, max_limit=1)
+    server.client_ports.clear()
+    for _ in range(5):
+        assert limiter.request("GET", f"{base_url(server)}/page").status_code == 200
+    # Keep-alive: every request went over the same connection
+    assert len(server.client_ports) == 1
+
+
+def test_streamed_response_holds_its_slot_until_closed(server):
+    limiter = AdaptiveConcurrencyLimiter("local", initial_limit=2, max_limit=2)
+    response = limiter.request("GET", f"{base_url(server)}/page", stream=True)
+    assert limiter._in_flight == 1
+
+    with response:
+        assert len(response.raw.read()) == 10000
+        assert limiter._in_flight == 1
+    assert limiter._in_flight == 0
+
+    response.close()
+    assert limiter._in_flight == 0
+    assert limiter._run_requests == 1
+
+
+def test_failed_streamed_response_releases_immediately(server):
+    limiter = AdaptiveConcurrencyLimiter("local", initial_limit=4, max_limit=4, window_size=5)
+    response = limiter.request("GET", f"{base_url(server)}/throttled", stream=True)
+    assert response.status_code == 429
+    assert limiter._in_flight == 0
+    assert limiter.limit == 2
+
+
+def test_limit_grows_on_healthy_windows():
+    limiter = AdaptiveConcurrencyLimiter("local", initial_limit=1, max_limit=3, window_size=2)
+    for _ in range(10):
+        limiter.acquire()
+        limiter.release(0.01)
+    assert limiter.limit == 3
+
+
+def test_adaptive_get_uses_the_host_limiter(server):
+    url = f"{base_url(server)}/page"
+    limiter = get_host_limiter(f"127.0.0.1:{server.server_address[1]}")
+    with adaptive_get(url, stream=True) as response:
+        assert limiter._in_flight == 1
+        response.content
+    assert limiter._in_flight == 0
+
+
+def test_failed_streamed_attempts_return_their_connections(server):
+    url = f"{base_url(server)}/throttled"
+    limiter = get_host_limiter(f"127.0.0.1:{server.server_address[1]}")
+
+    response = run_request_until_response(url, max_counter=3, backoff=0, stream=True)
+
+    assert response.status_code == 429
+    pool_manager = limiter.session.get_adapter(url).poolmanager
+    for key in pool_manager.pools.keys():
+        # Every connection is back in the pool, none is held by an unread body
+        assert pool_manager.pools[key].pool.qsize() == pool_manager.pools[key].pool.maxsize
+
+
+def test_percentile():
+    assert percentile([3.0, 1.0, 2.0, 4.0], 50) == 2.0
+    assert percentile([1.0], 95) == 1.0
@@ -0,0 +1,129 @@
+import datetime as dt
+import os
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from civiltekk_yugioh_scraper.v1.utilities.excel_utilities import (
+    dedup_column_names, get_csv_sidecar_paths, read_excel_streaming, write_excel_streaming,
+    write_excel_workbooks)
+
+
+@pytest.fixture
+def inventory_df():
+    return pd.DataFrame({
+        "set_card_name_combined": ["Dark Magician", "Blue-Eyes", "Dark Magician", "Kuriboh, \"the\"\nfurball"],
+        "set_card_code_updated": ["LOB-005", "LOB-001", "LOB-005", "0001"],
+        "quantity": [1, 2, 3, 4],
+        "price": [1.5, None, 2.0, 3.0],
+        "whole_price": [1.0, 2.0, 3.0, 4.0],
+        "is_foil": [True, False, True, False],
+        "updated_at": [dt.datetime(2024, 1, 1), None, dt.datetime(2024, 1, 3, 5), None],
+        "notes": [None, None, None, None],
+        "rarity": pd.Categorical(["UR", "SR", "UR", "C"]),
+    })
+
+
+def test_round_trip_matches_read_excel(tmp_path, inventory_df):
+    path = str(tmp_path / "inventory.xlsx")
+    assert write_excel_streaming(path, inventory_df, chunksize=2) == 4
+
+    df, dropped = read_excel_streaming(path)
+
+    assert dropped == 0
+    assert_frame_equal(df, pd.read_excel(path))
+
+
+def test_dedup_keeps_last_occurrence(tmp_path, inventory_df):
+    path = str(tmp_path / "inventory.xlsx")
+    write_excel_streaming(path, inventory_df)
+    subset = ["set_card_name_combined", "set_card_code_updated"]
+
+    df, dropped = read_excel_streaming(path, dedup_subset=subset)
+
+    assert dropped == 1
+    expected = pd.read_excel(path).drop_duplicates(subset=subset, keep='last').reset_index(drop=True)
+    assert_frame_equal(df, expected)
+
+
+def test_duplicate_headers_are_renamed_like_read_excel(tmp_path):
+    path = str(tmp_path / "dupes.xlsx")
+    df = pd.DataFrame([[1, 2, 3, 4]], columns=["x", "x", "x.1", "x"])
+    write_excel_streaming(path, df)
+
+    result, _ = read_excel_streaming(path)
+
+    assert list(result.columns) == list(pd.read_excel(path).columns) == ["x", "x.2", "x.1", "x.3"]
+    assert dedup_column_names(["a", None, "a", "a"]) == ["a", None, "a.1", "a.2"]
+
+
+def test_csv_sidecar_is_typed_like_the_workbook(tmp_path, inventory_df):
+    path = str(tmp_path / "inventory.xlsx")
+    write_excel_streaming(path, inventory_df, chunksize=2, csv_sidecar=True)
+    from_workbook, _ = read_excel_streaming(path, use_csv_sidecar=False)
+
+    from_sidecar, _ = read_excel_streaming(path, dedup_subset=None)
+
+    assert_frame_equal(from_sidecar, from_workbook)
+    deduped, dropped = read_excel_streaming(path, dedup_subset=["set_card_code_updated"])
+    assert dropped == 1
+    assert_frame_equal(deduped, from_workbook.drop_duplicates(
+        subset=["set_card_code_updated"], keep='last').reset_index(drop=True))
+
+
+def test_csv_sidecar_is_used_only_when_both_files_are_unchanged(tmp_path, inventory_df, caplog):
+    path = str(tmp_path / "inventory.xlsx")
+    write_excel_streaming(path, inventory_df, csv_sidecar=True)
+    csv_path, _ = get_csv_sidecar_paths(path)
+
+    # A hand-edited CSV must not be trusted
+    pd.DataFrame({"set_card_name_combined": ["Edited"]}).to_csv(csv_path, index=False)
+    with caplog.at_level("INFO"):
+        df, _ = read_excel_streaming(path)
+    assert "instead of" not in caplog.text
+    assert len(df) == 4
+
+    # Nor a CSV next to a workbook that changed after it was written
+    write_excel_streaming(path, inventory_df, csv_sidecar=True)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    caplog.clear()
+    with caplog.at_level("INFO"):
+        read_excel_streaming(path)
+    assert "instead of" not in caplog.text
+
+
+def test_csv_sidecar_without_metadata_is_ignored(tmp_path, inventory_df, caplog):
+    path = str(tmp_path / "inventory.xlsx")
+    write_excel_streaming(path, inventory_df)
+    pd.DataFrame({"quantity": [99]}).to_csv(get_csv_sidecar_paths(path)[0], index=False)
+
+    with caplog.at_level("INFO"):
+        df, _ = read_excel_streaming(path)
+
+    assert "instead of" not in caplog.text
+    assert df["quantity"].tolist() == [1, 2, 3, 4]
+
+
+def test_mixed_columns_fall_back_to_the_workbook(tmp_path, caplog):
+    path = str(tmp_path / "mixed.xlsx")
+    df = pd.DataFrame({"code": [1, "LOB-001"], "foil": [True, None]})
+    write_excel_streaming(path, df, csv_sidecar=True)
+
+    with caplog.at_level("INFO"):
+        result, _ = read_excel_streaming(path)
+
+    assert "instead of" not in caplog.text
+    assert result["code"].tolist() == [1, "LOB-001"]
+
+
+def test_write_excel_workbooks_writes_sidecars_from_chunks(tmp_path, inventory_df):
+    path = str(tmp_path / "chunks.xlsx")
+    chunks = iter([inventory_df.iloc[:2], inventory_df.iloc[2:]])
+
+    write_excel_workbooks([(path, chunks, "V2")], csv_sidecar=True)
+
+    from_sidecar, _ = read_excel_streaming(path, sheet_name="V2")
+    assert_frame_equal(from_sidecar, read_excel_streaming(path, sheet_name="V2", use_csv_sidecar=False)[0])
+    assert_frame_equal(from_sidecar, pd.read_excel(path, sheet_name="V2"))
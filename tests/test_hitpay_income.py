@@ -0,0 +1,91 @@
+import os
+
+import pandas as pd
+import pytest
+
+from civiltekk_yugioh_scraper.v1.prod import hitpay_income
+
+
+def write_export(path, rows, mtime):
+    pd.DataFrame([{
+        'Order ID': order_id,
+        'Order Date': '2023-04-01 10:00',
+        'Order Status': status,
+        'Order Total': total,
+        'Payment Method Title': 'HitPay',
+        'HitPay_fees': 0.5,
+        '_stripe_net': None,
+        'Billing First Name': 'Yugi',
+        'Billing Last Name': 'Muto',
+        'Shipping Method': 'Pickup',
+    } for order_id, status, total in rows]).to_csv(path, index=False)
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+@pytest.fixture
+def ledger_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(hitpay_income, "get_file_path", lambda filename: str(tmp_path / filename))
+    return tmp_path
+
+
+def read_ledger(ledger_dir):
+    return pd.read_csv(ledger_dir / "income_ledger.csv", dtype={'Order ID Updated': 'string'})
+
+
+def test_one_export_matches_hitpay_main(ledger_dir):
+    rows = [("1", "wc-completed", 10.0), ("2", "wc-completed", 20.0), ("1", "wc-completed", 11.0),
+            ("3", "wc-completed", 30.0), ("2", "wc-refunded", 20.0), ("4", "wc-pending", 40.0)]
+    write_export(ledger_dir / "Orders-Export-1.csv", rows, 1_000)
+
+    assert hitpay_income.hitpay_ledger_ingest(chunksize=2) == 2
+
+    hitpay_income.hitpay_main("Orders-Export-1.csv", "income_output.csv")
+    expected = pd.read_csv(ledger_dir / "income_output.csv", dtype={'Order ID Updated': 'string'})
+    ledger = read_ledger(ledger_dir)
+    assert ledger['Order ID Updated'].tolist() == expected['Order ID Updated'].tolist() == ["#1", "#3"]
+    assert ledger['Order Total'].tolist() == expected['Order Total'].tolist() == [11.0, 30.0]
+
+
+def test_orders_are_appended_once_across_exports_and_runs(ledger_dir):
+    write_export(ledger_dir / "Orders-Export-1.csv", [("1", "wc-completed", 10.0)], 1_000)
+    newer = write_export(ledger_dir / "Orders-Export-2.csv",
+                         [("1", "wc-completed", 12.0), ("2", "wc-completed", 20.0)], 2_000)
+
+    assert hitpay_income.hitpay_ledger_ingest() == 2
+    assert hitpay_income.hitpay_ledger_ingest() == 0
+
+    write_export(newer, [("1", "wc-completed", 12.0), ("2", "wc-completed", 20.0),
+                         ("3", "wc-completed", 30.0)], 3_000)
+    assert hitpay_income.hitpay_ledger_ingest() == 1
+
+    ledger = read_ledger(ledger_dir)
+    assert ledger['Order ID Updated'].tolist() == ["#1", "#2", "#3"]
+    # The ledger is append-only, so the first export's row for order 1 stays
+    assert ledger['Order Total'].tolist() == [10.0, 20.0, 30.0]
+
+
+def test_state_is_saved_once_per_processed_export(ledger_dir, monkeypatch):
+    saved = []
+    save_json_cache = hitpay_income.save_json_cache
+    monkeypatch.setattr(hitpay_income, "save_json_cache",
+                        lambda data, path: saved.append(dict(data["files"])) or save_json_cache(data, path))
+    write_export(ledger_dir / "Orders-Export-1.csv",
+                 [(str(order_id), "wc-completed", 1.0) for order_id in range(10)], 1_000)
+    write_export(ledger_dir / "Orders-Export-2.csv", [("10", "wc-completed", 1.0)], 2_000)
+
+    hitpay_income.hitpay_ledger_ingest(chunksize=3)
+
+    assert [list(files) for files in saved] == [
+        ["Orders-Export-1.csv"], ["Orders-Export-1.csv", "Orders-Export-2.csv"]]
+
+
+def test_interrupted_run_does_not_append_twice(ledger_dir):
+    write_export(ledger_dir / "Orders-Export-1.csv",
+                 [("1", "wc-completed", 10.0), ("2", "wc-completed", 20.0)], 1_000)
+    # A run that appended order 1 but stopped before saving any state
+    pd.DataFrame({column: [None] for column in hitpay_income.INCOME_COLUMNS}).assign(
+        **{'Order ID Updated': "#1", 'Order Total': 10.0}).to_csv(ledger_dir / "income_ledger.csv", index=False)
+
+    assert hitpay_income.hitpay_ledger_ingest() == 1
+    assert read_ledger(ledger_dir)['Order ID Updated'].tolist() == ["#1", "#2"]
@@ -0,0 +1,54 @@
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from civiltekk_yugioh_scraper.v1.models.ygo_models import INVENTORY_KEY_COLUMNS
+from civiltekk_yugioh_scraper.v1.prod.ygo_inventory_upload import deduplicate_inventory_df
+from civiltekk_yugioh_scraper.v1.utilities.inventory_utilities import (
+    INVENTORY_STRING_DTYPE, compact_inventory_df, concat_inventory_frames, get_inventory_dtypes)
+
+
+def make_inventory(rows):
+    return pd.DataFrame(rows, columns=INVENTORY_KEY_COLUMNS + ["quantity"])
+
+
+def test_get_inventory_dtypes_covers_only_present_key_columns():
+    assert get_inventory_dtypes(["region", "set_card_name_combined", "quantity"]) == {
+        "region": "category", "set_card_name_combined": INVENTORY_STRING_DTYPE}
+
+
+def test_concat_inventory_frames_keeps_categoricals():
+    website = compact_inventory_df(make_inventory([("EN", "Dark Magician", "Set A", "A-001", "UR", 1)]))
+    asian = compact_inventory_df(make_inventory([("AE", "Kuriboh", "Set B", "B-001", "C", 2)]))
+
+    combined = concat_inventory_frames([website, make_inventory([]), asian])
+
+    assert isinstance(combined["set_name"].dtype, pd.CategoricalDtype)
+    assert combined["set_name"].tolist() == ["Set A", "Set B"]
+    assert concat_inventory_frames([make_inventory([])]).empty
+
+
+def test_compact_dedup_keeps_the_same_rows_as_object_dedup():
+    rows = [
+        ("EN", "Dark Magician", "Set A", "A-001", "UR", 1),
+        ("EN", "Dark Magician", "Set A", "A-001", "UR", 2),
+        ("EN", "Dark Magician", "Set A", None, "UR", 3),
+        ("EN", "Dark Magician", "Set A", None, "UR", 4),
+        ("AE", "Dark Magician", "Set A", "A-001", "UR", 5),
+    ]
+    df = make_inventory(rows)
+    compact = compact_inventory_df(df)
+
+    for keep in ("first", "last"):
+        expected = df.drop_duplicates(subset=INVENTORY_KEY_COLUMNS, keep=keep)
+        deduped = compact.drop_duplicates(subset=INVENTORY_KEY_COLUMNS, keep=keep)
+        assert deduped["quantity"].tolist() == expected["quantity"].tolist()
+
+
+def test_deduplicate_inventory_df_keeps_the_last_occurrence():
+    df = make_inventory([
+        ("EN", "Dark Magician", "Set A", "A-001", "UR", 1),
+        ("EN", "Kuriboh", "Set A", "A-002", "C", 2),
+        ("EN", "Dark Magician", "Set A", "A-001", "UR", 3),
+    ])
+
+    assert_frame_equal(deduplicate_inventory_df(df), df.iloc[[1, 2]])
@@ -0,0 +1,31 @@
+import gzip
+import json
+
+import pandas as pd
+import pytest
+
+from civiltekk_yugioh_scraper.v1.utilities.sink_utilities import (
+    LocalFileSink, OutputSink, serialize_df, write_to_sinks)
+
+
+def test_output_sink_requires_write():
+    with pytest.raises(TypeError):
+        OutputSink()
+
+
+def test_serialize_df_json_default_matches_old_export():
+    df = pd.DataFrame({"name": ["Dark Magician"], "price": [1.5]})
+    payload = serialize_df(df, "json")
+    assert payload == json.dumps([{"name": "Dark Magician", "price": 1.5}], indent=4).encode("utf-8")
+
+
+def test_write_to_sinks_shares_payload(tmp_path):
+    df = pd.DataFrame({"name": ["Blue-Eyes", None], "price": [2.0, None]})
+    csv_path = tmp_path / "out.csv"
+    gz_path = tmp_path / "out.json.gz"
+    write_to_sinks([(df, [LocalFileSink(str(csv_path), file_format="csv"),
+                          LocalFileSink(str(gz_path), file_format="json", compression="gzip")])])
+
+    assert pd.read_csv(csv_path).shape == (2, 2)
+    assert json.loads(gzip.decompress(gz_path.read_bytes())) == [
+        {"name": "Blue-Eyes", "price": 2.0}, {"name": None, "price": None}]
@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+
+from civiltekk_yugioh_scraper.v1.utilities.aws_utilities import retrieve_data_from_db_to_df, upload_data
+from civiltekk_yugioh_scraper.v1.utilities.storage_backends import (
+    DuckDBBackend, SQLiteBackend, StorageBackend, get_storage_backend)
+
+
+def test_storage_backend_is_abstract():
+    with pytest.raises(TypeError):
+        StorageBackend()
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_storage_backend("oracle")
+
+
+def test_retrieve_data_from_db_to_df_with_backend(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df = pd.DataFrame({"set_name": ["Set A", "Set B"], "price": [1.0, 2.0]})
+    upload_data(df, "prices", "replace", db_name="test_db", backend="sqlite")
+
+    df_read = retrieve_data_from_db_to_df("prices", db_name="test_db", columns=["price"],
+                                          where={"set_name": "Set B"}, backend="sqlite")
+    assert df_read["price"].tolist() == [2.0]
+
+
+def test_duckdb_fingerprint_sees_writes_in_the_wal(tmp_path):
+    pytest.importorskip("duckdb_engine")
+    backend = DuckDBBackend(directory=str(tmp_path))
+    engine = backend.get_engine("test_db")
+    backend.write_df(pd.DataFrame({"price": [1.0]}), engine, "prices", "replace")
+    before = backend.get_table_fingerprint(engine, "prices", "test_db")
+
+    # Same row count, and the write stays in the WAL while the engine holds the file open
+    backend.write_df(pd.DataFrame({"price": [3.0]}), engine, "prices", "replace")
+    after = backend.get_table_fingerprint(engine, "prices", "test_db")
+    engine.dispose()
+
+    assert before.split("|")[0] == after.split("|")[0] == "1"
+    assert before != after
+
+
+def test_sqlite_fingerprint_changes_on_rewrite(tmp_path):
+    backend = SQLiteBackend(directory=str(tmp_path))
+    engine = backend.get_engine("test_db")
+    backend.write_df(pd.DataFrame({"price": [1.0]}), engine, "prices", "replace")
+    before = backend.get_table_fingerprint(engine, "prices", "test_db")
+    backend.write_df(pd.DataFrame({"price": [3.0]}), engine, "prices", "replace")
+    assert backend.get_table_fingerprint(engine, "prices", "test_db") != before
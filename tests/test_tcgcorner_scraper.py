@@ -0,0 +1,149 @@
+import csv
+import gzip
+import io
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from civiltekk_yugioh_scraper.v1.prod import tcgcorner_scraper
+from civiltekk_yugioh_scraper.v1.utilities import sink_utilities
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "tcgcorner")
+
+CARD_PRICES = pd.DataFrame({
+    "set_card_name_combined": ["ブラック・マジシャン", "Dark Magician"],
+    "set_name": ["Rarity Collection Quarter Century Edition", pd.NA],
+    "set_card_code_updated": ["RC04-JP001", "RA03-AE001"],
+    "rarity_name": ["Ultra Rare", "Secret Rare"],
+    "price": [12.5, None],
+    "region": ["JP", "AE"],
+}).astype(tcgcorner_scraper.TCGCORNER_DTYPES)
+
+
+@pytest.fixture
+def scrape(tmp_path, monkeypatch):
+    """
+    Runs tcgcorner_scrape on CARD_PRICES, with S3 uploads captured instead of sent.
+    """
+    uploads: dict = {}
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(tcgcorner_scraper, "get_card_prices_df", lambda: CARD_PRICES)
+    monkeypatch.setattr(sink_utilities, "save_bytes_to_s3",
+                        lambda bucket, key, body, **kwargs: uploads.__setitem__(key, (body, kwargs)))
+
+    def run(**kwargs):
+        tcgcorner_scraper.tcgcorner_scrape(**kwargs)
+        return uploads
+    return run
+
+
+def test_default_export_keeps_the_old_format(scrape, tmp_path):
+    uploads = scrape()
+
+    assert sorted(uploads) == ["tcgcorner_pricing.csv", "tcgcorner_pricing.json"]
+    expected_json = json.dumps(tcgcorner_scraper.df_to_records(CARD_PRICES), indent=4)
+    assert (tmp_path / "tcgcorner_pricing.json").read_text() == expected_json
+    assert uploads["tcgcorner_pricing.json"][0] == expected_json.encode("utf-8")
+    assert uploads["tcgcorner_pricing.csv"][0] == (tmp_path / "tcgcorner_pricing.csv").read_bytes()
+
+
+def test_gzip_adds_compressed_copies(scrape, tmp_path):
+    uploads = scrape(compression="gzip")
+
+    assert sorted(uploads) == ["tcgcorner_pricing.csv", "tcgcorner_pricing.csv.gz",
+                               "tcgcorner_pricing.json", "tcgcorner_pricing.json.gz"]
+    for name in ("tcgcorner_pricing.csv", "tcgcorner_pricing.json"):
+        body, options = uploads[f"{name}.gz"]
+        assert gzip.decompress(body) == uploads[name][0] == (tmp_path / name).read_bytes()
+        assert options["content_encoding"] == "gzip"
+        assert (tmp_path / f"{name}.gz").read_bytes() == body
+
+
+def test_compact_json_is_a_separate_copy(scrape, tmp_path):
+    default_json = scrape()["tcgcorner_pricing.json"][0]
+    uploads = scrape(compact=True, compression="gzip")
+
+    assert sorted(uploads) == ["tcgcorner_pricing.csv", "tcgcorner_pricing.csv.gz",
+                               "tcgcorner_pricing.json", "tcgcorner_pricing.json.gz",
+                               "tcgcorner_pricing.min.json", "tcgcorner_pricing.min.json.gz"]
+    assert uploads["tcgcorner_pricing.json"][0] == default_json
+    assert (tmp_path / "tcgcorner_pricing.json").read_bytes() == default_json
+    text = (tmp_path / "tcgcorner_pricing.min.json").read_text(encoding="utf-8")
+    assert "ブラック・マジシャン" in text and "\n" not in text
+    assert json.loads(text) == tcgcorner_scraper.df_to_records(CARD_PRICES)
+    assert gzip.decompress(uploads["tcgcorner_pricing.min.json.gz"][0]) == text.encode("utf-8")
+
+
+def test_gzip_payload_is_deterministic():
+    first = sink_utilities.serialize_df(CARD_PRICES, "csv", compression="gzip")
+    assert first == sink_utilities.serialize_df(CARD_PRICES, "csv", compression="gzip")
+    assert gzip.decompress(first) == sink_utilities.serialize_df(CARD_PRICES, "csv")
+
+
+def make_product(title: str, price, collections: list[str]) -> dict:
+    return {'title': title,
+            'variants': [{'price': price}] if price is not None else [],
+            'collections': [{'title': collection} for collection in collections]}
+
+
+def test_normalize_tcgcorner_products():
+    products = [
+        make_product("RC04-JP001 Blue-Eyes White Dragon (QCSR)", "120.50",
+                     ["All Single Card", "RARITY COLLECTION - QUARTER CENTURY EDITION - (RC04)"]),
+        make_product("Booster Box Age of Overlord", "80", ["AGOV"]),
+        make_product("RA03-AE050 Dark Magician Girl (UR)", None,
+                     ["Yu-Gi-Oh! Single Card (Asia English)", "Featured Single Card"]),
+        make_product("AGOV-EN001 Some Card (SR)", "1", ["AGOV", "Side Unity"]),
+    ]
+    df = tcgcorner_scraper.normalize_tcgcorner_products(products)
+
+    assert df.dtypes.astype(str).to_dict() == {
+        column: str(pd.Series(dtype=dtype).dtype) for column, dtype in tcgcorner_scraper.TCGCORNER_DTYPES.items()}
+    assert tcgcorner_scraper.df_to_records(df) == [
+        {"set_card_name_combined": "Blue-Eyes White Dragon",
+         "set_name": "Rarity Collection Quarter Century Edition",
+         "set_card_code_updated": "RC04-JP001", "rarity_name": "Quarter Century Secret Rare",
+         "price": "120.50", "region": "JP"},
+        {"set_card_name_combined": "Dark Magician Girl", "set_name": None,
+         "set_card_code_updated": "RA03-AE050", "rarity_name": "Ultra Rare",
+         "price": 0, "region": "AE"},
+        {"set_card_name_combined": "Some Card", "set_name": "Age of Overlord",
+         "set_card_code_updated": "AGOV-EN001", "rarity_name": "Super Rare",
+         "price": "1", "region": None},
+    ]
+
+
+def test_normalize_tcgcorner_products_matches_row_wise_helpers():
+    products = [make_product(f"RA03-JP{i:03d} Card {i} ({rarity})", str(i), ["CR03"])
+                for i, rarity in enumerate(["N", "SER", "P-SER", "XYZ"])]
+    df = tcgcorner_scraper.normalize_tcgcorner_products(products)
+
+    assert df["rarity_name"].tolist() == [tcgcorner_scraper.replace_card_rarity_name(rarity)
+                                          for rarity in ["N", "SER", "P-SER", "XYZ"]]
+    assert df["set_name"].tolist() == [tcgcorner_scraper.replace_tcgcorner_set_name("CR03")] * 4
+    assert df["region"].tolist() == [tcgcorner_scraper.check_region(code)
+                                     for code in df["set_card_code_updated"]]
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+def test_export_matches_the_row_wise_baseline(scrape, tmp_path, monkeypatch):
+    """
+    filter_page.json is a saved filter API page; the tcgcorner_pricing fixtures are what
+    the row-wise parser and the json/csv.DictWriter exports made of it.
+    """
+    products = json.loads(read_fixture("filter_page.json"))["products"]
+    monkeypatch.setattr(tcgcorner_scraper, "get_card_prices_df",
+                        lambda: tcgcorner_scraper.normalize_tcgcorner_products(products))
+
+    uploads = scrape()
+
+    assert uploads["tcgcorner_pricing.json"][0].decode("utf-8") == read_fixture("tcgcorner_pricing.json")
+    # Same rows and values; only the line endings differ from csv.DictWriter's
+    assert list(csv.reader(io.StringIO(uploads["tcgcorner_pricing.csv"][0].decode("utf-8")))) == list(
+        csv.reader(io.StringIO(read_fixture("tcgcorner_pricing.csv"))))
@@ -0,0 +1,213 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from civiltekk_yugioh_scraper.v1.prod import ygo_inventory_export as inventory_export
+from civiltekk_yugioh_scraper.v1.config import REDIRECT_CACHE_TTL, REDIRECT_NEGATIVE_CACHE_TTL
+from civiltekk_yugioh_scraper.v1.utilities.cache_utilities import load_json_cache
+
+REDIRECTS = {"Dark Magician (old)": "Dark Magician"}
+T0 = 1_700_000_000.0
+
+
+@pytest.fixture
+def redirect_lookup(tmp_path, monkeypatch):
+    """
+    Yugipedia redirect lookups against REDIRECTS, with a controllable clock. Returns the
+    list of queried batches.
+    """
+    monkeypatch.setattr(inventory_export, "REDIRECT_CACHE_PATH", str(tmp_path / "redirects.json"))
+    queried: list = []
+    clock = {"now": T0}
+    failing: set = set()
+
+    def fake_fetch_redirects(names):
+        queried.append(list(names))
+        if failing & set(names):
+            raise inventory_export.requests.ConnectionError("Yugipedia is down")
+        return {name: REDIRECTS[name] for name in names if name in REDIRECTS}
+
+    monkeypatch.setattr(inventory_export, "fetch_redirects", fake_fetch_redirects)
+    monkeypatch.setattr(inventory_export.time, "time", lambda: clock["now"])
+    return queried, clock, failing
+
+
+def test_is_redirect_entry_fresh():
+    assert inventory_export.is_redirect_entry_fresh({"to": "B", "checked_at": T0}, T0 + REDIRECT_CACHE_TTL - 1)
+    assert not inventory_export.is_redirect_entry_fresh({"to": "B", "checked_at": T0}, T0 + REDIRECT_CACHE_TTL)
+    assert inventory_export.is_redirect_entry_fresh({"to": None, "checked_at": T0},
+                                                    T0 + REDIRECT_NEGATIVE_CACHE_TTL - 1)
+    assert not inventory_export.is_redirect_entry_fresh({"to": None, "checked_at": T0},
+                                                        T0 + REDIRECT_NEGATIVE_CACHE_TTL)
+    assert not inventory_export.is_redirect_entry_fresh({}, T0)
+
+
+def test_cached_names_are_not_queried_again(redirect_lookup):
+    queried, _, _ = redirect_lookup
+    names = ["Dark Magician (old)", "Blue-Eyes White Dragon", "Dark Magician (old)", None, ""]
+
+    assert inventory_export.check_existing_card_names_to_update(names) == REDIRECTS
+    assert queried == [["Dark Magician (old)", "Blue-Eyes White Dragon"]]
+
+    assert inventory_export.check_existing_card_names_to_update(names) == REDIRECTS
+    assert len(queried) == 1
+
+
+def test_negative_lookups_expire_first(redirect_lookup):
+    queried, clock, _ = redirect_lookup
+    names = ["Dark Magician (old)", "Blue-Eyes White Dragon"]
+    inventory_export.check_existing_card_names_to_update(names)
+
+    clock["now"] = T0 + REDIRECT_NEGATIVE_CACHE_TTL
+    assert inventory_export.check_existing_card_names_to_update(names) == REDIRECTS
+    assert queried[-1] == ["Blue-Eyes White Dragon"]
+    assert len(queried) == 2
+
+    # The refreshed negative entry is fresh again, the redirect has not expired yet
+    clock["now"] = T0 + REDIRECT_NEGATIVE_CACHE_TTL + 1
+    inventory_export.check_existing_card_names_to_update(names)
+    assert len(queried) == 2
+
+    clock["now"] = T0 + REDIRECT_CACHE_TTL
+    inventory_export.check_existing_card_names_to_update(names)
+    assert sorted(queried[-1]) == sorted(names)
+
+
+def test_expired_entries_are_pruned_from_the_cache(redirect_lookup):
+    _, clock, _ = redirect_lookup
+    inventory_export.check_existing_card_names_to_update(["Blue-Eyes White Dragon"])
+
+    clock["now"] = T0 + REDIRECT_NEGATIVE_CACHE_TTL
+    inventory_export.check_existing_card_names_to_update(["Dark Magician (old)"])
+    assert list(load_json_cache(inventory_export.REDIRECT_CACHE_PATH)) == ["Dark Magician (old)"]
+
+
+def test_failed_batches_are_retried_next_run(redirect_lookup):
+    queried, _, failing = redirect_lookup
+    failing.add("Dark Magician (old)")
+    assert inventory_export.check_existing_card_names_to_update(["Dark Magician (old)"]) == {}
+
+    failing.clear()
+    assert inventory_export.check_existing_card_names_to_update(["Dark Magician (old)"]) == REDIRECTS
+    assert len(queried) == 2
+
+
+def test_use_cache_false_queries_again(redirect_lookup):
+    queried, _, _ = redirect_lookup
+    inventory_export.check_existing_card_names_to_update(["Dark Magician (old)"])
+    inventory_export.check_existing_card_names_to_update(["Dark Magician (old)"], use_cache=False)
+    assert len(queried) == 2
+
+
+@pytest.fixture
+def card_prices():
+    return pd.DataFrame({
+        "set_card_name_combined": ["Dark Magician", "Blue-Eyes White Dragon", "Kuriboh", "Mystical Space Typhoon"],
+        "set_name": ["Set A", "Set A", "Set A", "Set A"],
+        "rarity_name": ["Ultra Rare", "Ultra Rare", "Common", "Common"],
+        "set_card_code_updated": ["SETA-EN001", "SETA-EN002", "SETA-EN003", "SETA-EN004"],
+        "price": [10.0, 20.0, 1.0, 2.0],
+    })
+
+
+def match(inventory_rows, card_prices):
+    df_inventory = pd.DataFrame(inventory_rows, columns=[
+        "set_card_name_combined", "set_name", "rarity", "set_card_code_updated"])
+    return inventory_export.match_ae_prices(df_inventory, card_prices)
+
+
+def test_match_passes(card_prices):
+    df, stats = match([
+        ("Dark Magician", "Set A", "Ultra Rare", None),
+        ("blue-eyes  white DRAGON", "SET A", "ultra rare", None),
+        ("Kuriboh (alt art)", "Set C", "Common", "seta-en003"),
+        ("Mystical Space Typhon", "Set A", "Common", None),
+        ("Pot of Greed", "Set A", "Common", None),
+    ], card_prices)
+
+    assert df["match_type"].tolist() == ["exact", "normalized", "card_code", "fuzzy", None]
+    assert df["price"].tolist() == [10.0, 20.0, 1.0, 2.0, 0.0]
+    assert stats == {"exact": 1, "normalized": 1, "card_code": 1, "fuzzy": 1, "unmatched": 1, "rows": 5}
+
+
+def test_fuzzy_does_not_match_a_longer_card_name(card_prices):
+    df, stats = match([("Dark Magician Girl", "Set A", "Ultra Rare", None)], card_prices)
+
+    assert df["price"].tolist() == [0.0]
+    assert stats["unmatched"] == 1
+
+
+def test_fuzzy_does_not_match_across_sets(card_prices):
+    df, _ = match([("Dark Magician", "Set B", "Ultra Rare", None),
+                   ("Mystical Space Typhon", "Set B", "Common", None)], card_prices)
+
+    assert df["price"].tolist() == [0.0, 0.0]
+
+
+def test_another_set_matches_only_on_an_equal_card_code(card_prices):
+    df, _ = match([("Dark Magician", "Set B", "Ultra Rare", "SETA-EN001"),
+                   ("Dark Magician", "Set B", "Ultra Rare", "SETB-EN001")], card_prices)
+
+    assert df["match_type"].tolist() == ["card_code", None]
+
+
+def test_fuzzy_skips_a_different_card_code(card_prices):
+    df, _ = match([("Mystical Space Typhon", "Set A", "Common", "SETA-EN999"),
+                   ("Mystical Space Typhon", "Set A", "Common", None)], card_prices)
+
+    assert df["match_type"].tolist() == [None, "fuzzy"]
+
+
+def test_matching_100k_rows_takes_under_a_second():
+    rng = np.random.default_rng(0)
+    words = np.array(["Dark", "Magician", "Blue", "Eyes", "White", "Dragon", "Kuriboh", "Girl", "Knight",
+                      "Chaos", "Soldier", "Red", "Black", "Elemental", "Hero", "Cyber", "Sky", "Striker"])
+    ids = np.arange(50_000)
+    card_prices = pd.DataFrame({
+        "set_card_name_combined": [" ".join(picked) + f" {i}"
+                                   for i, picked in zip(ids, words[rng.integers(0, len(words), (len(ids), 3))])],
+        "set_name": [f"Set {i % 300}" for i in ids],
+        "rarity_name": rng.choice(["Ultra Rare", "Super Rare", "Rare", "Common", "Secret Rare"], len(ids)),
+        "set_card_code_updated": [f"S{i % 300:03d}-EN{i:05d}" for i in ids],
+        "price": rng.random(len(ids)) * 10,
+    })
+    df_inventory = card_prices.iloc[rng.integers(0, len(ids), 100_000)].rename(
+        columns={"rarity_name": "rarity"}).drop(columns="price").reset_index(drop=True)
+    # About 5% near misses, which only the fuzzy pass can match
+    near_misses = rng.random(len(df_inventory)) < 0.05
+    df_inventory.loc[near_misses, "set_card_name_combined"] += "x"
+    df_inventory.loc[near_misses, "set_card_code_updated"] = None
+
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        _, stats = inventory_export.match_ae_prices(df_inventory, card_prices)
+        timings.append(time.perf_counter() - start)
+
+    assert stats["exact"] == (~near_misses).sum()
+    assert stats["fuzzy"] > 0.99 * near_misses.sum()
+    assert min(timings) < 1.0
+
+
+def test_combine_ae_price_writes_match_type_and_returns_stats(tmp_path, monkeypatch, card_prices):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(inventory_export, "get_file_path", lambda filename: str(tmp_path / filename))
+    pd.DataFrame({
+        "set_card_name_combined": ["Dark Magician", "Pot of Greed"],
+        "set_name": ["Set A", "Set A"],
+        "rarity": ["Ultra Rare", "Common"],
+    }).to_excel(tmp_path / "inventory.xlsx", sheet_name="Inventory", index=False)
+
+    card_price_records, updated_inventory, stats = inventory_export.combine_ae_price(
+        "inventory.xlsx", output_updated_inventory=True, df_card_prices=card_prices, return_stats=True)
+
+    assert len(card_price_records) == 4
+    assert [item["price"] for item in updated_inventory] == [10.0, 0.0]
+    assert "match_type" not in updated_inventory[0]
+    assert stats["exact"] == 1 and stats["unmatched"] == 1
+    exported = pd.read_csv(tmp_path / "list_of_updated_inventory.csv")
+    assert exported["match_type"].tolist()[0] == "exact"
+    assert exported["match_type"].isna().tolist() == [False, True]
+    assert len(inventory_export.combine_ae_price("inventory.xlsx", df_card_prices=card_prices)) == 2
@@ -0,0 +1,279 @@
+import json
+import os
+
+import lxml.html
+import pytest
+import requests
+
+from civiltekk_yugioh_scraper.v1.prod import yuyuteiscrape2 as yuyutei
+from civiltekk_yugioh_scraper.v1.utilities.cache_utilities import load_json_cache, save_json_cache
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "yuyutei")
+
+
+def make_set(set_code: str) -> dict:
+    return {'url': f"https://yuyu-tei.jp/sell/ygo/s/{set_code.lower()}", 'set_code': set_code}
+
+
+@pytest.fixture
+def scrape_env(tmp_path, monkeypatch):
+    """
+    Runs yuyutei_scrape offline: discovery results are supplied by the test, set pages
+    return one row each and nothing is written to the database.
+    """
+    cache_path = str(tmp_path / "pages.json")
+    monkeypatch.setattr(yuyutei, "YUYUTEI_PAGE_CACHE_PATH", cache_path)
+    monkeypatch.setattr(yuyutei, "YUYUTEI_PAGE_ENTRY_DIR", str(tmp_path / "pages"))
+    saved_paths: list = []
+    save_json_cache_ = yuyutei.save_json_cache
+    monkeypatch.setattr(yuyutei, "save_json_cache",
+                        lambda data, path: (saved_paths.append(path), save_json_cache_(data, path)))
+    monkeypatch.setattr(yuyutei, "SELENIUM_AVAILABLE", True)
+    selenium_calls: list = []
+    writes: list = []
+    env = {'cache_path': cache_path, 'http_sets': [], 'selenium_sets': [], 'selenium_calls': selenium_calls,
+           'status': 'changed', 'writes': writes, 'saved_paths': saved_paths}
+    monkeypatch.setattr(yuyutei, "write_to_sinks", lambda outputs: writes.extend(
+        (sink.table_name, df) for df, sinks in outputs for sink in sinks))
+
+    def fake_selenium(url, pool=None, timeout=10.0):
+        selenium_calls.append(url)
+        return env['selenium_sets']
+
+    def fake_scrape(obj, cache_entry=None):
+        rows = [{'card_rarity': 'UR', 'set_code': obj['set_code'], 'Price': 100.0,
+                 'card_set_card_code': f"{obj['set_code']}-JP001", 'url': obj['url']}]
+        if env['status'] == 'failed':
+            return [], cache_entry, 'failed'
+        return rows, {'content_hash': obj['set_code'], 'rows': rows}, env['status']
+
+    monkeypatch.setattr(yuyutei, "get_set_list_http", lambda url: env['http_sets'])
+    monkeypatch.setattr(yuyutei, "get_set_list_selenium", fake_selenium)
+    monkeypatch.setattr(yuyutei, "get_card_set_codes_if_changed", fake_scrape)
+    return env
+
+
+def test_get_missing_set_codes():
+    registry = yuyutei.SetRegistry([make_set("QCAC"), make_set("RA03")])
+    assert yuyutei.get_missing_set_codes(
+        registry, [make_set("RA03"), make_set("QCCU"), make_set("AGOV")]) == ["AGOV", "QCCU"]
+
+
+def test_first_run_trusts_http_discovery(scrape_env):
+    scrape_env['http_sets'] = [make_set("QCAC"), make_set("RA03")]
+    yuyutei.yuyutei_scrape()
+
+    assert scrape_env['selenium_calls'] == []
+    assert [item['set_code'] for item in load_json_cache(scrape_env['cache_path'])['sets']] == ["QCAC", "RA03"]
+
+
+def test_partial_http_miss_falls_back_to_selenium(scrape_env):
+    save_json_cache({'sets': [make_set("QCAC"), make_set("RA03")]}, scrape_env['cache_path'])
+    scrape_env['http_sets'] = [make_set("QCAC")]
+    scrape_env['selenium_sets'] = [make_set("QCAC"), make_set("RA03")]
+    yuyutei.yuyutei_scrape()
+
+    assert len(scrape_env['selenium_calls']) == 1
+    cache = load_json_cache(scrape_env['cache_path'])
+    assert {item['set_code'] for item in cache['sets']} == {"QCAC", "RA03"}
+    assert set(yuyutei.load_page_entries(item['url'] for item in cache['sets'])) == {
+        make_set("QCAC")['url'], make_set("RA03")['url']}
+
+
+def test_sets_still_missing_are_reported(scrape_env, caplog):
+    save_json_cache({'sets': [make_set("QCAC"), make_set("RA03")]}, scrape_env['cache_path'])
+    scrape_env['http_sets'] = [make_set("QCAC")]
+    yuyutei.yuyutei_scrape()
+
+    assert len(scrape_env['selenium_calls']) == 1
+    assert "will drop out of yuyutei_latest: ['RA03']" in caplog.text
+
+
+def test_missing_sets_drop_out_of_latest_even_if_nothing_changed(scrape_env):
+    scrape_env['http_sets'] = [make_set("QCAC"), make_set("RA03")]
+    yuyutei.yuyutei_scrape()
+    assert load_json_cache(scrape_env['cache_path'])['latest_synced']
+
+    scrape_env['http_sets'] = [make_set("QCAC")]
+    scrape_env['status'] = 'unchanged'
+    scrape_env['writes'].clear()
+    yuyutei.yuyutei_scrape()
+
+    [(table_name, latest_df)] = scrape_env['writes']
+    assert table_name == 'yuyutei_latest'
+    assert latest_df['card_set_card_code'].tolist() == ["QCAC-JP001"]
+
+
+def test_flushes_save_only_the_flushed_sets(scrape_env, monkeypatch):
+    monkeypatch.setattr(yuyutei, "YUYUTEI_FLUSH_SECONDS", 0)
+    sets = [make_set("QCAC"), make_set("RA03")]
+    scrape_env['http_sets'] = sets
+    yuyutei.yuyutei_scrape()
+
+    entry_paths = [yuyutei.get_page_entry_path(item['url']) for item in sets]
+    assert sorted(path for path in scrape_env['saved_paths'] if path in entry_paths) == sorted(entry_paths)
+    assert yuyutei.load_page_entries([sets[0]['url']])[sets[0]['url']]['content_hash'] == "QCAC"
+
+    # Nothing is pending when no page changed, so no flush writes anything
+    scrape_env['status'] = 'unchanged'
+    scrape_env['saved_paths'].clear()
+    yuyutei.yuyutei_scrape()
+    assert scrape_env['saved_paths'] == [scrape_env['cache_path']]
+
+
+def test_single_file_cache_entries_are_moved_to_their_own_files(scrape_env):
+    qcac = make_set("QCAC")
+    save_json_cache({'sets': [qcac], 'latest_synced': True,
+                     'pages': {qcac['url']: {'content_hash': "old", 'rows': []}}}, scrape_env['cache_path'])
+    scrape_env['http_sets'] = [qcac]
+    scrape_env['status'] = 'failed'
+    yuyutei.yuyutei_scrape()
+
+    assert 'pages' not in load_json_cache(scrape_env['cache_path'])
+    assert yuyutei.load_page_entries([qcac['url']]) == {qcac['url']: {'content_hash': "old", 'rows': []}}
+
+
+SET_PAGE = """
+<html><body>
+<div id="card-list3"><span>UR</span>
+  <div class="col-md"><span>QCAC-JP001</span><strong>1,200 円</strong><h4>ブラック・マジシャン</h4></div>
+</div>
+</body></html>
+"""
+
+
+def make_response(status_code: int, text: str = "", headers: dict | None = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = text.encode("utf-8")
+    response.encoding = "utf-8"
+    response.headers.update(headers or {})
+    response.url = make_set("QCAC")['url']
+    return response
+
+
+@pytest.fixture
+def set_page(monkeypatch):
+    responses: dict = {}
+    monkeypatch.setattr(yuyutei, "yuyutei_get", lambda url, **kwargs: responses[url])
+    return responses
+
+
+def test_changed_page_is_parsed_and_cached(set_page):
+    obj = make_set("QCAC")
+    set_page[obj['url']] = make_response(200, SET_PAGE, {'ETag': '"v1"'})
+    rows, entry, status = yuyutei.get_card_set_codes_if_changed(obj)
+
+    assert status == 'changed'
+    assert [(row['card_set_card_code'], row['Price']) for row in rows] == [("QCAC-JP001", 1200.0)]
+    assert entry['etag'] == '"v1"' and entry['rows'] == rows
+
+
+@pytest.mark.parametrize("status_code", [429, 500, 503])
+def test_error_responses_fail_and_keep_the_cache_entry(set_page, status_code):
+    obj = make_set("QCAC")
+    cache_entry = {'etag': '"v1"', 'content_hash': 'abc', 'rows': [{'card_set_card_code': "QCAC-JP001"}]}
+    set_page[obj['url']] = make_response(status_code, "<html><body>Too busy</body></html>")
+
+    assert yuyutei.get_card_set_codes_if_changed(obj, cache_entry) == ([], cache_entry, 'failed')
+
+
+def test_maintenance_page_fails(set_page):
+    obj = make_set("QCAC")
+    set_page[obj['url']] = make_response(200, "<html><body>メンテナンス中</body></html>")
+
+    assert yuyutei.get_card_set_codes_if_changed(obj) == ([], None, 'failed')
+
+
+def test_failed_follow_on_page_fails_the_set(set_page):
+    obj = make_set("QCAC")
+    page_2 = f"{obj['url']}?page=2"
+    set_page[obj['url']] = make_response(
+        200, SET_PAGE.replace("</body>", f'<ul class="pagination"><li><a href="{page_2}">2</a></li></ul></body>'))
+    set_page[page_2] = make_response(503)
+
+    assert yuyutei.get_card_set_codes_if_changed(obj)[2] == 'failed'
+
+
+def test_not_modified_returns_cached_rows(set_page):
+    obj = make_set("QCAC")
+    cache_entry = {'etag': '"v1"', 'content_hash': 'abc', 'rows': [{'card_set_card_code': "QCAC-JP001"}]}
+    set_page[obj['url']] = make_response(304)
+
+    assert yuyutei.get_card_set_codes_if_changed(obj, cache_entry) == (
+        cache_entry['rows'], cache_entry, 'unchanged')
+
+
+def test_pagination_urls_fill_in_elided_pages():
+    root = lxml.html.fromstring(
+        '<ul class="pagination"><li><a href="?search_word=ra03&page=2">2</a></li>'
+        '<li><a href="?search_word=ra03&page=4">4</a></li></ul>')
+    assert yuyutei.get_pagination_urls(root, "https://yuyu-tei.jp/sell/ygo/s/search") == [
+        f"https://yuyu-tei.jp/sell/ygo/s/search?search_word=ra03&page={page}" for page in (2, 3, 4)]
+
+
+def test_known_follow_on_pages_are_fetched_without_pagination_links(set_page):
+    obj = make_set("QCCU")
+    fallback_url = yuyutei.YUYUTEI_FALLBACK_PAGE_URLS['QCCU'][0]
+    set_page[obj['url']] = make_response(200, SET_PAGE)
+    set_page[fallback_url] = make_response(200, SET_PAGE.replace("QCAC-JP001", "QCCU-JP002"))
+    rows, _, status = yuyutei.get_card_set_codes_if_changed(obj)
+
+    assert status == 'changed'
+    assert [row['card_set_card_code'] for row in rows] == ["QCAC-JP001", "QCCU-JP002"]
+
+
+def test_pagination_links_take_precedence_over_known_pages(set_page):
+    obj = make_set("QCCU")
+    page_2 = f"{obj['url']}?page=2"
+    set_page[obj['url']] = make_response(
+        200, SET_PAGE.replace("</body>", f'<ul class="pagination"><li><a href="{page_2}">2</a></li></ul></body>'))
+    set_page[page_2] = make_response(200, SET_PAGE.replace("QCAC-JP001", "QCCU-JP003"))
+
+    rows, _, _ = yuyutei.get_card_set_codes_if_changed(obj)
+    assert [row['card_set_card_code'] for row in rows] == ["QCAC-JP001", "QCCU-JP003"]
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_set_page_parsers_match_the_original_rows():
+    """
+    qcac_rows.json is what the original row-wise BeautifulSoup scraper made of qcac.html.
+    """
+    source, obj = read_fixture("qcac.html"), make_set("QCAC")
+    expected = json.loads(read_fixture("qcac_rows.json"))
+
+    assert yuyutei.parse_card_set_page(source, obj) == yuyutei.parse_card_set_page_bs4(source, obj) == expected
+    assert yuyutei.benchmark_card_set_parsers([os.path.join(FIXTURES_DIR, "qcac.html")], repeat=1)['rows_match']
+
+
+def test_special_red_applies_after_the_marker_card():
+    rows = yuyutei.build_card_set_rows(make_set("QCAC"), [
+        ("QCSE", [("QCAC-JP001", "100 円", "A"), ("QCAC-JP002", "200 円", "B(SPECIAL RED Ver.)"),
+                  ("QCAC-JP003", "300 円", "C")]),
+        ("UR", [("QCAC-JP004", "400 円", "D")]),
+    ])
+
+    assert [row['card_rarity'] for row in rows] == ["QCSE", "QCSE", "SPECIAL RED", "UR"]
+    assert [row['card_rarity'] for row in yuyutei.build_card_set_rows(make_set("QCCU"), [
+        ("QCSE", [("QCCU-JP001", "100 円", "B(SPECIAL RED Ver.)"), ("QCCU-JP002", "100 円", "C")])])] == [
+        "QCSE", "QCSE"]
+
+
+def test_set_links_are_found_in_the_search_page():
+    source = read_fixture("search.html")
+
+    set_list = yuyutei.get_set_list_http(source=source)
+
+    assert [item['set_code'] for item in set_list] == [
+        "QCAC", "RA03", "AGOV", "LEDE", "QCCU", "24PP", "SD47", "DT14", "VJMP", "WPP4"]
+    assert set_list[0]['url'] == f"{yuyutei.YUYUTEI_BASE_URL}/sell/ygo/s/qcac"
+    # The links Selenium reads from the rendered sidebar, found by XPath instead
+    selenium_registry = yuyutei.SetRegistry()
+    for value in lxml.html.fromstring(source).xpath(
+            "//a[contains(@href, '/sell/ygo/s/')]/@href | //*[contains(@onclick, '/sell/ygo/s/')]/@onclick"):
+        selenium_registry.add_sell_link(value)
+    assert selenium_registry.to_list() == [item for item in set_list if item['set_code'] not in ("SD47", "WPP4")]